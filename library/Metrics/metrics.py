@@ -1,5 +1,4 @@
 import numpy as np
-from scipy.ndimage import uniform_filter
 
 def fss(X_f, X_o, thr, scale):
     """
@@ -87,6 +86,8 @@ def fss_accum(fss, X_f, X_o):
     # Compute fractions of pixels above the threshold within a square
     # neighboring area by applying a 2D moving average to the binary fields
     if fss["scale"] > 1:
+        from scipy.ndimage import uniform_filter
+
         S_f = uniform_filter(I_f, size=fss["scale"], mode="constant", cval=0.0)
         S_o = uniform_filter(I_o, size=fss["scale"], mode="constant", cval=0.0)
     else:
@@ -118,4 +119,226 @@ def fss_compute(fss):
     numer = fss["sum_fct_sq"] - 2.0 * fss["sum_fct_obs"] + fss["sum_obs_sq"]
     denom = fss["sum_fct_sq"] + fss["sum_obs_sq"]
 
-    return 1.0 - numer / denom
\ No newline at end of file
+    return 1.0 - numer / denom
+
+def fss_scales(X_f, X_o, thr, scales):
+    """
+    Compute the fractions skill score (FSS) of a deterministic forecast field
+    over a set of spatial scales in a single pass.
+
+    The fields are thresholded once and the number of pixels above the
+    threshold in every moving window is read from the summed-area tables
+    (integral images) of the binary fields, so that each additional scale
+    only costs a few array lookups. For every scale the result is the same
+    as :py:func:`fss`.
+
+    Parameters
+    ----------
+    X_f: array_like
+        Array of shape (m, n) containing the forecast field.
+    X_o: array_like
+        Array of shape (m, n) containing the observation field.
+    thr: float
+        The intensity threshold.
+    scales: array_like of int
+        The spatial scales in pixels, i.e. the sizes of the moving windows.
+
+    Returns
+    -------
+    out: ndarray
+        Array of shape (len(scales),) containing the fractions skill score
+        between 0 and 1 for each scale (NaN when both fields are empty).
+    """
+    X_f = np.asarray(X_f)
+    X_o = np.asarray(X_o)
+    if X_f.ndim != 2 or X_o.ndim != 2 or X_f.shape != X_o.shape:
+        message = "X_f and X_o must be two-dimensional arrays"
+        message += " having the same shape"
+        raise ValueError(message)
+
+    # Binary fields, non-finite values being below the threshold
+    I_f = np.isfinite(X_f) & (X_f >= thr)
+    I_o = np.isfinite(X_o) & (X_o >= thr)
+
+    # Forecast and observation tables are stacked to share every lookup
+    SAT = _integral_image(np.stack((I_f, I_o)))
+
+    scales = np.atleast_1d(np.asarray(scales, dtype=int))
+    out = np.full(len(scales), np.nan)
+
+    for i, scale in enumerate(scales):
+        # Pixel counts in the windows (the fractions up to the scale**2 factor,
+        # which cancels out in the score)
+        C = _window_sum(SAT, scale).reshape(2, -1)
+
+        # sum(C_f**2), sum(C_f*C_o) and sum(C_o**2) in a single product
+        G = C @ C.T
+        denom = G[0, 0] + G[1, 1]
+
+        if denom > 0:
+            out[i] = 1.0 - (denom - 2.0 * G[0, 1]) / denom
+
+    return out
+
+
+def fss_batch(X_f, X_o, thr, scales):
+    """
+    Compute the fractions skill score (FSS) of a stack of deterministic
+    forecast fields against the same observation field, for a set of
+    spatial scales.
+
+    Parameters
+    ----------
+    X_f: array_like
+        Array of shape (N, m, n) containing the forecast fields.
+    X_o: array_like
+        Array of shape (m, n) containing the observation field.
+    thr: float
+        The intensity threshold.
+    scales: array_like of int
+        The spatial scales in pixels, i.e. the sizes of the moving windows.
+
+    Returns
+    -------
+    out: ndarray
+        Array of shape (N, len(scales)) containing the fractions skill score
+        of each forecast at each scale.
+    """
+
+    fss = fss_batch_init(thr, scales)
+    fss_batch_accum(fss, X_f, X_o)
+    return fss_batch_compute(fss)
+
+
+def fss_batch_init(thr, scales):
+    """
+    Initialize a batched fractions skill score (FSS) verification object,
+    scoring N forecasts over a set of spatial scales.
+
+    Parameters
+    ----------
+    thr: float
+        The intensity threshold.
+    scales: array_like of int
+        The spatial scales in pixels, i.e. the sizes of the moving windows.
+
+    Returns
+    -------
+    fss: dict
+        The initialized batched FSS verification object. The sums are
+        allocated by the first call to :py:func:`fss_batch_accum`.
+    """
+    scales = np.atleast_1d(np.asarray(scales, dtype=int))
+    fss = dict(thr=thr, scales=scales, sum_fct_sq=None, sum_fct_obs=None, sum_obs_sq=np.zeros(len(scales)))
+
+    return fss
+
+
+def fss_batch_accum(fss, X_f, X_o, max_cells=2**22):
+    """Accumulate a stack of forecasts and the corresponding observation to a
+    batched FSS object.
+
+    The fractions of the observation are computed once per scale and shared
+    by all the forecasts. Calling the function again with other
+    forecast-observation pairs (e.g. other times) accumulates the sums, like
+    :py:func:`fss_accum`.
+
+    Parameters
+    -----------
+    fss: dict
+        The FSS object initialized with :py:func:`fss_batch_init`.
+    X_f: array_like
+        Array of shape (N, m, n) containing the forecast fields.
+    X_o: array_like
+        Array of shape (m, n) containing the observation field.
+    max_cells: int
+        Upper bound on the number of pixels processed at once, the forecasts
+        being split in chunks to bound the memory use.
+    """
+    X_f = np.asarray(X_f)
+    X_o = np.asarray(X_o)
+    if X_f.ndim != 3 or X_o.ndim != 2 or X_f.shape[1:] != X_o.shape:
+        message = "X_f must be a three-dimensional array of fields"
+        message += " having the same shape as the two-dimensional array X_o"
+        raise ValueError(message)
+
+    n_fields = X_f.shape[0]
+    scales = fss["scales"]
+
+    if fss["sum_fct_sq"] is None:
+        fss["sum_fct_sq"] = np.zeros((n_fields, len(scales)))
+        fss["sum_fct_obs"] = np.zeros((n_fields, len(scales)))
+    elif fss["sum_fct_sq"].shape[0] != n_fields:
+        raise ValueError("the number of forecasts differs from the previous calls")
+
+    # Binary fields, non-finite values being below the threshold
+    SAT_o = _integral_image((np.isfinite(X_o) & (X_o >= fss["thr"]))[None])
+
+    # Fractions of the observation, shared by every chunk of forecasts
+    S_o = []
+    for j, scale in enumerate(scales):
+        S_o.append(_window_sum(SAT_o, scale).ravel() / scale**2)
+        fss["sum_obs_sq"][j] += np.dot(S_o[j], S_o[j])
+
+    chunk = max(1, max_cells // max(X_o.size, 1))
+    for start in range(0, n_fields, chunk):
+        stop = min(start + chunk, n_fields)
+        SAT_f = _integral_image(np.isfinite(X_f[start:stop]) & (X_f[start:stop] >= fss["thr"]))
+
+        for j, scale in enumerate(scales):
+            S_f = _window_sum(SAT_f, scale).reshape(stop - start, -1) / scale**2
+
+            fss["sum_fct_obs"][start:stop, j] += S_f @ S_o[j]
+            fss["sum_fct_sq"][start:stop, j] += np.einsum("ij,ij->i", S_f, S_f)
+
+
+def fss_batch_compute(fss):
+    """
+    Compute the FSS of every forecast at every scale.
+
+    Parameters
+    ----------
+    fss: dict
+       A batched FSS object initialized with :py:func:`fss_batch_init`
+       and accumulated with :py:func:`fss_batch_accum`.
+
+    Returns
+    -------
+    out: ndarray
+        Array of shape (N, len(scales)) containing the computed FSS values
+        (NaN where both forecast and observation are empty).
+    """
+    numer = fss["sum_fct_sq"] - 2.0 * fss["sum_fct_obs"] + fss["sum_obs_sq"]
+    denom = fss["sum_fct_sq"] + fss["sum_obs_sq"]
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(denom > 0, 1.0 - numer / denom, np.nan)
+
+
+def _integral_image(I):
+    """Return the summed-area tables of a stack of binary fields of shape
+    (k, m, n), as an array of shape (k, m + 1, n + 1) with a leading row and
+    column of zeros."""
+    SAT = np.zeros((I.shape[0], I.shape[1] + 1, I.shape[2] + 1), dtype=np.int64)
+    np.cumsum(np.cumsum(I, axis=1, dtype=np.int64), axis=2, out=SAT[:, 1:, 1:])
+
+    return SAT
+
+
+def _window_sum(SAT, scale):
+    """Return the sums of a stack of fields over the moving window of the
+    given size around each pixel, using the same window placement and zero
+    padding as scipy.ndimage.uniform_filter."""
+    m, n = SAT.shape[1] - 1, SAT.shape[2] - 1
+    before = scale // 2
+    after = scale - before
+
+    rows_lo = np.clip(np.arange(m) - before, 0, m)
+    rows_hi = np.clip(np.arange(m) + after, 0, m)
+    cols_lo = np.clip(np.arange(n) - before, 0, n)
+    cols_hi = np.clip(np.arange(n) + after, 0, n)
+
+    # Four-corner lookup, as a difference along the rows then along the columns
+    T = np.take(SAT, rows_hi, axis=1) - np.take(SAT, rows_lo, axis=1)
+
+    return (np.take(T, cols_hi, axis=2) - np.take(T, cols_lo, axis=2)).astype(float)
@@ -0,0 +1,70 @@
+import warnings
+
+import numpy as np
+import pytest
+
+from library.Metrics.metrics import fss, fss_scales, fss_batch, fss_batch_init, fss_batch_accum, fss_batch_compute
+
+
+SCALES = [1, 2, 3, 4, 7, 10, 15, 40]
+
+
+def reference(X_f, X_o, thr, scales):
+    """ FSS of every scale computed with the moving average of fss """
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', RuntimeWarning)
+        return np.array([fss(X_f, X_o, thr, scale) for scale in scales])
+
+
+def get_fields(n, shape=(30, 25), seed=0):
+    rng = np.random.RandomState(seed)
+    X_o = rng.uniform(size=shape)
+    X_f = rng.uniform(size=(n,) + shape)
+    X_f[0, 3:8, 4:9] = np.nan
+    return X_f, X_o
+
+
+@pytest.mark.parametrize('thr', [0.5, 0.9])
+def test_fss_scales_matches_fss(thr):
+    X_f, X_o = get_fields(3)
+
+    for field in X_f:
+        np.testing.assert_allclose(fss_scales(field, X_o, thr, SCALES), reference(field, X_o, thr, SCALES), rtol=1e-12)
+
+
+def test_fss_batch_matches_fss():
+    X_f, X_o = get_fields(7)
+
+    out = fss_batch(X_f, X_o, 0.7, SCALES)
+
+    assert out.shape == (7, len(SCALES))
+    for field, row in zip(X_f, out):
+        np.testing.assert_allclose(row, reference(field, X_o, 0.7, SCALES), rtol=1e-12)
+
+
+def test_fss_batch_chunks():
+    X_f, X_o = get_fields(9)
+
+    chunked = fss_batch_init(0.7, SCALES)
+    fss_batch_accum(chunked, X_f, X_o, max_cells=2 * X_o.size)
+
+    np.testing.assert_allclose(fss_batch_compute(chunked), fss_batch(X_f, X_o, 0.7, SCALES), rtol=1e-12)
+
+
+def test_fss_empty_fields():
+    X_f, X_o = np.zeros((2, 12, 12)), np.zeros((12, 12))
+    X_o[4:6, 4:6] = 1
+
+    # An empty forecast against an observed spill scores 0, two empty fields are not scored
+    assert np.all(fss_scales(X_f[0], X_o, 1, SCALES) == 0)
+    assert np.all(np.isnan(fss_scales(X_f[0], X_f[1], 1, SCALES)))
+    assert np.all(np.isnan(reference(X_f[0], X_f[1], 1, SCALES)))
+
+    out = fss_batch(X_f, np.zeros((12, 12)), 1, SCALES)
+    assert np.all(np.isnan(out))
+    np.testing.assert_array_equal(fss_batch(X_f, X_o, 1, SCALES), 0)
+
+
+def test_fss_batch_rejects_mismatched_shapes():
+    with pytest.raises(ValueError):
+        fss_batch(np.zeros((2, 5, 5)), np.zeros((5, 4)), 1, SCALES)
@@ -1,15 +1,22 @@
 from .constraint import ConstraintModel
-from .target_space import TargetSpace
+from .target_space import TargetSpace, _hashable
 from .event import Events, DEFAULT_EVENTS
 from .logger import _get_default_logger
-from .util import UtilityFunction, acq_max, ensure_rng
+from .util import UtilityFunction, acq_max, ensure_rng, INITIAL_DESIGNS
+from .incremental_gp import IncrementalGaussianProcessRegressor
 
+import warnings
+import numpy as np
+from copy import deepcopy
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+from sklearn.base import clone
 from sklearn.gaussian_process.kernels import Matern
-from sklearn.gaussian_process import GaussianProcessRegressor
 
 class Queue:
     def __init__(self):
-        self._queue = []
+        self._queue = deque()
 
     @property
     def empty(self):
@@ -21,9 +28,7 @@ class Queue:
     def __next__(self):
         if self.empty:
             raise StopIteration("Queue is empty, no more objects to retrieve.")
-        obj = self._queue[0]
-        self._queue = self._queue[1:]
-        return obj
+        return self._queue.popleft()
 
     def add(self, obj):
         """Add object to end of queue."""
@@ -93,6 +98,20 @@ class BayesianOptimization(Observable):
         the same point will give different answers. In other situations, the acquisition
         may occasionally generate a duplicate point.
 
+    resolution: dict, optional
+        Dictionary with parameters names as keys and the step of their lattice
+        as values (e.g. 0.01 for two decimal places, 1 for integer parameters).
+        The acquisition function is then maximized over the lattice, skipping
+        the nodes already evaluated, and every point is evaluated and
+        registered on its lattice node.
+
+    init_design: str, optional(default='random')
+        How the init_points are laid out: 'random' (independent uniform
+        points), 'sobol' (scrambled Sobol sequence), 'lhs' (Latin hypercube)
+        or 'maximin' (Latin hypercube maximizing the minimum distance between
+        points). The design is generated at once and queued, so that the
+        batch and asynchronous loops can evaluate it in parallel.
+
     Methods
     -------
     probe()
@@ -114,13 +133,19 @@ class BayesianOptimization(Observable):
                  random_state=None,
                  verbose=2,
                  bounds_transformer=None,
-                 allow_duplicate_points=False):
+                 allow_duplicate_points=False,
+                 resolution=None,
+                 init_design='random'):
+        if init_design not in INITIAL_DESIGNS:
+            raise ValueError(f"Unknown initial design '{init_design}', expected one of {INITIAL_DESIGNS}")
+
         self._random_state = ensure_rng(random_state)
         self._allow_duplicate_points = allow_duplicate_points
+        self._init_design = init_design
         self._queue = Queue()
 
         # Internal GP regressor
-        self._gp = GaussianProcessRegressor(
+        self._gp = IncrementalGaussianProcessRegressor(
             kernel=Matern(nu=2.5),
             alpha=1e-6,
             normalize_y=True,
@@ -133,7 +158,8 @@ class BayesianOptimization(Observable):
             # bounds of its domain, and a record of the evaluations we have
             # done so far
             self._space = TargetSpace(f, pbounds, random_state=random_state,
-                                      allow_duplicate_points=self._allow_duplicate_points)
+                                      allow_duplicate_points=self._allow_duplicate_points,
+                                      resolution=resolution)
             self.is_constrained = False
         else:
             constraint_ = ConstraintModel(
@@ -146,7 +172,8 @@ class BayesianOptimization(Observable):
                 f,
                 pbounds,
                 constraint=constraint_,
-                random_state=random_state
+                random_state=random_state,
+                resolution=resolution
             )
             self.is_constrained = True
 
@@ -184,6 +211,36 @@ class BayesianOptimization(Observable):
         self._space.register(params, target, constraint_value)
         self.dispatch(Events.OPTIMIZATION_STEP)
 
+    def register_many(self, params, target, constraint_values=None, skip_duplicates=False):
+        """
+        Expect several observations with known targets, e.g. replayed from
+        logs. The observers are notified once, as for a single step.
+
+        Parameters
+        ----------
+        params : list or ndarray
+            The points, as dicts or as a [num x dim] array.
+
+        target : list or ndarray
+            Their target values.
+
+        constraint_values : list or ndarray, optional
+            Their constraint values, required by a constrained optimizer.
+
+        skip_duplicates : bool, optional (default=False)
+            Leave out the points already registered instead of raising
+            NotUniqueError.
+
+        Returns
+        -------
+        int
+            The number of points registered.
+        """
+        registered = self._space.register_many(params, target, constraint_values, skip_duplicates)
+        if registered:
+            self.dispatch(Events.OPTIMIZATION_STEP)
+        return registered
+
     def probe(self, params, lazy=True):
         """
         Evaluates the function on the given points. Useful to guide the optimizer.
@@ -204,35 +261,189 @@ class BayesianOptimization(Observable):
             self._space.probe(params)
             self.dispatch(Events.OPTIMIZATION_STEP)
 
-    def suggest(self, utility_function):
-        """Most promising point to probe next"""
-        if len(self._space) == 0:
-            return self._space.array_to_params(self._space.random_sample())
-
+    def _fit_models(self):
+        """Fit the GP, and the constraint model, to the registered points"""
         # Sklearn's GP throws a large number of warnings at times, but
         # we don't really need to see them here.
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
             self._gp.fit(self._space.params, self._space.target)
             if self.is_constrained:
                 self.constraint.fit(self._space.params,
                                     self._space._constraint_values)
 
+    def suggest(self, utility_function):
+        """Most promising point to probe next"""
+        if len(self._space) == 0:
+            return self._space.array_to_params(self._space.random_sample())
+
+        self._fit_models()
+
         # Finding argmax of the acquisition function.
         suggestion = acq_max(ac=utility_function.utility,
                              gp=self._gp,
                              constraint=self.constraint,
                              y_max=self._space._target_max(),
                              bounds=self._space.bounds,
-                             random_state=self._random_state)
+                             random_state=self._random_state,
+                             ac_gradient=utility_function.utility_gradient,
+                             **self._lattice_args())
 
         return self._space.array_to_params(suggestion)
 
+    def _lattice_args(self, pending=()):
+        """Arguments of acq_max restricting the search to the lattice nodes not evaluated yet"""
+        if not self._space.is_discrete:
+            return {}
+
+        exclude = set() if self._allow_duplicate_points else set(self._space._cache)
+        exclude.update(tuple(map(float, x)) for x in pending)
+        return {'steps': self._space.steps, 'exclude': exclude}
+
+    def _condition(self, gp, x, strategy, liar):
+        """Add a pending point with a fantasy target and condition a GP on it"""
+        if strategy == 'kriging_believer':
+            fantasy = float(gp.predict(x.reshape(1, -1))[0])
+        else:
+            fantasy = liar
+
+        # The fantasy GP shares the fitted kernel, so that the pending point
+        # is appended to a copy of its factorization, not re-optimized
+        conditioned = deepcopy(gp)
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            try:
+                conditioned.append(x.reshape(1, -1), [fantasy])
+            except np.linalg.LinAlgError:
+                conditioned = clone(gp).set_params(kernel=gp.kernel_, optimizer=None, refit_every=1)
+                conditioned.fit(np.vstack([gp.X_train_, x.reshape(1, -1)]),
+                                np.concatenate([gp._y_observed, [fantasy]]))
+
+        return conditioned
+
+    def suggest_batch(self, utility_function, q, strategy='constant_liar', liar='min', pending=None):
+        """
+        Most promising q points to probe next, to be evaluated at the same time.
+
+        The points are chosen one after the other: each one is added to the
+        data with a fantasy target, and the GP is conditioned on it before the
+        next acquisition maximization, so that the batch does not collapse on
+        a single point. Points still being evaluated are given a fantasy
+        target in the same way. The kernel hyperparameters fitted on the
+        registered points are kept for the whole batch.
+
+        Parameters
+        ----------
+        utility_function: object
+            An instance of bayes_opt.util.UtilityFunction.
+
+        q: int
+            Number of points of the batch.
+
+        strategy: str, optional(default='constant_liar')
+            How the fantasy targets are chosen: 'constant_liar' uses the same
+            value for every pending point, 'kriging_believer' the GP mean.
+
+        liar: str or float, optional(default='min')
+            The value of the constant liar: 'min', 'mean' or 'max' of the
+            registered targets, or a number.
+
+        pending: list, optional
+            The points (dicts or arrays) dispatched but not registered yet.
+
+        Returns
+        -------
+        list of dict
+            The parameters of the q points.
+        """
+        if q < 1:
+            raise ValueError(f"The batch size must be positive, found {q}")
+        if strategy not in ('constant_liar', 'kriging_believer'):
+            raise ValueError(f"Unknown batch strategy '{strategy}', "
+                             "use 'constant_liar' or 'kriging_believer'")
+
+        if len(self._space) == 0:
+            return [self._space.array_to_params(self._space.random_sample())
+                    for _ in range(q)]
+
+        self._fit_models()
+
+        if strategy == 'constant_liar':
+            if isinstance(liar, str):
+                if liar not in ('min', 'mean', 'max'):
+                    raise ValueError(f"Unknown liar '{liar}', use 'min', 'mean', 'max' or a number")
+                liar = float(getattr(np, liar)(self._space.target))
+            else:
+                liar = float(liar)
+
+        gp = self._gp
+
+        pending = [self._space.snap(self._space._as_array(x)) for x in (pending or [])]
+        for x in pending:
+            gp = self._condition(gp, x, strategy, liar)
+
+        batch = []
+        for i in range(q):
+            suggestion = acq_max(ac=utility_function.utility,
+                                 gp=gp,
+                                 constraint=self.constraint,
+                                 y_max=self._space._target_max(),
+                                 bounds=self._space.bounds,
+                                 random_state=self._random_state,
+                                 ac_gradient=utility_function.utility_gradient,
+                                 **self._lattice_args(pending))
+            batch.append(self._space.array_to_params(suggestion))
+            pending.append(suggestion)
+
+            if i < q - 1:
+                gp = self._condition(gp, suggestion, strategy, liar)
+
+        return batch
+
+    def _evaluate(self, params):
+        """Evaluates the target, and the constraint, on a point without registering it"""
+        params = self._space.array_to_params(self._space.snap(self._space._as_array(params)))
+        target = self._space.target_func(**params)
+
+        if self.is_constrained:
+            return params, target, self.constraint.eval(**params)
+        return params, target, None
+
     def _prime_queue(self, init_points):
-        """Make sure there's something in the queue at the very beginning."""
+        """
+        Make sure there's something in the queue at the very beginning.
+
+        Points are evaluated on their lattice node: unless duplicate points
+        are allowed, the queued points whose node is already registered or
+        queued are dropped, and the initial design is topped up until
+        init_points distinct nodes are queued (or the lattice runs out).
+        """
         if self._queue.empty and self._space.empty:
             init_points = max(init_points, 1)
 
-        for _ in range(init_points):
-            self._queue.add(self._space.random_sample())
+        if self._allow_duplicate_points:
+            for x in self._space.initial_design(init_points, self._init_design, unique=False):
+                self._queue.add(x)
+            return
+
+        taken = set(self._space._cache)
+
+        queued = []
+        while not self._queue.empty:
+            queued.append(next(self._queue))
+        for x in queued:
+            node = _hashable(self._space.snap(self._space._as_array(x)))
+            if node not in taken:
+                taken.add(node)
+                self._queue.add(x)
+
+        design = self._space.initial_design(init_points, self._init_design, exclude=taken)
+        for x in design:
+            self._queue.add(x)
+
+        if len(design) < init_points:
+            warnings.warn(f"Only {len(design)} of the {init_points} initial points are distinct lattice nodes "
+                          "not evaluated yet.")
 
     def _prime_subscriptions(self):
         if not any([len(subs) for subs in self._events.values()]):
@@ -311,6 +522,194 @@ class BayesianOptimization(Observable):
 
         self.dispatch(Events.OPTIMIZATION_END)
 
+    def maximize_batch(self,
+                       init_points=5,
+                       n_iter=25,
+                       batch_size=4,
+                       executor=None,
+                       acquisition_function=None,
+                       strategy='constant_liar',
+                       liar='min'):
+        """
+        Probes the target space by batches of points evaluated at the same
+        time, to find the parameters that yield the maximum value for the
+        given function.
+
+        Queued points (init_points and lazy probes) are evaluated first, as a
+        single batch, then each batch is chosen by suggest_batch. Every batch
+        is dispatched to the executor and its results are registered, in the
+        order of the batch, once the whole batch is evaluated.
+
+        Parameters
+        ----------
+        init_points : int, optional(default=5)
+            Number of random points probed before the exploration starts.
+
+        n_iter: int, optional(default=25)
+            Number of suggested points, probed by batches of batch_size.
+
+        batch_size: int, optional(default=4)
+            Number of suggested points evaluated at the same time.
+
+        executor: object, optional
+            An executor with the map method of concurrent.futures.Executor.
+            If nothing is passed, a ThreadPoolExecutor with batch_size workers
+            is used; a process pool needs a picklable target function.
+
+        acquisition_function: object, optional
+            An instance of bayes_opt.util.UtilityFunction.
+            If nothing is passed, a default using ucb is used
+
+        strategy, liar: optional
+            How the points of a batch are diversified, see suggest_batch.
+        """
+        if batch_size < 1:
+            raise ValueError(f"The batch size must be positive, found {batch_size}")
+
+        self._prime_subscriptions()
+        self.dispatch(Events.OPTIMIZATION_START)
+        self._prime_queue(init_points)
+
+        if acquisition_function is None:
+            util = UtilityFunction(kind='ucb',
+                                   kappa=2.576,
+                                   xi=0.0,
+                                   kappa_decay=1,
+                                   kappa_decay_delay=0)
+        else:
+            util = acquisition_function
+
+        own_executor = executor is None
+        if own_executor:
+            executor = ThreadPoolExecutor(max_workers=batch_size)
+
+        try:
+            iteration = 0
+            while not self._queue.empty or iteration < n_iter:
+                # The queued points do not depend on each other: they are
+                # dispatched together, the executor bounds the concurrency
+                batch = []
+                while not self._queue.empty:
+                    batch.append(next(self._queue))
+
+                if not batch:
+                    util.update_params()
+                    size = min(batch_size, n_iter - iteration)
+                    batch = self.suggest_batch(util, size, strategy=strategy, liar=liar)
+                    iteration += size
+
+                for params, target, constraint_value in executor.map(self._evaluate, batch):
+                    self.register(params, target, constraint_value)
+
+                if self._bounds_transformer and iteration > 0:
+                    self.set_bounds(
+                        self._bounds_transformer.transform(self._space))
+        finally:
+            if own_executor:
+                executor.shutdown()
+
+        self.dispatch(Events.OPTIMIZATION_END)
+
+    def maximize_async(self,
+                       init_points=5,
+                       n_iter=25,
+                       workers=4,
+                       executor=None,
+                       acquisition_function=None,
+                       strategy='constant_liar',
+                       liar='min'):
+        """
+        Probes the target space with several evaluations running at the same
+        time, without waiting for each other, to find the parameters that
+        yield the maximum value for the given function.
+
+        Up to workers points are evaluated at once. As soon as an evaluation
+        ends its result is registered and a new point is submitted: a queued
+        point (init_points and lazy probes) if any, otherwise a suggestion that
+        gives a fantasy target to the points still being evaluated.
+
+        If an evaluation raises, the points not started yet are cancelled and
+        the exception is raised once the running evaluations end.
+
+        Parameters
+        ----------
+        init_points : int, optional(default=5)
+            Number of random points probed before the exploration starts.
+
+        n_iter: int, optional(default=25)
+            Number of suggested points.
+
+        workers: int, optional(default=4)
+            Maximum number of evaluations running at the same time.
+
+        executor: object, optional
+            An executor with the submit method of concurrent.futures.Executor.
+            If nothing is passed, a ThreadPoolExecutor with workers threads is
+            used; a process pool needs a picklable target function.
+
+        acquisition_function: object, optional
+            An instance of bayes_opt.util.UtilityFunction.
+            If nothing is passed, a default using ucb is used
+
+        strategy, liar: optional
+            The fantasy targets of the pending points, see suggest_batch.
+        """
+        if workers < 1:
+            raise ValueError(f"The number of workers must be positive, found {workers}")
+
+        self._prime_subscriptions()
+        self.dispatch(Events.OPTIMIZATION_START)
+        self._prime_queue(init_points)
+
+        if acquisition_function is None:
+            util = UtilityFunction(kind='ucb',
+                                   kappa=2.576,
+                                   xi=0.0,
+                                   kappa_decay=1,
+                                   kappa_decay_delay=0)
+        else:
+            util = acquisition_function
+
+        own_executor = executor is None
+        if own_executor:
+            executor = ThreadPoolExecutor(max_workers=workers)
+
+        pending = {}
+        iteration = 0
+
+        try:
+            while True:
+                while len(pending) < workers and (not self._queue.empty or iteration < n_iter):
+                    if not self._queue.empty:
+                        x_probe = next(self._queue)
+                    else:
+                        util.update_params()
+                        x_probe = self.suggest_batch(util, 1, strategy=strategy, liar=liar,
+                                                     pending=list(pending.values()))[0]
+                        iteration += 1
+                    pending[executor.submit(self._evaluate, x_probe)] = x_probe
+
+                if not pending:
+                    break
+
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    del pending[future]
+                    params, target, constraint_value = future.result()
+                    self.register(params, target, constraint_value)
+
+                if self._bounds_transformer and iteration > 0:
+                    self.set_bounds(
+                        self._bounds_transformer.transform(self._space))
+        finally:
+            for future in pending:
+                future.cancel()
+            wait(pending)
+            if own_executor:
+                executor.shutdown()
+
+        self.dispatch(Events.OPTIMIZATION_END)
+
     def set_bounds(self, new_bounds):
         """
         A method that allows changing the lower and upper searching bounds
@@ -323,5 +722,13 @@ class BayesianOptimization(Observable):
         self._space.set_bounds(new_bounds)
 
     def set_gp_params(self, **params):
-        """Set parameters to the internal Gaussian Process Regressor"""
+        """
+        Set parameters to the internal Gaussian Process Regressor, an
+        IncrementalGaussianProcessRegressor: e.g. refit_every=10 appends the
+        new observations to the fit and optimizes the kernel hyperparameters
+        only every 10 observations. The refit schedule also accepts
+        refit_tolerance (refit when the marginal likelihood degrades) and
+        refit_interval (refit on a wall-clock budget, in seconds), and n_jobs
+        runs the optimizer restarts in parallel.
+        """
         self._gp.set_params(**params)
@@ -0,0 +1,264 @@
+import os
+import time
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from numbers import Integral, Real
+from scipy.linalg import cho_solve, cholesky, solve_triangular
+from sklearn.gaussian_process import GaussianProcessRegressor
+
+
+class IncrementalGaussianProcessRegressor(GaussianProcessRegressor):
+    """
+    A GaussianProcessRegressor that appends new observations to its fit by
+    updating the Cholesky factor of the kernel matrix, instead of refitting
+    from scratch.
+
+    Kernel hyperparameters are only optimized at refit points: when fit is
+    called with the previous training data followed by new observations, the
+    new rows are appended with the current hyperparameters (O(n^2) per row
+    instead of the O(n^3) Cholesky decomposition and the optimizer restarts),
+    until the refit schedule asks for a refit. Any other change of the
+    training data triggers a full fit.
+
+    The schedule combines up to three criteria, a refit is due as soon as one
+    of them is met; the ones set to None are ignored.
+
+    Parameters
+    ----------
+    refit_every: int, optional(default=1)
+        Number of appended observations after which the hyperparameters are
+        optimized again. With 1, every fit is a full fit, as with
+        GaussianProcessRegressor.
+
+    refit_tolerance: float, optional(default=None)
+        Refit when the log marginal likelihood per observation drops by more
+        than refit_tolerance below its value at the last refit, i.e. when the
+        new observations are poorly explained by the current hyperparameters.
+
+    refit_interval: float, optional(default=None)
+        Refit when refit_interval seconds have passed since the last refit.
+
+    warm_start: bool, optional(default=True)
+        Start the optimizer of a refit from the hyperparameters of the
+        previous fit, instead of those of kernel. The n_restarts_optimizer
+        other starts are drawn at random, as with GaussianProcessRegressor.
+
+    n_jobs: int, optional(default=None)
+        Number of threads running the optimizer restarts in parallel; None
+        means 1 and -1 means all the processors.
+
+    All other parameters are those of GaussianProcessRegressor.
+    """
+
+    _parameter_constraints = {
+        **getattr(GaussianProcessRegressor, '_parameter_constraints', {}),
+        'refit_every': 'no_validation',
+        'refit_tolerance': 'no_validation',
+        'refit_interval': 'no_validation',
+        'warm_start': 'no_validation',
+        'n_jobs': 'no_validation',
+    }
+
+    def __init__(self,
+                 kernel=None,
+                 *,
+                 alpha=1e-10,
+                 optimizer="fmin_l_bfgs_b",
+                 n_restarts_optimizer=0,
+                 normalize_y=False,
+                 copy_X_train=True,
+                 n_targets=None,
+                 random_state=None,
+                 refit_every=1,
+                 refit_tolerance=None,
+                 refit_interval=None,
+                 warm_start=True,
+                 n_jobs=None):
+        super().__init__(kernel=kernel,
+                         alpha=alpha,
+                         optimizer=optimizer,
+                         n_restarts_optimizer=n_restarts_optimizer,
+                         normalize_y=normalize_y,
+                         copy_X_train=copy_X_train,
+                         n_targets=n_targets,
+                         random_state=random_state)
+        self.refit_every = refit_every
+        self.refit_tolerance = refit_tolerance
+        self.refit_interval = refit_interval
+        self.warm_start = warm_start
+        self.n_jobs = n_jobs
+
+    def _check_schedule(self):
+        def check(name, valid):
+            value = getattr(self, name)
+            if value is not None and (isinstance(value, bool) or not valid(value)):
+                raise ValueError(f"Invalid value for {name}: {value}")
+
+        check('refit_every', lambda v: isinstance(v, Integral) and v >= 1)
+        check('refit_tolerance', lambda v: isinstance(v, Real) and v >= 0)
+        check('refit_interval', lambda v: isinstance(v, Real) and v > 0)
+        check('n_jobs', lambda v: isinstance(v, Integral) and (v >= 1 or v == -1))
+
+    def _can_append(self, X, y):
+        """Whether X and y extend the current training data"""
+        if not hasattr(self, 'L_') or np.ndim(self.alpha) != 0 or y.ndim != 1:
+            return False
+
+        n = len(self.X_train_)
+        return (X.ndim == 2 and X.shape[1] == self.X_train_.shape[1] and len(X) > n
+                and np.array_equal(X[:n], self.X_train_) and np.array_equal(y[:n], self._y_observed))
+
+    def fit(self, X, y):
+        """
+        Fit the Gaussian process, appending the new observations when the
+        data extends the previous fit and no refit is due.
+
+        Parameters
+        ----------
+        X : ndarray of shape (n_samples, n_features)
+            Training data.
+
+        y : ndarray of shape (n_samples,)
+            Target values.
+
+        Returns
+        -------
+        self
+        """
+        self._check_schedule()
+
+        X, y = np.asarray(X, dtype=float), np.asarray(y, dtype=float)
+
+        if self.refit_every != 1 and self._can_append(X, y):
+            n = len(self.X_train_)
+            due = ((self.refit_every is not None and self.n_appended_ + len(X) - n >= self.refit_every)
+                   or (self.refit_interval is not None
+                       and time.monotonic() - self._refit_time >= self.refit_interval))
+            if not due:
+                try:
+                    self.append(X[n:], y[n:])
+                    if (self.refit_tolerance is None
+                            or self._refit_lml - self.log_marginal_likelihood_value_ / len(self.X_train_)
+                            <= self.refit_tolerance):
+                        return self
+                except np.linalg.LinAlgError:
+                    # The updated kernel matrix is not positive definite: refit
+                    pass
+
+        self._refit(X, y)
+        self._y_observed = np.array(y)
+        self.n_appended_ = 0
+        self._refit_time = time.monotonic()
+        self._refit_lml = self.log_marginal_likelihood_value_ / len(self.X_train_)
+        return self
+
+    def _fit_kernel(self, X, y, kernel):
+        """Fit with the hyperparameters of kernel, without optimizing them"""
+        params = self.kernel, self.optimizer
+        self.kernel, self.optimizer = kernel, None
+        try:
+            super().fit(X, y)
+        finally:
+            self.kernel, self.optimizer = params
+
+    def _refit(self, X, y):
+        """
+        Full fit, optimizing the hyperparameters from the previous ones (when
+        warm_start) and from n_restarts_optimizer random starts, in parallel
+        when n_jobs is set.
+        """
+        warm = self.warm_start and hasattr(self, 'kernel_')
+        n_jobs = os.cpu_count() if self.n_jobs == -1 else (self.n_jobs or 1)
+
+        if self.optimizer is None or (not warm and n_jobs == 1):
+            super().fit(X, y)
+            return
+
+        # Fit with the starting hyperparameters, setting the training data the
+        # optimization needs, then look for better ones
+        self._fit_kernel(X, y, self.kernel_ if warm else self.kernel)
+        if self.kernel_.n_dims == 0:
+            return
+
+        bounds = self.kernel_.bounds
+        starts = [self.kernel_.theta]
+        if self.n_restarts_optimizer > 0:
+            if not np.isfinite(bounds).all():
+                raise ValueError("Multiple optimizer restarts (n_restarts_optimizer>0) "
+                                 "requires that all bounds are finite.")
+            starts += [self._rng.uniform(bounds[:, 0], bounds[:, 1])
+                       for _ in range(self.n_restarts_optimizer)]
+
+        def obj_func(theta):
+            # The kernel is cloned, so that the restarts can run concurrently
+            lml, grad = self.log_marginal_likelihood(theta, eval_gradient=True, clone_kernel=True)
+            return -lml, -grad
+
+        def optimize(theta):
+            return self._constrained_optimization(obj_func, theta, bounds)
+
+        if n_jobs == 1 or len(starts) == 1:
+            optima = [optimize(theta) for theta in starts]
+        else:
+            with ThreadPoolExecutor(max_workers=min(n_jobs, len(starts))) as executor:
+                optima = list(executor.map(optimize, starts))
+
+        theta, lml = min(optima, key=lambda optimum: optimum[1])
+        if -lml > self.log_marginal_likelihood_value_:
+            self._fit_kernel(X, y, self.kernel_.clone_with_theta(theta))
+
+    def append(self, X, y):
+        """
+        Append observations to the fit, keeping the kernel hyperparameters.
+
+        Parameters
+        ----------
+        X : ndarray of shape (n_new, n_features)
+            The new points.
+
+        y : ndarray of shape (n_new,)
+            Their target values.
+
+        Returns
+        -------
+        self
+
+        Raises
+        ------
+        numpy.linalg.LinAlgError
+            If the updated kernel matrix is not positive definite.
+        """
+        X, y = np.atleast_2d(np.asarray(X, dtype=float)), np.atleast_1d(np.asarray(y, dtype=float))
+
+        # Block update of the lower Cholesky factor:
+        # [[K11, K12], [K21, K22]] = [[L11, 0], [L21, L22]] [[L11, 0], [L21, L22]]^T
+        K12 = self.kernel_(self.X_train_, X)
+        K22 = self.kernel_(X)
+        K22[np.diag_indices_from(K22)] += self.alpha
+
+        L21 = solve_triangular(self.L_, K12, lower=True, check_finite=False).T
+        L22 = cholesky(K22 - L21 @ L21.T, lower=True, check_finite=False)
+
+        n, m = len(self.X_train_), len(X)
+        L = np.zeros((n + m, n + m))
+        L[:n, :n] = self.L_
+        L[n:, :n] = L21
+        L[n:, n:] = L22
+
+        self.L_ = L
+        self.X_train_ = np.vstack([self.X_train_, X])
+        self._y_observed = np.concatenate([self._y_observed, y])
+
+        if self.normalize_y:
+            self._y_train_mean = np.mean(self._y_observed, axis=0)
+            std = np.std(self._y_observed, axis=0)
+            self._y_train_std = std if std > 10 * np.finfo(float).eps else 1.
+
+        self.y_train_ = (self._y_observed - self._y_train_mean) / self._y_train_std
+        self.alpha_ = cho_solve((self.L_, True), self.y_train_, check_finite=False)
+
+        self.log_marginal_likelihood_value_ = (-0.5 * self.y_train_ @ self.alpha_
+                                               - np.log(np.diag(self.L_)).sum()
+                                               - 0.5 * len(self.y_train_) * np.log(2 * np.pi))
+        self.n_appended_ += m
+        return self
@@ -6,7 +6,7 @@ import toml
 
 #from library.path import Path
 
-from .util import ensure_rng, NotUniqueError
+from .util import ensure_rng, snap_to_lattice, space_filling_design, NotUniqueError
 from .util import Colours
 
 
@@ -33,7 +33,7 @@ class TargetSpace(object):
     """
 
     def __init__(self, target_func, pbounds, constraint=None, random_state=None,
-                 allow_duplicate_points=False):
+                 allow_duplicate_points=False, resolution=None):
         """
         Parameters
         ----------
@@ -52,6 +52,12 @@ class TargetSpace(object):
             This behavior may be desired in high noise situations where repeatedly probing
             the same point will give different answers. In other situations, the acquisition
             may occasionally generate a duplicate point.
+
+        resolution: dict, optional
+            Dictionary with parameters names as keys and the step of their
+            lattice as values (e.g. 0.01 for two decimal places, 1 for integer
+            parameters). Points are snapped to the lattice before being
+            evaluated; parameters not listed are continuous.
         """
         self.random_state = ensure_rng(random_state)
         self._allow_duplicate_points = allow_duplicate_points
@@ -68,9 +74,15 @@ class TargetSpace(object):
             dtype=float
         )
 
-        # preallocated memory for X and Y points
-        self._params = np.empty(shape=(0, self.dim))
-        self._target = np.empty(shape=(0))
+        # Lattice step of each parameter, 0 for continuous parameters
+        self._steps = np.zeros(self.dim)
+        self.set_resolution(resolution or {})
+
+        # preallocated memory for X and Y points, the first _n rows are used
+        # and the capacity doubles when full
+        self._n = 0
+        self._params_buffer = np.empty(shape=(0, self.dim))
+        self._target_buffer = np.empty(shape=(0))
 
         # keep track of unique points we have seen so far
         self._cache = {}
@@ -80,16 +92,51 @@ class TargetSpace(object):
         if constraint is not None:
             # preallocated memory for constraint fulfillment
             if constraint.lb.size == 1:
-                self._constraint_values = np.empty(shape=(0), dtype=float)
+                self._constraint_buffer = np.empty(shape=(0), dtype=float)
             else:
-                self._constraint_values = np.empty(shape=(0, constraint.lb.size), dtype=float)
+                self._constraint_buffer = np.empty(shape=(0, constraint.lb.size), dtype=float)
 
     def __contains__(self, x):
         return _hashable(x) in self._cache
 
     def __len__(self):
-        assert len(self._params) == len(self._target)
-        return len(self._target)
+        return self._n
+
+    @staticmethod
+    def _view(buffer, n):
+        """Read-only view of the first n rows of a buffer"""
+        view = buffer[:n]
+        view.flags.writeable = False
+        return view
+
+    @property
+    def _params(self):
+        return self._view(self._params_buffer, self._n)
+
+    @property
+    def _target(self):
+        return self._view(self._target_buffer, self._n)
+
+    @property
+    def _constraint_values(self):
+        return self._view(self._constraint_buffer, self._n)
+
+    def _reserve(self, n):
+        """Grows the buffers, doubling their capacity, to hold n points"""
+        capacity = len(self._target_buffer)
+        if n <= capacity:
+            return
+
+        capacity = max(n, 2 * capacity, 16)
+        names = ['_params_buffer', '_target_buffer']
+        if self._constraint is not None:
+            names.append('_constraint_buffer')
+
+        for name in names:
+            old = getattr(self, name)
+            new = np.empty((capacity,) + old.shape[1:], dtype=old.dtype)
+            new[:self._n] = old[:self._n]
+            setattr(self, name, new)
 
     @property
     def empty(self):
@@ -119,6 +166,24 @@ class TargetSpace(object):
     def constraint(self):
         return self._constraint
 
+    @property
+    def steps(self):
+        return self._steps
+
+    @property
+    def is_discrete(self):
+        return bool(np.any(self._steps > 0))
+
+    @property
+    def lattice_size(self):
+        """Number of lattice nodes within the bounds, inf if a parameter is continuous"""
+        if not np.all(self._steps > 0):
+            return np.inf
+
+        lower = np.ceil(self._bounds[:, 0] / self._steps - 1e-9)
+        upper = np.floor(self._bounds[:, 1] / self._steps + 1e-9)
+        return int(np.prod(np.maximum(upper - lower + 1, 1)))
+
     @property
     def constraint_values(self):
         if self._constraint is not None:
@@ -144,6 +209,40 @@ class TargetSpace(object):
             )
         return dict(zip(self.keys, x))
 
+    def set_resolution(self, resolution):
+        """
+        Sets the lattice step of some parameters
+
+        Parameters
+        ----------
+        resolution : dict
+            A dictionary with the parameter name and its step, 0 or None
+            for a continuous parameter
+        """
+        for row, key in enumerate(self.keys):
+            if key in resolution:
+                step = resolution[key] or 0.
+                if step < 0:
+                    raise ValueError(f"The resolution of '{key}' must be positive, found {step}")
+                self._steps[row] = step
+
+    def snap(self, x):
+        """
+        Moves a point, or an array of points, to the nearest lattice point
+        within the bounds. Continuous parameters are left untouched.
+
+        Parameters
+        ----------
+        x : ndarray
+            a point, or a [num x dim] array of points
+
+        Returns
+        -------
+        ndarray
+            the snapped points, with the shape of x
+        """
+        return snap_to_lattice(x, self._bounds, self._steps)
+
     def _as_array(self, x):
         try:
             x = np.asarray(x, dtype=float)
@@ -202,21 +301,105 @@ class TargetSpace(object):
                 raise NotUniqueError(f'Data point {x} is not unique. You can set "allow_duplicate_points=True" to '
                                      f'avoid this error')
 
-        self._params = np.concatenate([self._params, x.reshape(1, -1)])
-        self._target = np.concatenate([self._target, [target]])
+        if self._constraint is not None and constraint_value is None:
+            msg = ("When registering a point to a constrained TargetSpace" +
+                   " a constraint value needs to be present.")
+            raise ValueError(msg)
+
+        self._reserve(self._n + 1)
+        self._params_buffer[self._n] = x
+        self._target_buffer[self._n] = target
 
         if self._constraint is None:
             # Insert data into unique dictionary
             self._cache[_hashable(x.ravel())] = target
         else:
-            if constraint_value is None:
+            # Insert data into unique dictionary
+            self._cache[_hashable(x.ravel())] = (target, constraint_value)
+            self._constraint_buffer[self._n] = constraint_value
+
+        self._n += 1
+
+    def register_many(self, params, target, constraint_values=None, skip_duplicates=False):
+        """
+        Append several points and their target values to the known data,
+        growing the buffers once.
+
+        Parameters
+        ----------
+        params : list or ndarray
+            the points, as dicts or as a [num x dim] array
+
+        target : list or ndarray
+            their target function values
+
+        constraint_values : list or ndarray, optional
+            their constraint values, required by a constrained TargetSpace
+
+        skip_duplicates : bool, optional (default=False)
+            If True, the points already known (or repeated in params) are left
+            out instead of raising NotUniqueError. Ignored when duplicate
+            points are allowed.
+
+        Returns
+        -------
+        int
+            the number of points registered
+
+        Raises
+        ------
+        NotUniqueError:
+            if a point is not unique; no point is registered then
+        """
+        if isinstance(params, np.ndarray):
+            X = params.astype(float).reshape(len(params), -1)
+            if X.shape[1] != self.dim:
+                raise ValueError(
+                    "Size of array ({}) is different than the ".format(X.shape[1]) +
+                    "expected number of parameters ({}).".format(len(self.keys)))
+        else:
+            X = np.array([self._as_array(x) for x in params], dtype=float).reshape(-1, self.dim)
+        target = np.asarray(target, dtype=float).ravel()
+        if len(target) != len(X):
+            raise ValueError(f"Found {len(X)} points and {len(target)} target values.")
+
+        if self._constraint is not None:
+            if constraint_values is None:
                 msg = ("When registering a point to a constrained TargetSpace" +
                        " a constraint value needs to be present.")
                 raise ValueError(msg)
-            # Insert data into unique dictionary
-            self._cache[_hashable(x.ravel())] = (target, constraint_value)
-            self._constraint_values = np.concatenate([self._constraint_values,
-                                                      [constraint_value]])
+            constraint_values = np.asarray(constraint_values, dtype=float)
+            constraint_values = constraint_values.reshape((len(X),) + self._constraint_buffer.shape[1:])
+
+        # tolist converts to python floats at once, as _hashable does
+        keys = list(map(tuple, X.tolist()))
+        seen = set()
+        keep = []
+        for i, key in enumerate(keys):
+            if key in self._cache or key in seen:
+                if self._allow_duplicate_points:
+                    self.n_duplicate_points = self.n_duplicate_points + 1
+                elif skip_duplicates:
+                    continue
+                else:
+                    raise NotUniqueError(f'Data point {X[i]} is not unique. You can set "allow_duplicate_points=True" to '
+                                         f'avoid this error')
+            seen.add(key)
+            keep.append(i)
+
+        n, m = self._n, len(keep)
+        self._reserve(n + m)
+        self._params_buffer[n:n + m] = X[keep]
+        self._target_buffer[n:n + m] = target[keep]
+
+        if self._constraint is None:
+            self._cache.update((keys[i], target[i]) for i in keep)
+        else:
+            self._constraint_buffer[n:n + m] = constraint_values[keep]
+            self._cache.update((keys[i], (target[i], constraint_values[i])) for i in keep)
+
+        self._n += m
+        return m
 
     def probe(self, params):
         """
@@ -237,7 +420,7 @@ class TargetSpace(object):
         y : float
             target function value.
         """
-        x = self._as_array(params)
+        x = self.snap(self._as_array(params))
         params = dict(zip(self._keys, x))
 
         # ***************************************************
@@ -284,10 +467,60 @@ class TargetSpace(object):
         >>> space.random_points(1)
         array([[ 55.33253689,   0.54488318]])
         """
-        data = np.empty((1, self.dim))
-        for col, (lower, upper) in enumerate(self._bounds):
-            data.T[col] = self.random_state.uniform(lower, upper, size=1)
-        return data.ravel()
+        data = self.random_state.uniform(self._bounds[:, 0], self._bounds[:, 1])
+        return self.snap(data)
+
+    def initial_design(self, n, method='random', exclude=None, unique=True):
+        """
+        Creates a design of n points within the bounds of the space, snapped
+        to the lattice, as a single array.
+
+        Points snapped on the same lattice node are kept once, and the nodes
+        in exclude are left out: new designs are drawn to top up the n
+        points, until the lattice runs out.
+
+        Parameters
+        ----------
+        n : int
+            number of points
+
+        method : str, optional (default='random')
+            'random', 'sobol' (scrambled Sobol sequence), 'lhs' (Latin
+            hypercube) or 'maximin' (Latin hypercube maximizing the minimum
+            distance between points), see util.space_filling_design
+
+        exclude : set, optional
+            nodes (as tuples of floats) that must not be returned, e.g. the
+            points already registered
+
+        unique : bool, optional (default=True)
+            If False, the snapped design is returned as drawn.
+
+        Returns
+        ----------
+        data: ndarray
+            [num x dim] array of points with dimensions corresponding to
+            `self._keys`, num < n only if the lattice runs out
+        """
+        lower, upper = self._bounds[:, 0], self._bounds[:, 1]
+
+        if not unique:
+            unit = space_filling_design(n, self.dim, self.random_state, method)
+            return self.snap(lower + unit * (upper - lower))
+
+        taken = set(exclude or ())
+        rows = []
+        for _ in range(100):
+            if len(rows) == n or len(taken) >= self.lattice_size:
+                break
+
+            unit = space_filling_design(n, self.dim, self.random_state, method)
+            for x in self.snap(lower + unit * (upper - lower)):
+                if len(rows) < n and _hashable(x) not in taken:
+                    taken.add(_hashable(x))
+                    rows.append(x)
+
+        return np.array(rows).reshape(-1, self.dim)
 
     def _target_max(self):
         """Get maximum target value found.
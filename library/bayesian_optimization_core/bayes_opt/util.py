@@ -1,12 +1,236 @@
 import warnings
 import numpy as np
 from scipy.stats import norm
+from scipy.linalg import cho_solve
 from scipy.optimize import minimize
+from sklearn.gaussian_process import kernels
 from colorama import just_fix_windows_console
 import json
 
 
-def acq_max(ac, gp, y_max, bounds, random_state, constraint=None, n_warmup=10000, n_iter=10):
+def snap_to_lattice(x, bounds, steps):
+    """
+    Moves points to the nearest node of a lattice within the bounds.
+
+    Parameters
+    ----------
+    :param x:
+        A point, or a [num x dim] array of points.
+
+    :param bounds:
+        The variables bounds.
+
+    :param steps:
+        The lattice step of each variable, 0 for continuous variables.
+
+    Returns
+    -------
+    :return: The snapped points, with the shape of x.
+    """
+    x = np.array(x, dtype=float)
+    discrete = steps > 0
+    if not np.any(discrete):
+        return x
+
+    steps = steps[discrete]
+    lower, upper = bounds[discrete, 0], bounds[discrete, 1]
+
+    values = np.round(np.clip(x[..., discrete], lower, upper) / steps) * steps
+    # Nodes rounded out of the bounds are moved one step inside
+    values = np.where(values < lower - 1e-12 * steps, values + steps, values)
+    values = np.where(values > upper + 1e-12 * steps, values - steps, values)
+
+    # Decimal steps are applied exactly, so that equal nodes have equal values
+    decimals = np.clip(np.ceil(-np.log10(steps)).astype(int) + 1, 0, 15)
+    for i, d in enumerate(decimals):
+        values[..., i] = np.round(values[..., i], d)
+
+    x[..., discrete] = values
+    return x
+
+
+INITIAL_DESIGNS = ['random', 'sobol', 'lhs', 'maximin']
+
+
+def _latin_hypercube(n, dim, random_state):
+    """A Latin hypercube design of n points in the unit cube"""
+    cells = np.array([random_state.permutation(n) for _ in range(dim)]).T
+    return (cells + random_state.uniform(size=(n, dim))) / n
+
+
+def space_filling_design(n, dim, random_state, method='random', candidates=20):
+    """
+    Creates a design of n points in the unit cube, all at once.
+
+    Parameters
+    ----------
+    :param n:
+        The number of points.
+
+    :param dim:
+        The number of variables.
+
+    :param random_state:
+        instance of np.RandomState random number generator
+
+    :param method:
+        'random' for independent uniform points, 'sobol' for a scrambled Sobol
+        sequence, 'lhs' for a Latin hypercube, 'maximin' for the Latin
+        hypercube with the largest minimum distance between its points among
+        `candidates` ones. Without scipy.stats.qmc, 'sobol' falls back to a
+        Latin hypercube.
+
+    :param candidates:
+        The number of Latin hypercubes compared by 'maximin'.
+
+    Returns
+    -------
+    :return: The [n x dim] array of points.
+    """
+    if method not in INITIAL_DESIGNS:
+        raise ValueError(f"Unknown initial design '{method}', expected one of {INITIAL_DESIGNS}")
+
+    if method == 'random' or n == 0:
+        return random_state.uniform(size=(n, dim))
+
+    if method == 'sobol':
+        try:
+            from scipy.stats import qmc
+        except ImportError:
+            warnings.warn("scipy.stats.qmc is not available, using a Latin hypercube instead of a Sobol sequence.")
+            return _latin_hypercube(n, dim, random_state)
+
+        engine = qmc.Sobol(dim, scramble=True, seed=random_state.randint(2 ** 31 - 1))
+        with warnings.catch_warnings():
+            # The balance of the sequence is best for powers of 2, any n is accepted
+            warnings.simplefilter("ignore")
+            return engine.random(n)
+
+    if method == 'lhs' or n == 1:
+        return _latin_hypercube(n, dim, random_state)
+
+    best, best_distance = None, -np.inf
+    for _ in range(candidates):
+        design = _latin_hypercube(n, dim, random_state)
+        distances = np.sum((design[:, None, :] - design[None, :, :]) ** 2, axis=-1)
+        distance = distances[np.triu_indices(n, k=1)].min()
+        if distance > best_distance:
+            best, best_distance = design, distance
+
+    return best
+
+
+def _lattice_neighbours(x, bounds, steps, max_discrete=10):
+    """The lattice nodes of the cell containing x (the nearest node only beyond max_discrete variables)"""
+    discrete = np.flatnonzero(steps > 0)
+    if len(discrete) > max_discrete:
+        return snap_to_lattice(x, bounds, steps).reshape(1, -1)
+
+    lower = np.floor(x[discrete] / steps[discrete]) * steps[discrete]
+    corners = np.array(np.meshgrid(*[[0., 1.]] * len(discrete))).reshape(len(discrete), -1).T
+
+    nodes = np.tile(x, (len(corners), 1))
+    nodes[:, discrete] = lower + corners * steps[discrete]
+    return snap_to_lattice(nodes, bounds, steps)
+
+
+def _kernel_gradient(kernel, x, X):
+    """
+    k(x, X) and its gradient with respect to x, of shapes [n x m] and
+    [n x m x dim], for sums and products of the stationary kernels RBF,
+    Matern (nu in 0.5, 1.5, 2.5, inf), ConstantKernel and WhiteKernel.
+    None for any other kernel.
+    """
+    if isinstance(kernel, (kernels.Sum, kernels.Product)):
+        k1, k2 = _kernel_gradient(kernel.k1, x, X), _kernel_gradient(kernel.k2, x, X)
+        if k1 is None or k2 is None:
+            return None
+        if isinstance(kernel, kernels.Sum):
+            return k1[0] + k2[0], k1[1] + k2[1]
+        return k1[0] * k2[0], k1[1] * k2[0][..., None] + k1[0][..., None] * k2[1]
+
+    if isinstance(kernel, (kernels.ConstantKernel, kernels.WhiteKernel)):
+        K = kernel(x, X)
+        return K, np.zeros(K.shape + (x.shape[1],))
+
+    if not isinstance(kernel, kernels.RBF):
+        return None
+
+    nu = kernel.nu if isinstance(kernel, kernels.Matern) else np.inf
+    if nu not in [0.5, 1.5, 2.5, np.inf]:
+        return None
+
+    length_scale = np.asarray(kernel.length_scale, dtype=float)
+    diff = (x[:, None, :] - X[None, :, :]) / length_scale
+    r = np.sqrt(np.sum(diff ** 2, axis=-1))
+
+    # dK/dx = dK/dr * diff / (length_scale * r), with the 1 / r simplified
+    if nu == 0.5:
+        K = np.exp(-r)
+        scale = -K / np.where(r > 0, r, np.inf)
+    elif nu == 1.5:
+        K = (1. + np.sqrt(3) * r) * np.exp(-np.sqrt(3) * r)
+        scale = -3. * np.exp(-np.sqrt(3) * r)
+    elif nu == 2.5:
+        K = (1. + np.sqrt(5) * r + 5. / 3. * r ** 2) * np.exp(-np.sqrt(5) * r)
+        scale = -5. / 3. * (1. + np.sqrt(5) * r) * np.exp(-np.sqrt(5) * r)
+    else:
+        K = np.exp(-.5 * r ** 2)
+        scale = -K
+
+    return K, scale[..., None] * diff / length_scale
+
+
+def gp_posterior(gp):
+    """
+    Posterior of a fitted GaussianProcessRegressor with its gradient.
+
+    The inverse of the kernel matrix is computed once from the Cholesky
+    factor of the fit, so that each evaluation at a point costs products with
+    the training kernel vector instead of the triangular solves of predict.
+
+    Parameters
+    ----------
+    :param gp:
+        A gaussian process fitted to one target.
+
+    Returns
+    -------
+    :return: A function of x [num x dim] returning the posterior mean and
+        standard deviation [num] and their gradients [num x dim], or None if
+        the gradient of the kernel is not known.
+    """
+    if not hasattr(gp, 'L_') or np.ndim(gp.alpha_) != 1:
+        return None
+
+    kernel, X_train = gp.kernel_, gp.X_train_
+    if _kernel_gradient(kernel, X_train[:1], X_train[:1]) is None:
+        return None
+
+    K_inv = cho_solve((gp.L_, True), np.eye(len(X_train)), check_finite=False)
+    y_mean, y_std = np.squeeze(gp._y_train_mean), np.squeeze(gp._y_train_std)
+
+    def posterior(x):
+        x = np.atleast_2d(x)
+        K, dK = _kernel_gradient(kernel, x, X_train)
+        K_inv_K = K @ K_inv
+
+        mean = K @ gp.alpha_
+        var = np.maximum(kernel.diag(x) - np.sum(K_inv_K * K, axis=1), 0.)
+        std = np.sqrt(var)
+
+        # The kernels are stationary: k(x, x) does not depend on x
+        d_mean = np.einsum('nmd,m->nd', dK, gp.alpha_)
+        d_var = -2. * np.einsum('nm,nmd->nd', K_inv_K, dK)
+        d_std = np.divide(d_var, 2. * std[:, None], out=np.zeros_like(d_var), where=std[:, None] > 0)
+
+        return mean * y_std + y_mean, std * y_std, d_mean * y_std, d_std * y_std
+
+    return posterior
+
+
+def acq_max(ac, gp, y_max, bounds, random_state, constraint=None, n_warmup=10000, n_iter=10,
+            steps=None, exclude=None, ac_gradient=None):
     """
     A function to find the maximum of the acquisition function
 
@@ -14,6 +238,11 @@ def acq_max(ac, gp, y_max, bounds, random_state, constraint=None, n_warmup=10000
     optimization method. First by sampling `n_warmup` (1e5) points at random,
     and then running L-BFGS-B from `n_iter` (250) random starting points.
 
+    With ac_gradient, and no constraint, the `n_iter` runs are a single
+    L-BFGS-B problem over all the starting points, using the analytic
+    gradient of the acquisition function; otherwise each run estimates the
+    gradient by finite differences.
+
     Parameters
     ----------
     :param ac:
@@ -40,6 +269,21 @@ def acq_max(ac, gp, y_max, bounds, random_state, constraint=None, n_warmup=10000
     :param n_iter:
         number of times to run scipy.minimize
 
+    :param steps:
+        The lattice step of each variable, 0 for continuous variables. When
+        given, the acquisition function is maximized over the lattice nodes:
+        the nodes around the continuous maxima and the warm-up points.
+
+    :param exclude:
+        The points (as tuples of floats) that must not be returned, e.g. the
+        lattice nodes already evaluated. Only used with steps.
+
+    :param ac_gradient:
+        A function of (x, posterior, y_max) returning the values of the
+        acquisition function and their gradients, such as
+        UtilityFunction.utility_gradient, posterior being the function
+        returned by gp_posterior.
+
     Returns
     -------
     :return: x_max, The arg max of the acquisition function.
@@ -89,25 +333,73 @@ def acq_max(ac, gp, y_max, bounds, random_state, constraint=None, n_warmup=10000
     x_seeds = random_state.uniform(bounds[:, 0], bounds[:, 1],
                                    size=(n_iter, bounds.shape[0]))
 
-    for x_try in x_seeds:
-        # Find the minimum of minus the acquisition function
-        res = minimize(adjusted_ac,
-                       x_try,
-                       bounds=bounds,
+    local_maxima = [x_max]
+
+    posterior = gp_posterior(gp) if ac_gradient is not None and constraint is None else None
+
+    if posterior is not None:
+        dim = bounds.shape[0]
+
+        def batched_ac(x):
+            """Sum of minus the acquisition function at every start, with its gradient"""
+            values, gradients = ac_gradient(x.reshape(-1, dim), posterior, y_max)
+            return -np.sum(values), -gradients.ravel()
+
+        # The runs are independent: the sum of their objectives is minimized
+        # at once, with one evaluation of the posterior for all of them
+        res = minimize(batched_ac,
+                       x_seeds.ravel(),
+                       jac=True,
+                       bounds=np.tile(bounds, (n_iter, 1)),
                        method="L-BFGS-B")
 
-        # See if success
-        if not res.success:
-            continue
+        x_locals = np.clip(res.x.reshape(-1, dim), bounds[:, 0], bounds[:, 1])
+        ys = -adjusted_ac(x_locals)
+        local_maxima.extend(x_locals)
+
+        if ys.max() >= max_acq:
+            x_max = x_locals[ys.argmax()]
+            max_acq = ys.max()
+    else:
+        for x_try in x_seeds:
+            # Find the minimum of minus the acquisition function
+            res = minimize(adjusted_ac,
+                           x_try,
+                           bounds=bounds,
+                           method="L-BFGS-B")
+
+            # See if success
+            if not res.success:
+                continue
 
-        # Store it if better than previous minimum(maximum).
-        if max_acq is None or -np.squeeze(res.fun) >= max_acq:
-            x_max = res.x
-            max_acq = -np.squeeze(res.fun)
+            local_maxima.append(np.clip(res.x, bounds[:, 0], bounds[:, 1]))
+
+            # Store it if better than previous minimum(maximum).
+            if max_acq is None or -np.squeeze(res.fun) >= max_acq:
+                x_max = res.x
+                max_acq = -np.squeeze(res.fun)
 
     # Clip output to make sure it lies within the bounds. Due to floating
     # point technicalities this is not always the case.
-    return np.clip(x_max, bounds[:, 0], bounds[:, 1])
+    x_max = np.clip(x_max, bounds[:, 0], bounds[:, 1])
+
+    if steps is None or not np.any(steps > 0):
+        return x_max
+
+    # Maximize over the lattice nodes around the continuous maxima and those
+    # of the warm-up points, leaving out the excluded ones
+    nodes = np.unique(np.vstack(
+        [_lattice_neighbours(x, bounds, steps) for x in [x_max] + local_maxima]
+        + [snap_to_lattice(x_tries, bounds, steps)]), axis=0)
+
+    if exclude:
+        allowed = np.array([tuple(map(float, node)) not in exclude for node in nodes])
+        if np.any(allowed):
+            nodes = nodes[allowed]
+        else:
+            warnings.warn("Every lattice node found was already evaluated.")
+
+    return nodes[np.argmax(-adjusted_ac(nodes))]
 
 
 class UtilityFunction(object):
@@ -167,6 +459,42 @@ class UtilityFunction(object):
         if self.kind == 'poi':
             return self._poi(x, gp, y_max, self.xi)
 
+    def utility_gradient(self, x, posterior, y_max):
+        """
+        Values of the acquisition function at x and their gradients.
+
+        Parameters
+        ----------
+        x : ndarray of shape (n_points, n_features)
+            The points.
+
+        posterior : callable
+            The posterior of the gaussian process, returned by gp_posterior.
+
+        y_max : float
+            The current maximum known value of the target function.
+
+        Returns
+        -------
+        values : ndarray of shape (n_points,)
+
+        gradients : ndarray of shape (n_points, n_features)
+        """
+        mean, std, d_mean, d_std = posterior(x)
+
+        if self.kind == 'ucb':
+            return mean + self.kappa * std, d_mean + self.kappa * d_std
+
+        std = np.maximum(std, 1e-12)
+        z = (mean - y_max - self.xi) / std
+
+        if self.kind == 'ei':
+            a = mean - y_max - self.xi
+            values = a * norm.cdf(z) + std * norm.pdf(z)
+            return values, norm.cdf(z)[:, None] * d_mean + norm.pdf(z)[:, None] * d_std
+
+        return norm.cdf(z), (norm.pdf(z) / std)[:, None] * (d_mean - z[:, None] * d_std)
+
     @staticmethod
     def _ucb(x, gp, kappa):
         with warnings.catch_warnings():
@@ -209,23 +537,20 @@ def load_logs(optimizer, logs):
     if isinstance(logs, str):
         logs = [logs]
 
+    params, target, constraint_values = [], [], []
     for log in logs:
         with open(log, "r") as j:
-            while True:
-                try:
-                    iteration = next(j)
-                except StopIteration:
-                    break
-
+            for iteration in j:
                 iteration = json.loads(iteration)
-                try:
-                    optimizer.register(
-                        params=iteration["params"],
-                        target=iteration["target"],
-                        constraint_value=iteration["constraint"] if optimizer.is_constrained else None
-                    )
-                except NotUniqueError:
-                    continue
+                params.append(iteration["params"])
+                target.append(iteration["target"])
+                if optimizer.is_constrained:
+                    constraint_values.append(iteration["constraint"])
+
+    # The points already registered, or repeated in the logs, are left out
+    optimizer.register_many(params, target,
+                            constraint_values if optimizer.is_constrained else None,
+                            skip_duplicates=True)
 
     return optimizer
 
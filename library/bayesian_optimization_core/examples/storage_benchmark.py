@@ -0,0 +1,85 @@
+"""
+Micro-benchmarks of the storage of the optimizer: registering points in a
+TargetSpace one at a time and in bulk, and draining a Queue.
+
+Each case is compared with the former implementation (np.concatenate on every
+register, list slicing on every dequeue), whose cost grows quadratically with
+the number of points.
+
+Usage:
+    python examples/storage_benchmark.py [--sizes 1000 5000 20000] [--repeat 3]
+"""
+import os
+import sys
+import argparse
+from timeit import repeat
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from bayes_opt.bayesian_optimization import Queue
+from bayes_opt.target_space import TargetSpace
+
+
+PBOUNDS = {'x': (0, 1), 'y': (0, 1), 'z': (0, 1)}
+
+
+def register_one_by_one(X, y):
+    space = TargetSpace(None, PBOUNDS)
+    for x, target in zip(X, y):
+        space.register(x, target)
+
+
+def register_many(X, y):
+    space = TargetSpace(None, PBOUNDS)
+    space.register_many(X, y)
+
+
+def register_concatenate(X, y):
+    params, target = np.empty((0, X.shape[1])), np.empty(0)
+    for x, t in zip(X, y):
+        params = np.concatenate([params, x.reshape(1, -1)])
+        target = np.concatenate([target, [t]])
+
+
+def queue_deque(n):
+    queue = Queue()
+    for i in range(n):
+        queue.add(i)
+    while not queue.empty:
+        next(queue)
+
+
+def queue_slicing(n):
+    queue = list(range(n))
+    while queue:
+        queue = queue[1:]
+
+
+def main(args):
+    rng = np.random.RandomState(0)
+
+    print(f"{'case':24}" + ''.join(f"{n:>12}" for n in args.sizes))
+    cases = [
+        ('register', lambda X, y: register_one_by_one(X, y)),
+        ('register_many', lambda X, y: register_many(X, y)),
+        ('register (concatenate)', lambda X, y: register_concatenate(X, y)),
+        ('queue (deque)', lambda X, y: queue_deque(len(X))),
+        ('queue (list slicing)', lambda X, y: queue_slicing(len(X))),
+    ]
+
+    for name, case in cases:
+        timings = []
+        for n in args.sizes:
+            X, y = rng.uniform(size=(n, len(PBOUNDS))), rng.uniform(size=n)
+            timings.append(min(repeat(lambda: case(X, y), number=1, repeat=args.repeat)))
+        print(f"{name:24}" + ''.join(f"{t * 1000:10.1f}ms" for t in timings))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Storage micro-benchmarks of TargetSpace and Queue')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 5000, 20000], help='Numbers of points')
+    parser.add_argument('--repeat', type=int, default=3, help='Measures per case, the fastest one is kept')
+
+    main(parser.parse_args())
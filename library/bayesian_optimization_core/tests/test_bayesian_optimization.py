@@ -384,6 +384,185 @@ def test_duplicate_points():
     )
 
 
+def test_suggest_batch():
+    util = UtilityFunction(kind="ucb", kappa=2.576, xi=0)
+    optimizer = BayesianOptimization(target_func, PBOUNDS, random_state=1)
+
+    batch = optimizer.suggest_batch(util, 3)
+    assert len(batch) == 3
+
+    optimizer.register(params={"p1": 1, "p2": 2}, target=3)
+    optimizer.register(params={"p1": 5, "p2": 1}, target=6)
+    optimizer.register(params={"p1": 8, "p2": 7}, target=15)
+
+    for strategy in ['constant_liar', 'kriging_believer']:
+        batch = optimizer.suggest_batch(util, 4, strategy=strategy)
+        assert len(batch) == 4
+
+        samples = np.array([optimizer.space.params_to_array(params) for params in batch])
+        assert all((samples >= optimizer.space.bounds[:, 0]).ravel())
+        assert all((samples <= optimizer.space.bounds[:, 1]).ravel())
+        # the fantasies keep the points of a batch apart
+        assert len({tuple(np.round(sample, 6)) for sample in samples}) == 4
+
+    with pytest.raises(ValueError):
+        optimizer.suggest_batch(util, 0)
+    with pytest.raises(ValueError):
+        optimizer.suggest_batch(util, 2, strategy='unknown')
+    with pytest.raises(ValueError):
+        optimizer.suggest_batch(util, 2, liar='median')
+
+
+def test_init_design():
+    optimizer = BayesianOptimization(target_func, PBOUNDS, random_state=1, verbose=0, init_design='lhs')
+    optimizer._prime_queue(5)
+    design = np.array([next(optimizer._queue) for _ in range(5)])
+
+    for (lower, upper), column in zip(optimizer.space.bounds, design.T):
+        assert sorted(np.floor((column - lower) / (upper - lower) * 5).astype(int)) == list(range(5))
+
+    with pytest.raises(ValueError):
+        BayesianOptimization(target_func, PBOUNDS, init_design='grid')
+
+
+def test_maximize_batch():
+    from concurrent.futures import ThreadPoolExecutor
+
+    class SerialExecutor:
+        def __init__(self):
+            self.batches = []
+
+        def map(self, fn, iterable):
+            batch = list(iterable)
+            self.batches.append(len(batch))
+            return map(fn, batch)
+
+    optimizer = BayesianOptimization(target_func, PBOUNDS, random_state=1, verbose=0)
+    executor = SerialExecutor()
+    optimizer.maximize_batch(init_points=3, n_iter=5, batch_size=2, executor=executor)
+
+    assert optimizer._queue.empty
+    assert len(optimizer.space) == 8
+    # the initial design is dispatched at once, then suggestions by batch_size
+    assert executor.batches == [3, 2, 2, 1]
+
+    optimizer = BayesianOptimization(target_func, PBOUNDS, random_state=1, verbose=0)
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        optimizer.maximize_batch(init_points=4, n_iter=8, batch_size=4, executor=pool)
+
+    assert len(optimizer.space) == 12
+    for params, target in zip(optimizer.space.params, optimizer.space.target):
+        assert target == pytest.approx(sum(params))
+
+    optimizer = BayesianOptimization(target_func, PBOUNDS, random_state=1, verbose=0)
+    optimizer.maximize_batch(init_points=2, n_iter=4, batch_size=2)
+    assert len(optimizer.space) == 6
+
+
+def test_suggest_batch_with_pending_points():
+    util = UtilityFunction(kind="ucb", kappa=2.576, xi=0)
+    optimizer = BayesianOptimization(target_func, PBOUNDS, random_state=1)
+
+    optimizer.register(params={"p1": 1, "p2": 2}, target=3)
+    optimizer.register(params={"p1": 5, "p2": 1}, target=6)
+    optimizer.register(params={"p1": 8, "p2": 7}, target=15)
+
+    pending = optimizer.suggest_batch(util, 1)
+    suggestion = optimizer.suggest_batch(util, 1, pending=pending)[0]
+
+    assert not np.allclose(optimizer.space.params_to_array(suggestion),
+                           optimizer.space.params_to_array(pending[0]))
+    assert len(optimizer.space) == 3
+
+
+def test_maximize_async():
+    import threading
+
+    released = threading.Event()
+
+    def slow_target(p1, p2):
+        # the lazy probe waits for the other evaluations to be registered
+        if p1 == 1 and p2 == 1:
+            assert released.wait(timeout=60)
+        return p1 + p2
+
+    class Tracker:
+        def update_step(self, event, instance):
+            if len(instance.space) >= 5:
+                released.set()
+
+    optimizer = BayesianOptimization(slow_target, PBOUNDS, random_state=1, verbose=0)
+    tracker = Tracker()
+    optimizer.subscribe(Events.OPTIMIZATION_STEP, tracker, tracker.update_step)
+
+    optimizer.probe({"p1": 1, "p2": 1}, lazy=True)
+    optimizer.maximize_async(init_points=2, n_iter=5, workers=2)
+
+    assert optimizer._queue.empty
+    assert len(optimizer.space) == 8
+    # the slow evaluation did not hold back the other worker
+    slow_index = [list(params) for params in optimizer.space.params].index([1, 1])
+    assert slow_index >= 4
+
+    def failing_target(p1, p2):
+        raise RuntimeError("simulation failed")
+
+    optimizer = BayesianOptimization(failing_target, PBOUNDS, random_state=1, verbose=0)
+    with pytest.raises(RuntimeError):
+        optimizer.maximize_async(init_points=3, n_iter=2, workers=2)
+
+
+def test_maximize_on_lattice():
+    optimizer = BayesianOptimization(target_func, {'p1': (0, 1), 'p2': (0, 5)}, random_state=1,
+                                     verbose=0, resolution={'p1': 0.1, 'p2': 1})
+    optimizer.probe({'p1': 0.123, 'p2': 2.4}, lazy=True)
+    optimizer.maximize(init_points=2, n_iter=10)
+
+    params = optimizer.space.params
+    assert len(params) == 13
+    assert np.allclose(params / [0.1, 1], np.round(params / [0.1, 1]))
+    assert np.allclose(params[0], [0.1, 2])
+    # no lattice node is evaluated twice
+    assert len({tuple(p) for p in params}) == len(params)
+
+    util = UtilityFunction(kind="ucb", kappa=2.576, xi=0)
+    batch = optimizer.suggest_batch(util, 3)
+    samples = [tuple(optimizer.space.params_to_array(p)) for p in batch]
+    assert len(set(samples)) == 3
+    assert not set(samples) & {tuple(p) for p in params}
+
+
+
+def test_prime_queue_on_small_lattice():
+    pbounds = {'x': (0, 4), 'y': (0, 1)}
+    resolution = {'x': 1, 'y': 0.1}
+
+    # 55 nodes: random points collide, the duplicates are replaced
+    optimizer = BayesianOptimization(target_func, pbounds, random_state=1, verbose=0,
+                                     resolution=resolution)
+    optimizer.probe({'x': 2.2, 'y': 0.71}, lazy=True)
+    optimizer.probe({'x': 1.9, 'y': 0.68}, lazy=True)
+    optimizer.maximize(init_points=10, n_iter=3)
+
+    params = optimizer.space.params
+    assert len(params) == 14
+    assert len({tuple(p) for p in params}) == len(params)
+
+    # the same with the space-filling designs
+    for init_design in ['sobol', 'lhs', 'maximin']:
+        optimizer = BayesianOptimization(target_func, pbounds, random_state=1, verbose=0,
+                                         resolution=resolution, init_design=init_design)
+        optimizer.maximize(init_points=30, n_iter=2)
+        assert len({tuple(p) for p in optimizer.space.params}) == 32
+
+    # the queue stops once every node is taken
+    optimizer = BayesianOptimization(target_func, {'x': (0, 1), 'y': (0, 1)}, random_state=1,
+                                     verbose=0, resolution={'x': 1, 'y': 1})
+    with pytest.warns(UserWarning):
+        optimizer._prime_queue(6)
+    assert len(optimizer._queue) == 4
+
+
 if __name__ == '__main__':
     r"""
     CommandLine:
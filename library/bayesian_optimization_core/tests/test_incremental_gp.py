@@ -0,0 +1,146 @@
+import pytest
+import numpy as np
+from bayes_opt import BayesianOptimization
+from bayes_opt.incremental_gp import IncrementalGaussianProcessRegressor
+
+from sklearn.gaussian_process.kernels import Matern
+from sklearn.gaussian_process import GaussianProcessRegressor
+
+
+def get_data(n, seed=0):
+    rng = np.random.RandomState(seed)
+    X = rng.uniform(0, 1, size=(n, 2))
+    y = np.sin(6 * X[:, 0]) + np.cos(4 * X[:, 1])
+    return X, y
+
+
+def test_append_matches_full_fit():
+    X, y = get_data(30)
+    mesh = get_data(50, seed=1)[0]
+
+    gp = IncrementalGaussianProcessRegressor(kernel=Matern(nu=2.5), alpha=1e-6, normalize_y=True,
+                                             n_restarts_optimizer=2, random_state=0, refit_every=100)
+    gp.fit(X[:20], y[:20])
+    kernel = gp.kernel_
+
+    for n in range(21, 31):
+        gp.fit(X[:n], y[:n])
+    assert gp.kernel_ == kernel
+    assert gp.n_appended_ == 10
+
+    # a full fit with the same kernel gives the same posterior
+    reference = GaussianProcessRegressor(kernel=kernel, alpha=1e-6, normalize_y=True, optimizer=None)
+    reference.fit(X, y)
+
+    mean, std = gp.predict(mesh, return_std=True)
+    ref_mean, ref_std = reference.predict(mesh, return_std=True)
+    assert np.allclose(mean, ref_mean, atol=1e-6)
+    assert np.allclose(std, ref_std, atol=1e-6)
+    assert gp.log_marginal_likelihood_value_ == pytest.approx(
+        reference.log_marginal_likelihood_value_, rel=1e-6)
+
+
+def test_refit_schedule():
+    X, y = get_data(20)
+
+    gp = IncrementalGaussianProcessRegressor(kernel=Matern(nu=2.5), alpha=1e-6, normalize_y=True,
+                                             random_state=0, refit_every=3)
+    gp.fit(X[:10], y[:10])
+    gp.fit(X[:12], y[:12])
+    assert gp.n_appended_ == 2
+
+    # the third appended observation is a refit point
+    gp.fit(X[:13], y[:13])
+    assert gp.n_appended_ == 0
+
+    # data that does not extend the fit is refitted
+    gp.fit(X[:14], y[:14])
+    assert gp.n_appended_ == 1
+    gp.fit(X[1:16], y[1:16])
+    assert gp.n_appended_ == 0
+    assert len(gp.X_train_) == 15
+
+    # every fit is a full fit by default
+    gp = IncrementalGaussianProcessRegressor(kernel=Matern(nu=2.5), alpha=1e-6)
+    gp.fit(X[:10], y[:10])
+    gp.fit(X[:11], y[:11])
+    assert gp.n_appended_ == 0
+
+    with pytest.raises(ValueError):
+        IncrementalGaussianProcessRegressor(refit_every=0).fit(X, y)
+
+
+def test_optimizer_refit_every():
+    def target_func(x, y):
+        return -(x - 0.3) ** 2 - (y - 0.6) ** 2
+
+    optimizer = BayesianOptimization(target_func, {'x': (0, 1), 'y': (0, 1)}, random_state=1, verbose=0)
+    optimizer.set_gp_params(refit_every=5)
+    optimizer.maximize(init_points=3, n_iter=5)
+
+    # fitted on 3 points, then 4 observations appended without refitting
+    assert optimizer._gp.refit_every == 5
+    assert len(optimizer._gp.X_train_) == 7
+    assert optimizer._gp.n_appended_ == 4
+
+
+def test_refit_on_likelihood_degradation():
+    X, y = get_data(30)
+
+    # a tolerance that is never exceeded keeps appending
+    gp = IncrementalGaussianProcessRegressor(kernel=Matern(nu=2.5), alpha=1e-6, normalize_y=True,
+                                             random_state=0, refit_every=None, refit_tolerance=1e6)
+    gp.fit(X[:10], y[:10])
+    for n in range(11, 21):
+        gp.fit(X[:n], y[:n])
+    assert gp.n_appended_ == 10
+
+    # an observation far from the model lowers the likelihood and triggers a refit
+    gp = IncrementalGaussianProcessRegressor(kernel=Matern(nu=2.5), alpha=1e-6,
+                                             random_state=0, refit_every=None, refit_tolerance=0.)
+    gp.fit(X[:10], y[:10])
+    outlier = np.append(y[:10], 10.)
+    gp.fit(X[:11], outlier)
+    assert gp.n_appended_ == 0
+
+
+def test_refit_on_interval(monkeypatch):
+    X, y = get_data(20)
+    clock = [0.]
+    monkeypatch.setattr('bayes_opt.incremental_gp.time.monotonic', lambda: clock[0])
+
+    gp = IncrementalGaussianProcessRegressor(kernel=Matern(nu=2.5), alpha=1e-6, random_state=0,
+                                             refit_every=None, refit_interval=60)
+    gp.fit(X[:10], y[:10])
+    clock[0] = 59.
+    gp.fit(X[:11], y[:11])
+    assert gp.n_appended_ == 1
+
+    clock[0] = 60.
+    gp.fit(X[:12], y[:12])
+    assert gp.n_appended_ == 0
+
+    with pytest.raises(ValueError):
+        IncrementalGaussianProcessRegressor(refit_interval=0).fit(X, y)
+
+
+def test_warm_start_parallel_restarts():
+    X, y = get_data(30)
+
+    def fit(**params):
+        gp = IncrementalGaussianProcessRegressor(kernel=Matern(nu=2.5), alpha=1e-6, normalize_y=True,
+                                                 n_restarts_optimizer=3, random_state=0, **params)
+        gp.fit(X[:20], y[:20])
+        return gp.fit(X, y)
+
+    reference = GaussianProcessRegressor(kernel=Matern(nu=2.5), alpha=1e-6, normalize_y=True,
+                                         n_restarts_optimizer=3, random_state=0).fit(X, y)
+
+    # starting from the previous optimum finds a maximum at least as good
+    for gp in [fit(), fit(n_jobs=2), fit(n_jobs=-1)]:
+        assert gp.log_marginal_likelihood_value_ >= reference.log_marginal_likelihood_value_ - 1e-6
+        assert gp.log_marginal_likelihood_value_ == pytest.approx(
+            gp.log_marginal_likelihood(gp.kernel_.theta))
+
+    # the parallel restarts find the same optimum as the sequential ones
+    assert fit(n_jobs=2).kernel_.theta == pytest.approx(fit().kernel_.theta, rel=1e-4)
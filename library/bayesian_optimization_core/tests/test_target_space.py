@@ -118,6 +118,93 @@ def test_register_with_constraint():
         space.register(params={"p1": 2, "p2": 2}, target=3)
 
 
+def test_register_many():
+    space = TargetSpace(target_func, PBOUNDS)
+    space.register(params={"p1": 1, "p2": 2}, target=3)
+
+    # registering with dicts and with an array
+    assert space.register_many([{"p1": 5, "p2": 4}, {"p1": 0, "p2": 1}], [9, 1]) == 2
+    assert space.register_many(np.array([[0.5, 10], [0.25, 20]]), [10.5, 20.25]) == 2
+    assert len(space) == 5
+    assert all(space.params[1] == np.array([5, 4]))
+    assert all(space.target == np.array([3, 9, 1, 10.5, 20.25]))
+    assert np.array([0.25, 20]) in space
+
+    # nothing is registered when a point is not unique
+    with pytest.raises(NotUniqueError):
+        space.register_many([{"p1": 0.1, "p2": 2}, {"p1": 1, "p2": 2}], [2.1, 3])
+    with pytest.raises(NotUniqueError):
+        space.register_many([{"p1": 0.1, "p2": 2}, {"p1": 0.1, "p2": 2}], [2.1, 2.1])
+    assert len(space) == 5
+
+    assert space.register_many([{"p1": 0.1, "p2": 2}, {"p1": 1, "p2": 2}, {"p1": 0.1, "p2": 2}],
+                               [2.1, 3, 2.1], skip_duplicates=True) == 1
+    assert len(space) == 6
+
+    with pytest.raises(ValueError):
+        space.register_many([{"p1": 0.2, "p2": 2}], [2.2, 3])
+
+
+def test_register_many_with_constraint():
+    constraint = ConstraintModel(lambda x: x, -2, 2)
+    space = TargetSpace(target_func, PBOUNDS, constraint=constraint)
+
+    space.register_many([{"p1": 1, "p2": 2}, {"p1": 5, "p2": 4}], [3, 9], constraint_values=[0., 2.])
+    assert all(space.target == np.array([3, 9]))
+    assert all(space.constraint_values == np.array([0, 2]))
+
+    with pytest.raises(ValueError):
+        space.register_many([{"p1": 2, "p2": 2}], [4])
+
+
+def test_buffers():
+    space = TargetSpace(target_func, PBOUNDS)
+
+    params = space.params
+    for i in range(100):
+        space.register(params={"p1": i / 100, "p2": 1 + i}, target=i)
+    assert len(space) == 100
+    assert space.params.shape == (100, 2)
+    assert all(space.target == np.arange(100))
+
+    # the capacity doubles, the data is exposed as read-only views
+    assert 100 <= len(space._target_buffer) < 200
+    assert len(params) == 0
+    with pytest.raises(ValueError):
+        space.params[0, 0] = 1.
+
+
+def test_initial_design():
+    space = TargetSpace(target_func, PBOUNDS, random_state=0, resolution={'p2': 1})
+
+    design = space.initial_design(16, 'sobol')
+    assert design.shape == (16, 2)
+    assert np.all((design >= space.bounds[:, 0]) & (design <= space.bounds[:, 1]))
+    assert np.all(design[:, 1] == np.round(design[:, 1]))
+
+    # the random design draws the points of random_sample
+    space = TargetSpace(target_func, PBOUNDS, random_state=0)
+    design = space.initial_design(3)
+    space = TargetSpace(target_func, PBOUNDS, random_state=0)
+    assert np.allclose(design, [space.random_sample() for _ in range(3)])
+
+
+@pytest.mark.parametrize("method", ["random", "sobol", "lhs", "maximin"])
+def test_initial_design_on_coarse_lattice(method):
+    space = TargetSpace(target_func, {'p1': (0, 4), 'p2': (0, 1)}, random_state=0,
+                        resolution={'p1': 1, 'p2': 0.1})
+    space.register({'p1': 2, 'p2': 0.7}, target=2.7)
+
+    # 55 nodes: the snapped designs collide, the duplicates are replaced
+    design = space.initial_design(30, method, exclude=set(space._cache))
+    assert design.shape == (30, 2)
+    assert len({tuple(x) for x in design}) == 30
+    assert (2., 0.7) not in {tuple(x) for x in design}
+
+    # the design stops once every node is taken
+    assert len(space.initial_design(100, method)) == 55
+
+
 def test_probe():
     space = TargetSpace(target_func, PBOUNDS, allow_duplicate_points=True)
 
@@ -163,6 +250,34 @@ def test_random_sample():
         assert all(random_sample <= space.bounds[:, 1])
 
 
+def test_snap_to_resolution():
+    pbounds = {'p1': (0, 0.05), 'p2': (0.013, 15), 'p3': (100, 1000), 'p4': (0, 1)}
+    space = TargetSpace(target_func, pbounds, random_state=8,
+                        resolution={'p1': 0.01, 'p2': 0.01, 'p3': 1})
+
+    assert np.all(space.steps == [0.01, 0.01, 1, 0])
+
+    snapped = space.snap([0.0449, 0.0101, 555.5, 0.123456])
+    assert np.allclose(snapped, [0.04, 0.02, 556, 0.123456])
+
+    # nodes out of the bounds are moved inside
+    snapped = space.snap(np.array([[1., 0., 0., 0.5], [0.051, 15.004, 999.6, 0.5]]))
+    assert np.allclose(snapped, [[0.05, 0.02, 100, 0.5], [0.05, 15., 1000, 0.5]])
+
+    for _ in range(50):
+        random_sample = space.random_sample()
+        assert np.all(random_sample >= space.bounds[:, 0])
+        assert np.all(random_sample <= space.bounds[:, 1])
+        assert np.allclose(random_sample[:3] / space.steps[:3], np.round(random_sample[:3] / space.steps[:3]))
+
+    # the point evaluated and registered is the lattice node
+    space.probe({'p1': 0.0449, 'p2': 1.2345, 'p3': 200.2, 'p4': 0.5})
+    assert np.allclose(space.params[0], [0.04, 1.23, 200, 0.5])
+
+    with pytest.raises(ValueError):
+        space.set_resolution({'p1': -0.1})
+
+
 def test_y_max():
     space = TargetSpace(target_func, PBOUNDS)
     assert space._target_max() == None
@@ -3,7 +3,7 @@ import numpy as np
 
 from bayes_opt import BayesianOptimization
 from bayes_opt.util import UtilityFunction, Colours
-from bayes_opt.util import acq_max, load_logs, ensure_rng
+from bayes_opt.util import acq_max, load_logs, ensure_rng, gp_posterior, space_filling_design
 
 from sklearn.gaussian_process.kernels import Matern
 from sklearn.gaussian_process import GaussianProcessRegressor
@@ -89,6 +89,102 @@ def test_acq_with_ucb():
     assert all(abs(brute_max_arg - max_arg) < epsilon)
 
 
+def test_acq_on_lattice():
+    util = UtilityFunction(kind="ucb", kappa=1.0, xi=1.0)
+    bounds = np.array([[0, 1], [0, 1]], dtype=float)
+    steps = np.array([0.1, 0.1])
+
+    max_arg = acq_max(
+        util.utility,
+        GP,
+        2.0,
+        bounds=bounds,
+        random_state=ensure_rng(0),
+        steps=steps
+    )
+    assert np.allclose(max_arg / steps, np.round(max_arg / steps))
+
+    # the best node of the lattice is found, then skipped once evaluated
+    nodes = np.dstack(np.meshgrid(np.arange(0, 1.01, 0.1), np.arange(0, 1.01, 0.1))).reshape(-1, 2)
+    node_vals = util.utility(nodes, GP, 2.0)
+    assert np.allclose(max_arg, nodes[np.argmax(node_vals)])
+
+    next_arg = acq_max(
+        util.utility,
+        GP,
+        2.0,
+        bounds=bounds,
+        random_state=ensure_rng(0),
+        steps=steps,
+        exclude={tuple(map(float, max_arg))}
+    )
+    assert not np.allclose(next_arg, max_arg)
+    assert np.allclose(next_arg / steps, np.round(next_arg / steps))
+
+
+@pytest.mark.parametrize("kind", ["ucb", "ei", "poi"])
+def test_utility_gradient(kind):
+    util = UtilityFunction(kind=kind, kappa=1.0, xi=1e-2)
+    posterior = gp_posterior(GP)
+    x = ensure_rng(0).uniform(0, 1, size=(20, 2))
+
+    mean, std = GP.predict(x, return_std=True)
+    assert np.allclose(posterior(x)[0], mean)
+    assert np.allclose(posterior(x)[1], std)
+
+    values, gradients = util.utility_gradient(x, posterior, 2.0)
+    assert np.allclose(values, util.utility(x, GP, 2.0))
+
+    eps = 1e-6
+    numerical = np.stack([
+        (util.utility(x + eps * e, GP, 2.0) - util.utility(x - eps * e, GP, 2.0)) / (2 * eps)
+        for e in np.eye(2)], axis=1)
+    assert np.allclose(gradients, numerical, rtol=1e-4, atol=1e-6)
+
+
+def test_acq_with_gradient():
+    util = UtilityFunction(kind="ucb", kappa=1.0, xi=1.0)
+    epsilon = 1e-2
+
+    max_arg = acq_max(
+        util.utility,
+        GP,
+        2.0,
+        bounds=np.array([[0, 1], [0, 1]]),
+        random_state=ensure_rng(0),
+        n_iter=20,
+        ac_gradient=util.utility_gradient
+    )
+    _, brute_max_arg = brute_force_maximum(MESH, GP, kind='ucb', kappa=1.0, xi=1.0)
+
+    assert all(abs(brute_max_arg - max_arg) < epsilon)
+
+
+@pytest.mark.parametrize("method", ["random", "sobol", "lhs", "maximin"])
+def test_space_filling_design(method):
+    design = space_filling_design(30, 3, ensure_rng(0), method)
+    assert design.shape == (30, 3)
+    assert np.all((design >= 0) & (design < 1))
+
+    if method in ["lhs", "maximin"]:
+        # a single point in each of the 30 slices of every variable
+        for column in design.T:
+            assert sorted(np.floor(column * 30).astype(int)) == list(range(30))
+
+
+def test_space_filling_design_fills_gaps():
+    def min_distance(design):
+        distances = np.sqrt(np.sum((design[:, None, :] - design[None, :, :]) ** 2, axis=-1))
+        return distances[np.triu_indices(len(design), k=1)].min()
+
+    random = np.mean([min_distance(space_filling_design(30, 2, ensure_rng(i))) for i in range(10)])
+    maximin = np.mean([min_distance(space_filling_design(30, 2, ensure_rng(i), 'maximin')) for i in range(10)])
+    assert maximin > random
+
+    with pytest.raises(ValueError):
+        space_filling_design(30, 2, ensure_rng(0), 'grid')
+
+
 def test_acq_with_ei():
     util = UtilityFunction(kind="ei", kappa=1.0, xi=1e-6)
     epsilon = 1e-2
@@ -5,14 +5,25 @@
 # Written by Marco Mariano De Carlo, Gabriele Accarino
 # ---------------------------------------------------------
 
-import numpy as np
+import os
+import threading
 
 from src.service.BayOptSetupService import BayOptSetupService
+from src.service.EvaluationCacheService import EvaluationCacheService
 from src.service.ExecutionService import ExecutionService
 from src.service.MDK2SimParamsService import MDK2SimParamsService
 from src.service.MetricsService import MetricsService
+from src.service.RenderService import RenderService
+from src.service.SandboxService import SandboxService
 
 from src.controller.PathController import PathController
+from src.serviceImpl.BayOptSetupServiceImpl import ArtifactPolicy, EvalMetric
+
+"""
+Evaluations running at the same time read the final result file, copy the best detections
+and append their result one at a time
+"""
+_result_lock = threading.Lock()
 
 class ObjFunctionController:
     
@@ -24,8 +35,20 @@ class ObjFunctionController:
         self.mdk2_sim_params_service_instance = MDK2SimParamsService()
         self.path_controller_instance = PathController()
         self.metrics_service_instance = MetricsService()
+        self.render_service_instance = RenderService()
+        self.sandbox_service_instance = SandboxService()
+        self.evaluation_cache_service_instance = EvaluationCacheService()
         
     def objective_function(self, **kwargs):
+
+        """
+        The whole evaluation (model configuration, run and metrics) takes place in a sandbox leased
+        from the worker pool, when sandboxes are provisioned, so that several evaluations can run at the same time
+        """
+        with self.sandbox_service_instance.lease():
+            return self.evaluate(**kwargs)
+
+    def evaluate(self, **kwargs):
         
         """
         Gets accuracy from the configuration of the Bayesian optimization service
@@ -34,9 +57,10 @@ class ObjFunctionController:
         particles_dict = self.mdk2_sim_params_service_instance.get_particles_key_value_dict()
         
         """
-        Round input parameter values to the desired decimal precision
+        Round input parameter values to the desired decimal precision, in double precision as the lattice
+        searched by the optimizer, so that the value simulated is the node registered
         """
-        kwargs = {k:round(np.float32(v), decimal_precision) for k,v in kwargs.items()}
+        kwargs = {k:round(float(v), decimal_precision) for k,v in kwargs.items()}
         pt = {k:int(v) for k,v in particles_dict.items()}
         
         config2_params = {**kwargs, **pt}
@@ -45,7 +69,90 @@ class ObjFunctionController:
         Create the directory for simulation cases, if it does not exist
         """
         self.path_controller_instance.create_cases_dir()
-        
+
+        artifact_policy = self.bay_opt_setup_service_instance.get_artifact_policy()
+
+        """
+        Look for the rounded parameters in the evaluation cache, when enabled: a stored evaluation of the same
+        parameters, simulation setup, observation and model build gives back its metrics (and its outputs, if
+        required by the artifact policy) without running MEDSLIK-II again
+        """
+        cache_key, entry, artifacts_dir = None, None, None
+
+        if self.bay_opt_setup_service_instance.get_evaluation_cache_size() > 0:
+            description = self.evaluation_cache_service_instance.describe_evaluation(kwargs, pt)
+            cache_key = self.evaluation_cache_service_instance.get_key(description) if description is not None else None
+            entry = self.evaluation_cache_service_instance.lookup(cache_key) if cache_key is not None else None
+
+        if entry is not None:
+            metrics = entry['metrics']
+            metric = metrics.get(self.metrics_service_instance.get_metric_name_service())
+            with _result_lock:
+                is_new_best = self.execution_service_instance.is_new_best(metric)
+
+            write_artifacts = (artifact_policy == ArtifactPolicy.EVERY_ITERATION.value
+                               or (artifact_policy == ArtifactPolicy.BEST_ONLY.value and is_new_best))
+
+            if not write_artifacts or (entry['artifacts'] and self.evaluation_cache_service_instance.restore_artifacts(cache_key)):
+                print(f"> Evaluation of {({k: float(v) for k, v in kwargs.items()})} found in the evaluation cache, MEDSLIK-II is not run ...")
+            else:
+                # The outputs are required but were not stored: the simulation is run again
+                entry = None
+
+        if entry is None:
+            artifacts = []
+
+            metrics, is_new_best, write_artifacts = self.simulate(kwargs, config2_params, artifact_policy, artifacts)
+            metric = metrics.get(self.metrics_service_instance.get_metric_name_service())
+
+            if cache_key is not None and metric is not None:
+                artifacts_dir = self.evaluation_cache_service_instance.store(cache_key, description, metrics,
+                                                                            artifacts if write_artifacts else None)
+
+        """
+        Prepares the values to be written into the final file, including the values passed as arguments (kwargs),
+        the value of the chosen metric and the value of every metric
+        """
+        values_to_write = list(kwargs.values()) + [str(metric)] + [str(metrics.get(m.value)) for m in EvalMetric]
+
+        with _result_lock:
+            """
+            Saves the best detection obtained using the execution service: whether the metric is a new best
+            is decided again here, as another evaluation may have written a better result in the meantime
+            """
+            is_new_best = write_artifacts and self.execution_service_instance.save_best_detection(metric)
+
+            """
+            Writes the prepared values into the final file, using the path controller to determine the simulation result directory
+            """
+            self.path_controller_instance.write_final_result_file(values_to_write, self.path_controller_instance.get_sim_result_dir())
+
+        if write_artifacts:
+            """
+            Plots are rendered in background, so that the optimizer can go on with the next simulation;
+            those of a new best detection are also copied among the best detections once rendered,
+            and those of a cached evaluation in the evaluation cache
+            """
+            best_detections = [os.path.join(self.path_controller_instance.get_sim_result_dir(), 'best_detections')] if is_new_best else []
+            self.render_service_instance.submit_jobs(best_detections + ([artifacts_dir] if artifacts_dir is not None else []))
+    
+        return metric
+
+    def simulate(self, kwargs, config2_params, artifact_policy, artifacts=None):
+        """
+        Runs MEDSLIK-II with the given parameters and computes the metrics of the simulation.
+
+        Args:
+            kwargs (dict): The rounded parameter values.
+            config2_params (dict): The values written in the model configuration file (parameters and parcels).
+            artifact_policy (str): The artifact policy of the configuration file.
+            artifacts (list, optional): When given, the paths of the files written by the evaluation are appended to it.
+
+        Returns:
+            tuple: The metric values keyed by metric name, whether the chosen metric is a new best,
+                   and whether the outputs of the evaluation were written.
+        """
+
         """
         Update the model configuration file with the new rounded parameters
         """
@@ -58,28 +165,35 @@ class ObjFunctionController:
         self.execution_service_instance.run_model()
         
         """
-        Compute and returns the value of the FSS (Fraction Skill Score) metric
+        Store the floating parcels of this simulation, before the next one overwrites the model output
         """
-        if self.bay_opt_setup_service_instance.get_eval_metric() == "FSS":
-            metric = self.metrics_service_instance.compute_multi_fss_service(kwargs.values())
-        elif self.bay_opt_setup_service_instance.get_eval_metric() == "overlay":
-            metric = self.metrics_service_instance.compute_multi_overlay_service(kwargs.values())
-        elif self.bay_opt_setup_service_instance.get_eval_metric() == "centroid":
-            metric = self.metrics_service_instance.compute_multi_centroid_distance_service(kwargs.values())
+        if self.bay_opt_setup_service_instance.get_parcel_snapshots():
+            self.metrics_service_instance.save_parcel_snapshot_service(kwargs)
 
         """
-        Saves the best detection obtained using the execution service
-        """
-        self.execution_service_instance.save_best_detection(metric)
-        
-        """
-        Prepares the values to be written into the final file, including the values passed as arguments (kwargs) and the metric value
+        Compute every metric from the same comparison grid and returns the value of the chosen one,
+        writing the outputs (shapefiles, plots and text files) only if required by the artifact policy;
+        the comparison rasters are appended to the campaign archive, when enabled
         """
-        values_to_write = list(kwargs.values()) + [str(metric)]
-        
+        write_artifacts = artifact_policy not in (ArtifactPolicy.NONE.value, ArtifactPolicy.BEST_ONLY.value)
+
+        archive_parameters = kwargs if self.bay_opt_setup_service_instance.get_campaign_archive() else None
+
+        # With the best only policy, the comparison stage is kept until the metric is compared with the best one
+        stage = {} if artifact_policy == ArtifactPolicy.BEST_ONLY.value else None
+
+        metrics = self.metrics_service_instance.compute_metrics_service(kwargs.values(), write_artifacts, archive_parameters, artifacts, stage) or {}
+        metric = metrics.get(self.metrics_service_instance.get_metric_name_service())
+
         """
-        Writes the prepared values into the final file, using the path controller to determine the simulation result directory
+        With the best only policy, the outputs are produced once a new best metric is found, from the
+        comparison and the FSS curve already computed, while the model output of this evaluation is still available
         """
-        self.path_controller_instance.write_final_result_file(values_to_write, self.path_controller_instance.get_sim_result_dir())
-    
-        return metric
\ No newline at end of file
+        with _result_lock:
+            is_new_best = self.execution_service_instance.is_new_best(metric)
+
+        if stage and is_new_best:
+            self.metrics_service_instance.save_stage_artifacts_service(stage, kwargs.values(), artifacts)
+            write_artifacts = True
+
+        return metrics, is_new_best, write_artifacts
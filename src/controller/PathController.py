@@ -12,6 +12,8 @@ from src.service.PathService import PathService
 from src.service.MDK2SimDateService import MDK2SimDateService
 from src.service.MDK2SimExtentService import MDK2SimExtentService
 from src.service.MDK2SimParamsService import MDK2SimParamsService
+from src.service.SandboxService import SandboxService
+from src.serviceImpl.BayOptSetupServiceImpl import EvalMetric
 
 timestamp = time.strftime('%Y%m%d-%H%M%S')
 
@@ -24,6 +26,7 @@ class PathController:
         self.mdk2_sim_date_service_instance = MDK2SimDateService()
         self.mdk2_sim_extent_service_instance = MDK2SimExtentService()
         self.mdk2_sim_params_service_instance = MDK2SimParamsService()
+        self.sandbox_service_instance = SandboxService()
     
     """
     Creates the cases folder in case it does not exist
@@ -45,8 +48,8 @@ class PathController:
         # Create a new path for the final result file using a timestamp
         new_path = os.path.join(result_dir, f'final_result_{timestamp}.csv')
         
-        # Define the values to write to the final result file (including 'metric')
-        values_to_write = self.mdk2_sim_params_service_instance.get_config_keys()[::-1] + ['Metric']
+        # Define the values to write to the final result file (including 'metric' and the value of every metric)
+        values_to_write = self.mdk2_sim_params_service_instance.get_config_keys()[::-1] + ['Metric'] + [metric.value for metric in EvalMetric]
         
         # Create the header string by joining the values with commas
         header = ','.join(map(str, values_to_write))
@@ -115,6 +118,40 @@ class PathController:
         
         return os.path.join(self.path_service_instance.get_CASES_path(), sim_name, sim_str)
     
+    def get_parcel_snapshot_dir(self):
+        """
+        Returns the folder of the parcel snapshot store of the simulation.
+
+        Returns:
+            str: The path to the parcel snapshot store.
+        """
+        return os.path.join(self.get_sim_result_dir(), 'parcel_snapshots')
+
+    def get_campaign_archive_file(self):
+        """
+        Returns the path of the archive holding the comparison rasters of the optimization campaign.
+
+        Returns:
+            str: The path to the campaign archive.
+        """
+        return os.path.join(self.get_sim_result_dir(), 'campaign_archive.nc')
+
+    def get_detection_root(self):
+        """
+        Returns the folder holding the detection directories of the calling thread: an evaluation running
+        in a sandbox writes its detections in a folder of its own, so that concurrent evaluations never
+        write the same files.
+
+        Returns:
+            str: The simulation result directory, or the folder of the leased sandbox inside it.
+        """
+        sandbox = self.sandbox_service_instance.get_current_sandbox()
+
+        if sandbox is None:
+            return self.get_sim_result_dir()
+
+        return os.path.join(self.get_sim_result_dir(), 'sandboxes', os.path.basename(sandbox.get_root))
+
     def get_detection_dir(self, obs):
         """
         Generates the complete path for storing detection data based on information 
@@ -128,7 +165,7 @@ class PathController:
         """        
         obs_str = "detection_" + str(obs)
         
-        return os.path.join(self.get_sim_result_dir(), obs_str)
+        return os.path.join(self.get_detection_root(), obs_str)
     
     def get_simulation_result_file(self, result_dir):
         """
@@ -167,6 +204,21 @@ class PathController:
     """
     Creates the folder containing the observations of the various use cases in case it does not exist
     """
+    def get_observation_detection_dir(self):
+        """
+        Returns the detection directory of the observation compared with the simulations.
+
+        Returns:
+            str: The path to the detection directory, named after the date of the observation.
+        """
+        yy = self.mdk2_sim_date_service_instance.get_year()
+        mm = self.mdk2_sim_date_service_instance.get_month()
+        dd = self.mdk2_sim_date_service_instance.get_day()
+        hh = self.mdk2_sim_date_service_instance.get_hour()
+        mn = self.mdk2_sim_date_service_instance.get_minutes()
+
+        return self.get_detection_dir(f"20{yy}{mm}{dd}_{hh}{mn}")
+
     def create_detection_dir(self, obs):
         return os.makedirs(self.get_detection_dir(str(obs)), exist_ok=True)
     
@@ -186,17 +238,29 @@ class PathController:
     def get_CONFIG2_TEMPLATE(self):
         return self.path_service_instance.get_CONFIG2_TEMPLATE_path()
     
+    """
+    Paths of the model run resolve to the sandbox leased by the calling thread, if any
+    """
     def get_MEDSLIK_RUN(self):
-        return self.path_service_instance.get_MEDSLIK_RUN_path()
+        sandbox = self.sandbox_service_instance.get_current_sandbox()
+        return sandbox.get_MEDSLIK_RUN if sandbox is not None else self.path_service_instance.get_MEDSLIK_RUN_path()
     
     def get_MEDSLIK_MODEL_SRC(self):
         return self.path_service_instance.get_MEDSLIK_MODEL_SRC_path()
+
+    def get_BUILD_CACHE_DIR(self):
+        return os.path.join(self.path_service_instance.get_MEDSLIK_FOLDER_path(), 'build_cache')
+
+    def get_EVALUATION_CACHE_DIR(self):
+        return os.path.join(self.path_service_instance.get_MEDSLIK_FOLDER_path(), 'evaluation_cache')
     
     def get_CONFIG1(self):
-        return self.path_service_instance.get_CONFIG1_path()
+        sandbox = self.sandbox_service_instance.get_current_sandbox()
+        return sandbox.get_CONFIG1 if sandbox is not None else self.path_service_instance.get_CONFIG1_path()
     
     def get_CONFIG2(self):
-        return self.path_service_instance.get_CONFIG2_path()
+        sandbox = self.sandbox_service_instance.get_current_sandbox()
+        return sandbox.get_CONFIG2 if sandbox is not None else self.path_service_instance.get_CONFIG2_path()
     
     def get_CASES(self):
         return self.path_service_instance.get_CASES_path()
@@ -243,8 +307,12 @@ class PathController:
         hour = self.mdk2_sim_date_service_instance.get_hour()
         minutes = self.mdk2_sim_date_service_instance.get_minutes()
 
+        # Outputs of a sandboxed run are written in the OUT folder of the sandbox
+        sandbox = self.sandbox_service_instance.get_current_sandbox()
+        out_dir = sandbox.get_MEDSLIK_OUT_DIR if sandbox is not None else self.path_service_instance.get_MEDSLIK_OUT_DIR_path()
+
         # Construct the path to the MEDSLIK output directory using obtained parameters
-        return os.path.join(self.path_service_instance.get_MEDSLIK_OUT_DIR_path(), f"MDK_SIM_20{year}_{month}_{day}_{hour}{minutes}_{sim_name}")
+        return os.path.join(out_dir, f"MDK_SIM_20{year}_{month}_{day}_{hour}{minutes}_{sim_name}")
     
     def get_GSHHS_DATA(self):
         return self.path_service_instance.get_GSHHS_DATA_path()
\ No newline at end of file
@@ -56,9 +56,9 @@ class WorkflowController:
     """
     Call to the setup_service method from the WorkflowServiceInstance class with the specified execution type
     """
-    def setup(self, execution_type:int):
+    def setup(self, execution_type:int, rebuild=False):
         try:
-            return self.workflow_service_instance.setup_service(execution_type)
+            return self.workflow_service_instance.setup_service(execution_type, rebuild)
         except ValueError as e:
             raise SetupException(e)
             
@@ -0,0 +1,178 @@
+# ---------------------------------------------------------
+# Bayesian Optimization Workflow for Medslik-II Simulations
+# Copyright (c) 2023-2024 CMCC Foundation
+# Licensed under The MIT License [see LICENSE for details]
+# Written by Marco Mariano De Carlo, Gabriele Accarino
+# ---------------------------------------------------------
+
+import os
+import threading
+import numpy as np
+
+from src.domain.ComparisonGrid import ComparisonGrid
+
+"""
+netCDF4 (HDF5) is not thread-safe: the campaign archives of the process are created, appended and read
+by one thread at a time, holding this lock
+"""
+archive_lock = threading.Lock()
+
+class CampaignArchiveRepo:
+
+    def __init__(self, fname, chunk_size=256):
+        """
+        Archive of the comparison rasters of an optimization campaign, stored in a NetCDF file:
+        model(iteration, lat, lon) holds the modelled oil presence of every evaluation, observation(lat, lon)
+        the observed oil, and metric and parameter values are stored along the iteration dimension.
+
+        Rasters are compressed by (1, chunk_size, chunk_size) chunks, so that a window of some iterations
+        can be read without loading the whole archive. It can be used as a context manager.
+
+        Args:
+            fname (str): The path to the archive.
+            chunk_size (int): The size in cells of the square chunks of the rasters.
+        """
+        self.fname = fname
+        self.chunk_size = chunk_size
+        self.dataset = None
+        self.mode = None
+
+    def __enter__(self):
+        return self.open()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def exists(self):
+        return os.path.isfile(self.fname)
+
+    def open(self, mode='r'):
+        """ Opens the archive, if it is not open yet ('r' to read, 'a' to append) """
+        if self.dataset is not None and self.mode == 'r' and mode != 'r':
+            self.close()
+
+        if self.dataset is None:
+            import netCDF4
+
+            self.dataset = netCDF4.Dataset(self.fname, mode)
+            self.mode = mode
+
+        return self
+
+    def close(self):
+        """ Closes the archive """
+        if self.dataset is not None:
+            self.dataset.close()
+            self.dataset = None
+
+    def create(self, grid, observation_mask, metric_names, parameter_names):
+        """
+        Creates an empty archive on the campaign grid.
+
+        Args:
+            grid (ComparisonGrid): The lattice shared by every raster of the campaign.
+            observation_mask (numpy.ndarray): A (ny, nx) boolean array of the observed oil.
+            metric_names (list): The names of the metrics stored for each iteration.
+            parameter_names (list): The names of the parameters stored for each iteration.
+        """
+        import netCDF4
+
+        os.makedirs(os.path.dirname(os.path.abspath(self.fname)), exist_ok=True)
+
+        with netCDF4.Dataset(self.fname, 'w') as f:
+            f.createDimension('iteration', None)
+            f.createDimension('lat', grid.get_ny)
+            f.createDimension('lon', grid.get_nx)
+            f.createDimension('parameter', len(parameter_names))
+
+            f.lonmin = grid.get_lonmin
+            f.latmin = grid.get_latmin
+            f.resolution = grid.get_resolution
+            f.parameter_names = ','.join(parameter_names)
+
+            lon = f.createVariable('lon', 'f8', ('lon',))
+            lon[:] = grid.get_lonmin + (np.arange(grid.get_nx) + 0.5) * grid.get_resolution
+            lat = f.createVariable('lat', 'f8', ('lat',))
+            lat[:] = grid.get_latmin + (np.arange(grid.get_ny) + 0.5) * grid.get_resolution
+
+            chunks = (min(self.chunk_size, grid.get_ny), min(self.chunk_size, grid.get_nx))
+
+            observation = f.createVariable('observation', 'u1', ('lat', 'lon'), zlib=True, complevel=4, chunksizes=chunks)
+            observation[:] = np.asarray(observation_mask, dtype=np.uint8)
+
+            f.createVariable('model', 'u1', ('iteration', 'lat', 'lon'), zlib=True, complevel=4, chunksizes=(1,) + chunks)
+            f.createVariable('parameters', 'f8', ('iteration', 'parameter'))
+            for name in metric_names:
+                f.createVariable(name, 'f8', ('iteration',), fill_value=np.nan)
+
+    def append(self, model_mask, metrics, parameters):
+        """
+        Appends the raster of an evaluation.
+
+        Args:
+            model_mask (numpy.ndarray): A (ny, nx) boolean array of the modelled oil, on the campaign grid.
+            metrics (dict): The metric values, keyed by metric name.
+            parameters (list): The parameter values, in the order of the parameter names.
+
+        Returns:
+            int: The iteration of the evaluation in the archive.
+        """
+        self.open('a')
+
+        iteration = len(self.dataset.dimensions['iteration'])
+
+        self.dataset.variables['model'][iteration, :, :] = np.asarray(model_mask, dtype=np.uint8)
+        self.dataset.variables['parameters'][iteration, :] = np.asarray(parameters, dtype=np.float64)
+        for name, value in metrics.items():
+            if name in self.dataset.variables:
+                self.dataset.variables[name][iteration] = np.nan if value is None else float(value)
+
+        self.dataset.sync()
+
+        return iteration
+
+    def get_grid(self):
+        """ Returns the lattice of the campaign """
+        self.open()
+
+        return ComparisonGrid(float(self.dataset.lonmin), float(self.dataset.latmin), float(self.dataset.resolution),
+                              len(self.dataset.dimensions['lon']), len(self.dataset.dimensions['lat']))
+
+    def get_iterations(self):
+        return len(self.open().dataset.dimensions['iteration'])
+
+    def get_parameter_names(self):
+        return self.open().dataset.parameter_names.split(',')
+
+    def get_parameters(self, iterations=slice(None)):
+        return np.asarray(self.open().dataset.variables['parameters'][iterations, :])
+
+    def get_metric(self, name, iterations=slice(None)):
+        return np.asarray(self.open().dataset.variables[name][iterations])
+
+    def read_observation(self, rows=slice(None), cols=slice(None)):
+        """
+        Reads a window of the observation layer.
+
+        Args:
+            rows (slice): The rows (latitudes) of the window.
+            cols (slice): The columns (longitudes) of the window.
+
+        Returns:
+            numpy.ndarray: The boolean window.
+        """
+        return np.asarray(self.open().dataset.variables['observation'][rows, cols], dtype=bool)
+
+    def read_model(self, iterations=slice(None), rows=slice(None), cols=slice(None)):
+        """
+        Reads a window of the model layers: only the chunks overlapping the window are decompressed.
+
+        Args:
+            iterations (int or slice): The iterations to read.
+            rows (slice): The rows (latitudes) of the window.
+            cols (slice): The columns (longitudes) of the window.
+
+        Returns:
+            numpy.ndarray: The boolean window, (iterations, rows, cols) or (rows, cols) for a single iteration.
+        """
+        return np.asarray(self.open().dataset.variables['model'][iterations, rows, cols], dtype=bool)
@@ -0,0 +1,179 @@
+# ---------------------------------------------------------
+# Bayesian Optimization Workflow for Medslik-II Simulations
+# Copyright (c) 2023-2024 CMCC Foundation
+# Licensed under The MIT License [see LICENSE for details]
+# Written by Marco Mariano De Carlo, Gabriele Accarino
+# ---------------------------------------------------------
+
+import os
+import json
+import shutil
+
+class EvaluationCacheRepo:
+
+    """
+    Layout of the cache: each evaluation is stored in <key[:2]>/<key>, with entry.json (the metrics and
+    the description of the evaluation) and an artifacts folder mirroring the simulation result directory
+    """
+    ENTRY_FILE = 'entry.json'
+    ARTIFACTS_FOLDER = 'artifacts'
+
+    def __init__(self, folder, max_bytes):
+        """
+        Store of the evaluated parameter sets, shared by every campaign (and every user) pointing to the same folder.
+
+        Entries are written in a temporary folder and moved in place, so that a reader never sees a partial
+        entry. Once the cache exceeds max_bytes, the least recently used entries are evicted.
+
+        Args:
+            folder (str): The folder holding the cache, created on first write.
+            max_bytes (int): The maximum size of the cache, in bytes.
+        """
+        self.folder = folder
+        self.max_bytes = max_bytes
+
+    def get_entry_dir(self, key):
+        return os.path.join(self.folder, key[:2], key)
+
+    def get_artifacts_dir(self, key):
+        return os.path.join(self.get_entry_dir(key), self.ARTIFACTS_FOLDER)
+
+    @staticmethod
+    def _share(path):
+        """ Makes a file, or a folder and its content, writable by the group, so that the cache can be shared """
+        try:
+            for folder, dirs, files in os.walk(path):
+                os.chmod(folder, 0o2775)
+                for name in files:
+                    os.chmod(os.path.join(folder, name), 0o664)
+        except OSError:
+            pass
+
+    def get(self, key):
+        """
+        Reads an entry and marks it as recently used.
+
+        Args:
+            key (str): The key of the evaluation.
+
+        Returns:
+            dict: The entry, or None if the evaluation is not cached.
+        """
+        entry_file = os.path.join(self.get_entry_dir(key), self.ENTRY_FILE)
+
+        try:
+            with open(entry_file) as f:
+                entry = json.load(f)
+            os.utime(entry_file)
+        except (OSError, ValueError):
+            # Missing, being evicted or not readable: the evaluation is run again
+            return None
+
+        return entry
+
+    def put(self, key, entry, artifacts=None):
+        """
+        Stores an entry, replacing a previous one with the same key, and evicts the least recently used entries.
+
+        Args:
+            key (str): The key of the evaluation.
+            entry (dict): The JSON-serializable content of the entry.
+            artifacts (dict, optional): The files to store, keyed by their path relative to the artifacts folder.
+        """
+        entry_dir = self.get_entry_dir(key)
+        os.makedirs(os.path.dirname(entry_dir), exist_ok=True)
+        self._share(os.path.dirname(entry_dir))
+
+        tmp_dir = f"{entry_dir}.tmp{os.getpid()}"
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        os.makedirs(os.path.join(tmp_dir, self.ARTIFACTS_FOLDER))
+
+        for relpath, fname in (artifacts or {}).items():
+            dst = os.path.join(tmp_dir, self.ARTIFACTS_FOLDER, relpath)
+            os.makedirs(os.path.dirname(dst), exist_ok=True)
+            shutil.copy2(fname, dst)
+
+        with open(os.path.join(tmp_dir, self.ENTRY_FILE), 'w') as f:
+            json.dump(entry, f, indent=2)
+
+        self._share(tmp_dir)
+
+        shutil.rmtree(entry_dir, ignore_errors=True)
+        try:
+            os.replace(tmp_dir, entry_dir)
+        except OSError:
+            # Another process stored the same evaluation in the meantime
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
+        self.evict()
+
+    def restore_artifacts(self, key, destination):
+        """
+        Copies the artifacts of an entry in a folder, keeping their relative paths.
+
+        Args:
+            key (str): The key of the evaluation.
+            destination (str): The folder receiving the artifacts.
+
+        Returns:
+            list: The restored files, relative to the destination.
+        """
+        artifacts_dir = self.get_artifacts_dir(key)
+
+        restored = []
+        for folder, dirs, files in os.walk(artifacts_dir):
+            for name in files:
+                relpath = os.path.relpath(os.path.join(folder, name), artifacts_dir)
+                os.makedirs(os.path.join(destination, os.path.dirname(relpath)), exist_ok=True)
+                shutil.copy2(os.path.join(folder, name), os.path.join(destination, relpath))
+                restored.append(relpath)
+
+        return restored
+
+    def get_entries(self):
+        """
+        Lists the entries of the cache.
+
+        Returns:
+            list: One (last use time, size in bytes, key) tuple per entry.
+        """
+        entries = []
+        if not os.path.isdir(self.folder):
+            return entries
+
+        for prefix in os.listdir(self.folder):
+            prefix_dir = os.path.join(self.folder, prefix)
+            if not os.path.isdir(prefix_dir):
+                continue
+
+            for key in os.listdir(prefix_dir):
+                entry_dir = os.path.join(prefix_dir, key)
+                try:
+                    last_use = os.stat(os.path.join(entry_dir, self.ENTRY_FILE)).st_mtime
+                    size = sum(os.path.getsize(os.path.join(folder, name))
+                               for folder, dirs, files in os.walk(entry_dir) for name in files)
+                except OSError:
+                    continue
+                entries.append((last_use, size, key))
+
+        return entries
+
+    def evict(self):
+        """
+        Removes the least recently used entries until the cache fits in max_bytes.
+
+        Returns:
+            list: The keys of the evicted entries.
+        """
+        entries = sorted(self.get_entries())
+        total = sum(size for _, size, _ in entries)
+
+        evicted = []
+        for _, size, key in entries:
+            if total <= self.max_bytes:
+                break
+            shutil.rmtree(self.get_entry_dir(key), ignore_errors=True)
+            total -= size
+            evicted.append(key)
+
+        return evicted
@@ -0,0 +1,136 @@
+# ---------------------------------------------------------
+# Bayesian Optimization Workflow for Medslik-II Simulations
+# Copyright (c) 2023-2024 CMCC Foundation
+# Licensed under The MIT License [see LICENSE for details]
+# Written by Marco Mariano De Carlo, Gabriele Accarino
+# ---------------------------------------------------------
+
+import numpy as np
+
+class MDK2SpillPropertiesRepo:
+
+    def __init__(self, fname):
+        """
+        Reader of the parcels stored in the Medslik-II spill properties file (spill_properties.nc).
+
+        The file is opened on first access and kept open until close() is called, so that several
+        time steps can be read with the same handle. It can be used as a context manager.
+
+        Args:
+            fname (str): The path to the spill properties NetCDF file.
+        """
+        self.fname = fname
+        self.dataset = None
+
+    def __enter__(self):
+        return self.open()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def open(self):
+        """ Opens the NetCDF file, if it is not open yet """
+        if self.dataset is None:
+            import netCDF4
+
+            self.dataset = netCDF4.Dataset(self.fname)
+
+            # Parcels are selected through their status, fill values never reach the returned arrays
+            self.dataset.set_auto_mask(False)
+
+        return self
+
+    def close(self):
+        """ Closes the NetCDF file """
+        if self.dataset is not None:
+            self.dataset.close()
+            self.dataset = None
+
+    """
+    Returns the number of time steps and the oil density stored in the file
+    """
+    def get_time_steps(self):
+        return len(self.open().dataset.dimensions['time'])
+
+    def get_oil_density(self):
+        return self.open().dataset.variables['non_evaporative_volume'].oil_density
+
+    def read_variable(self, name, time_indices, dtype=np.float64):
+        """
+        Reads the hyperslab of a (time, parcel) variable covering the requested time steps.
+
+        Args:
+            name (str): The name of the variable.
+            time_indices (list): Sorted time indices; a contiguous range is read with a single slice.
+            dtype (numpy.dtype): The type of the returned array.
+
+        Returns:
+            numpy.ndarray: A (len(time_indices), parcels) array.
+        """
+        variable = self.open().dataset.variables[name]
+
+        if time_indices[-1] - time_indices[0] == len(time_indices) - 1:
+            values = variable[time_indices[0]:time_indices[-1]+1, :]
+        else:
+            values = variable[time_indices, :]
+
+        return np.asarray(values, dtype=dtype)
+
+    def get_surface_parcels(self, time_indices):
+        """
+        Reads the position and volume of the floating parcels at the requested time steps.
+
+        Args:
+            time_indices (int or list): A time index, or a list of time indices.
+
+        Returns:
+            tuple or list: Longitude, latitude and total volume (evaporative and non evaporative) of the
+                           floating parcels, or a list of such tuples when a list of time indices is given.
+        """
+        single = np.isscalar(time_indices)
+        requested = [int(time_indices)] if single else [int(t) for t in time_indices]
+        if len(requested) == 0:
+            return []
+
+        time_steps = sorted(set(requested))
+
+        particle_status = self.read_variable('particle_status', time_steps, np.int32)
+        lat = self.read_variable('latitude', time_steps)
+        lon = self.read_variable('longitude', time_steps)
+        volume = self.read_variable('evaporative_volume', time_steps) + self.read_variable('non_evaporative_volume', time_steps)
+
+        # Identify floating particles
+        floating = (particle_status > 0) & (particle_status <= 2)
+
+        parcels = {}
+        for row, time_index in enumerate(time_steps):
+            mask = floating[row]
+            parcels[time_index] = (lon[row, mask], lat[row, mask], volume[row, mask])
+
+        if single:
+            return parcels[requested[0]]
+
+        return [parcels[time_index] for time_index in requested]
+
+    def iter_surface_parcels(self, time_indices=None, chunk_size=24):
+        """
+        Walks the floating parcels time step by time step, reading chunk_size time steps at a time
+        so that the whole (time, parcel) arrays are never loaded in memory.
+
+        Args:
+            time_indices (list, optional): The time indices to read. Every time step of the file when None.
+            chunk_size (int): The number of time steps read at once.
+
+        Yields:
+            tuple: The time index, and longitude, latitude and total volume of the floating parcels.
+        """
+        if time_indices is None:
+            time_indices = range(self.get_time_steps())
+
+        time_indices = list(time_indices)
+
+        for start in range(0, len(time_indices), chunk_size):
+            chunk = time_indices[start:start+chunk_size]
+
+            for time_index, parcels in zip(chunk, self.get_surface_parcels(chunk)):
+                yield (time_index,) + parcels
@@ -0,0 +1,110 @@
+# ---------------------------------------------------------
+# Bayesian Optimization Workflow for Medslik-II Simulations
+# Copyright (c) 2023-2024 CMCC Foundation
+# Licensed under The MIT License [see LICENSE for details]
+# Written by Marco Mariano De Carlo, Gabriele Accarino
+# ---------------------------------------------------------
+
+import os
+import json
+import shutil
+import hashlib
+
+class ModelBuildCacheRepo:
+
+    """
+    Layout of the cache: one folder per build hash, holding a copy of the files produced by the
+    compilation (relative to the RUN folder) and a manifest listing them
+    """
+    MANIFEST_FILE = 'manifest.json'
+
+    def __init__(self, folder):
+        """
+        Cache of the MEDSLIK-II builds, keyed by a hash of the model sources and compile inputs.
+
+        Args:
+            folder (str): The folder holding the cache, created on first write.
+        """
+        self.folder = folder
+
+    def get_entry_dir(self, build_hash):
+        return os.path.join(self.folder, build_hash)
+
+    def get_manifest(self, build_hash):
+        """
+        Reads the manifest of a build.
+
+        Args:
+            build_hash (str): The hash of the build.
+
+        Returns:
+            dict: The manifest, with the build products and their hashes, or None if the build is not cached.
+        """
+        manifest_file = os.path.join(self.get_entry_dir(build_hash), self.MANIFEST_FILE)
+        if not os.path.isfile(manifest_file):
+            return None
+
+        with open(manifest_file) as f:
+            return json.load(f)
+
+    @staticmethod
+    def hash_file(fname):
+        digest = hashlib.sha256()
+        with open(fname, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                digest.update(block)
+        return digest.hexdigest()
+
+    def store(self, build_hash, run_folder, products):
+        """
+        Stores the products of a build.
+
+        Args:
+            build_hash (str): The hash of the build.
+            run_folder (str): The RUN folder the products were compiled in.
+            products (list): The paths of the products, relative to the RUN folder.
+        """
+        entry_dir = self.get_entry_dir(build_hash)
+        tmp_dir = f"{entry_dir}.tmp{os.getpid()}"
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+        manifest = {'build_hash': build_hash, 'products': {}}
+        for product in products:
+            dst = os.path.join(tmp_dir, product)
+            os.makedirs(os.path.dirname(dst), exist_ok=True)
+            shutil.copy2(os.path.join(run_folder, product), dst)
+            manifest['products'][product] = self.hash_file(dst)
+
+        with open(os.path.join(tmp_dir, self.MANIFEST_FILE), 'w') as f:
+            json.dump(manifest, f, indent=2)
+
+        # The entry appears with its manifest, so that a partial copy is never taken for a build
+        shutil.rmtree(entry_dir, ignore_errors=True)
+        os.replace(tmp_dir, entry_dir)
+
+    def restore(self, build_hash, run_folder):
+        """
+        Puts the products of a cached build back in the RUN folder, copying only the missing or different ones.
+
+        Args:
+            build_hash (str): The hash of the build.
+            run_folder (str): The RUN folder.
+
+        Returns:
+            list: The restored products, or None if the build is not cached.
+        """
+        manifest = self.get_manifest(build_hash)
+        if manifest is None:
+            return None
+
+        restored = []
+        for product, product_hash in manifest['products'].items():
+            dst = os.path.join(run_folder, product)
+            if os.path.isfile(dst) and self.hash_file(dst) == product_hash:
+                continue
+
+            os.makedirs(os.path.dirname(dst), exist_ok=True)
+            shutil.copy2(os.path.join(self.get_entry_dir(build_hash), product), dst)
+            restored.append(product)
+
+        return restored
@@ -0,0 +1,150 @@
+# ---------------------------------------------------------
+# Bayesian Optimization Workflow for Medslik-II Simulations
+# Copyright (c) 2023-2024 CMCC Foundation
+# Licensed under The MIT License [see LICENSE for details]
+# Written by Marco Mariano De Carlo, Gabriele Accarino
+# ---------------------------------------------------------
+
+import os
+import csv
+import threading
+import numpy as np
+
+"""
+Snapshots are appended by one thread at a time: the iteration, the offset of the records and the index rows
+of an evaluation are allocated and written holding this lock
+"""
+_lock = threading.RLock()
+
+class ParcelSnapshotRepo:
+
+    """
+    Layout of the store: parcels.f32 holds (longitude, latitude, volume) float32 records appended one
+    snapshot after the other, index.csv locates each snapshot by iteration, time index and parameters
+    """
+    PARCELS_FILE = 'parcels.f32'
+    INDEX_FILE = 'index.csv'
+    INDEX_COLUMNS = ['iteration', 'time_index', 'offset', 'count']
+
+    def __init__(self, folder):
+        """
+        Store of the floating parcels of every evaluated parameter set.
+
+        Args:
+            folder (str): The folder holding the store, created on first write.
+        """
+        self.folder = folder
+
+    def get_parcels_file(self):
+        return os.path.join(self.folder, self.PARCELS_FILE)
+
+    def get_index_file(self):
+        return os.path.join(self.folder, self.INDEX_FILE)
+
+    def get_index(self):
+        """
+        Reads the index of the store.
+
+        Returns:
+            list: One dict per snapshot, with iteration, time_index, offset, count and the parameter values.
+        """
+        if not os.path.isfile(self.get_index_file()):
+            return []
+
+        with open(self.get_index_file(), newline='') as f:
+            rows = list(csv.DictReader(f))
+
+        return [{k: int(v) if k in self.INDEX_COLUMNS else float(v) for k, v in row.items()} for row in rows]
+
+    def get_next_iteration(self):
+        index = self.get_index()
+        return max(row['iteration'] for row in index) + 1 if index else 0
+
+    def append(self, iteration, parameters, snapshots):
+        """
+        Appends the parcels of an evaluation to the store.
+
+        Args:
+            iteration (int): The iteration of the optimization.
+            parameters (dict): The parameter values of the evaluation.
+            snapshots (dict): The (longitude, latitude, volume) arrays of the floating parcels, keyed by time index.
+        """
+        os.makedirs(self.folder, exist_ok=True)
+
+        with _lock:
+            offset = os.path.getsize(self.get_parcels_file()) // (3 * 4) if os.path.isfile(self.get_parcels_file()) else 0
+
+            new_index = not os.path.isfile(self.get_index_file())
+            rows = []
+
+            with open(self.get_parcels_file(), 'ab') as f:
+                for time_index, (lons, lats, volumes) in sorted(snapshots.items()):
+                    records = np.column_stack((lons, lats, volumes)).astype(np.float32)
+                    f.write(records.tobytes())
+
+                    rows.append([iteration, time_index, offset, len(records)] + [parameters[k] for k in parameters])
+                    offset += len(records)
+
+            # The index is written after the parcels, so that it never points to missing records
+            with open(self.get_index_file(), 'a', newline='') as f:
+                writer = csv.writer(f)
+                if new_index:
+                    writer.writerow(self.INDEX_COLUMNS + list(parameters))
+                writer.writerows(rows)
+
+    def append_next(self, parameters, snapshots):
+        """
+        Appends the parcels of an evaluation as the next iteration of the store, allocating the iteration
+        and writing the snapshots at once, so that concurrent evaluations never get the same iteration.
+
+        Args:
+            parameters (dict): The parameter values of the evaluation.
+            snapshots (dict): The (longitude, latitude, volume) arrays of the floating parcels, keyed by time index.
+
+        Returns:
+            int: The iteration assigned to the evaluation.
+        """
+        with _lock:
+            iteration = self.get_next_iteration()
+            self.append(iteration, parameters, snapshots)
+
+        return iteration
+
+    def get_parcels(self, iteration, time_index=None):
+        """
+        Returns the parcels of an evaluation as a read-only view on the memory-mapped store.
+
+        Args:
+            iteration (int): The iteration of the optimization.
+            time_index (int, optional): The time index. The first snapshot of the iteration when None.
+
+        Returns:
+            tuple: Longitude, latitude and volume (float32) of the floating parcels.
+
+        Raises:
+            KeyError: If the snapshot is not in the store.
+        """
+        for row in self.get_index():
+            if row['iteration'] == iteration and (time_index is None or row['time_index'] == time_index):
+                if row['count'] == 0:
+                    return tuple(np.empty(0, dtype=np.float32) for _ in range(3))
+
+                records = np.memmap(self.get_parcels_file(), dtype=np.float32, mode='r').reshape(-1, 3)
+                snapshot = records[row['offset']:row['offset']+row['count']]
+                return snapshot[:, 0], snapshot[:, 1], snapshot[:, 2]
+
+        raise KeyError(f"No parcel snapshot for iteration {iteration} and time index {time_index}")
+
+    def find_iterations(self, parameters, tolerance=0.):
+        """
+        Looks for the evaluations of a parameter set.
+
+        Args:
+            parameters (dict): The parameter values.
+            tolerance (float): The maximum absolute difference of each parameter value.
+
+        Returns:
+            list: The matching iterations.
+        """
+        return sorted({row['iteration'] for row in self.get_index()
+                       if all(abs(row[k] - float(v)) <= tolerance for k, v in parameters.items())})
@@ -11,6 +11,12 @@ class BayOptSetup:
     
     def __init__(self, eval_metric: str, init_points: int, n_iter: int,
                  random_state: str, decimal_precision: int, verbose: int, 
+                 artifact_policy: str = None, metric_series: str = None,
+                 parcel_snapshots: bool = None, campaign_archive: bool = None,
+                 workers: int = None, evaluation_cache_size: int = None,
+                 gp_refit_every: int = None, gp_refit_tolerance: float = None,
+                 gp_refit_interval: float = None, gp_n_jobs: int = None,
+                 init_design: str = None,
                  config_service = ConfigService): 
         """ Initialize class with specified parameters """
         
@@ -20,6 +26,17 @@ class BayOptSetup:
         self._random_state = random_state
         self._decimal_precision = decimal_precision
         self._verbose = verbose
+        self._artifact_policy = artifact_policy
+        self._metric_series = metric_series
+        self._parcel_snapshots = parcel_snapshots
+        self._campaign_archive = campaign_archive
+        self._workers = workers
+        self._evaluation_cache_size = evaluation_cache_size
+        self._gp_refit_every = gp_refit_every
+        self._gp_refit_tolerance = gp_refit_tolerance
+        self._gp_refit_interval = gp_refit_interval
+        self._gp_n_jobs = gp_n_jobs
+        self._init_design = init_design
         self._config_service = config_service
         
     """
@@ -74,6 +91,94 @@ class BayOptSetup:
     def set_verbose(self, value):
         self._verbose = value
 
+    @property
+    def get_artifact_policy(self):
+        return self._artifact_policy
+
+    @get_artifact_policy.setter
+    def set_artifact_policy(self, value):
+        self._artifact_policy = value
+
+    @property
+    def get_metric_series(self):
+        return self._metric_series
+
+    @get_metric_series.setter
+    def set_metric_series(self, value):
+        self._metric_series = value
+
+    @property
+    def get_parcel_snapshots(self):
+        return self._parcel_snapshots
+
+    @get_parcel_snapshots.setter
+    def set_parcel_snapshots(self, value):
+        self._parcel_snapshots = value
+
+    @property
+    def get_campaign_archive(self):
+        return self._campaign_archive
+
+    @get_campaign_archive.setter
+    def set_campaign_archive(self, value):
+        self._campaign_archive = value
+
+    @property
+    def get_workers(self):
+        return self._workers
+
+    @get_workers.setter
+    def set_workers(self, value):
+        self._workers = value
+
+    @property
+    def get_evaluation_cache_size(self):
+        return self._evaluation_cache_size
+
+    @get_evaluation_cache_size.setter
+    def set_evaluation_cache_size(self, value):
+        self._evaluation_cache_size = value
+
+    @property
+    def get_gp_refit_every(self):
+        return self._gp_refit_every
+
+    @get_gp_refit_every.setter
+    def set_gp_refit_every(self, value):
+        self._gp_refit_every = value
+
+    @property
+    def get_gp_refit_tolerance(self):
+        return self._gp_refit_tolerance
+
+    @get_gp_refit_tolerance.setter
+    def set_gp_refit_tolerance(self, value):
+        self._gp_refit_tolerance = value
+
+    @property
+    def get_gp_refit_interval(self):
+        return self._gp_refit_interval
+
+    @get_gp_refit_interval.setter
+    def set_gp_refit_interval(self, value):
+        self._gp_refit_interval = value
+
+    @property
+    def get_gp_n_jobs(self):
+        return self._gp_n_jobs
+
+    @get_gp_n_jobs.setter
+    def set_gp_n_jobs(self, value):
+        self._gp_n_jobs = value
+
+    @property
+    def get_init_design(self):
+        return self._init_design
+
+    @get_init_design.setter
+    def set_init_design(self, value):
+        self._init_design = value
+
     @property
     def get_config_service(self):
         return self._config_service
@@ -0,0 +1,77 @@
+# ---------------------------------------------------------
+# Bayesian Optimization Workflow for Medslik-II Simulations
+# Copyright (c) 2023-2024 CMCC Foundation
+# Licensed under The MIT License [see LICENSE for details]
+# Written by Marco Mariano De Carlo, Gabriele Accarino
+# ---------------------------------------------------------
+
+class ComparisonGrid:
+
+    def __init__(self, lonmin: float, latmin: float, resolution: float, nx: int, ny: int):
+        """ Initialize a regular lon/lat lattice from its lower-left corner, cell size (degrees) and number of cells """
+
+        self._lonmin = lonmin
+        self._latmin = latmin
+        self._resolution = resolution
+        self._nx = nx
+        self._ny = ny
+
+    """
+    Getter and setter methods to return or set values related to the class
+    """
+
+    @property
+    def get_lonmin(self):
+        return self._lonmin
+
+    @get_lonmin.setter
+    def set_lonmin(self, value):
+        self._lonmin = value
+
+    @property
+    def get_latmin(self):
+        return self._latmin
+
+    @get_latmin.setter
+    def set_latmin(self, value):
+        self._latmin = value
+
+    @property
+    def get_resolution(self):
+        return self._resolution
+
+    @get_resolution.setter
+    def set_resolution(self, value):
+        self._resolution = value
+
+    @property
+    def get_nx(self):
+        return self._nx
+
+    @get_nx.setter
+    def set_nx(self, value):
+        self._nx = value
+
+    @property
+    def get_ny(self):
+        return self._ny
+
+    @get_ny.setter
+    def set_ny(self, value):
+        self._ny = value
+
+    """
+    Derived values: array shape (rows are latitudes, columns are longitudes) and upper-right corner
+    """
+
+    @property
+    def get_shape(self):
+        return (self._ny, self._nx)
+
+    @property
+    def get_lonmax(self):
+        return self._lonmin + self._nx * self._resolution
+
+    @property
+    def get_latmax(self):
+        return self._latmin + self._ny * self._resolution
@@ -0,0 +1,64 @@
+# ---------------------------------------------------------
+# Bayesian Optimization Workflow for Medslik-II Simulations
+# Copyright (c) 2023-2024 CMCC Foundation
+# Licensed under The MIT License [see LICENSE for details]
+# Written by Marco Mariano De Carlo, Gabriele Accarino
+# ---------------------------------------------------------
+
+import numpy as np
+
+from src.domain.ComparisonGrid import ComparisonGrid
+
+class ComparisonRaster:
+
+    def __init__(self, grid: ComparisonGrid, layers: dict = None):
+        """ Initialize a raster on the given lattice, with named 2-D layers indexed as [row (lat), column (lon)] """
+
+        self._grid = grid
+        self._layers = {}
+
+        for name, values in (layers or {}).items():
+            self.set_layer(name, values)
+
+    """
+    Getter and setter methods to return or set values related to the class
+    """
+
+    @property
+    def get_grid(self):
+        return self._grid
+
+    @get_grid.setter
+    def set_grid(self, value):
+        self._grid = value
+
+    @property
+    def get_layers(self):
+        return self._layers
+
+    @property
+    def get_shape(self):
+        return self._grid.get_shape
+
+    @property
+    def get_origin(self):
+        return (self._grid.get_lonmin, self._grid.get_latmin)
+
+    @property
+    def get_resolution(self):
+        return self._grid.get_resolution
+
+    """
+    Layers are read and written as whole 2-D arrays
+    """
+
+    def get_layer(self, name):
+        return self._layers[name]
+
+    def set_layer(self, name, values):
+        values = np.asarray(values)
+
+        if values.shape != self.get_shape:
+            raise ValueError(f"Layer '{name}' has shape {values.shape}, expected {self.get_shape}")
+
+        self._layers[name] = values
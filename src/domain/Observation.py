@@ -0,0 +1,73 @@
+# ---------------------------------------------------------
+# Bayesian Optimization Workflow for Medslik-II Simulations
+# Copyright (c) 2023-2024 CMCC Foundation
+# Licensed under The MIT License [see LICENSE for details]
+# Written by Marco Mariano De Carlo, Gabriele Accarino
+# ---------------------------------------------------------
+
+from src.domain.ComparisonRaster import ComparisonRaster
+
+class Observation:
+
+    def __init__(self, path: str, content_hash: str, raster: ComparisonRaster,
+                 bounds: tuple, centroid: tuple, geometries=None):
+        """ Initialize class with specified parameters """
+
+        self._path = path
+        self._content_hash = content_hash
+        self._raster = raster
+        self._bounds = bounds
+        self._centroid = centroid
+        self._geometries = geometries
+
+    """
+    Getter and setter methods to return or set values related to the class
+    """
+
+    @property
+    def get_path(self):
+        return self._path
+
+    @get_path.setter
+    def set_path(self, value):
+        self._path = value
+
+    @property
+    def get_content_hash(self):
+        return self._content_hash
+
+    @get_content_hash.setter
+    def set_content_hash(self, value):
+        self._content_hash = value
+
+    @property
+    def get_raster(self):
+        return self._raster
+
+    @get_raster.setter
+    def set_raster(self, value):
+        self._raster = value
+
+    @property
+    def get_bounds(self):
+        return self._bounds
+
+    @get_bounds.setter
+    def set_bounds(self, value):
+        self._bounds = value
+
+    @property
+    def get_centroid(self):
+        return self._centroid
+
+    @get_centroid.setter
+    def set_centroid(self, value):
+        self._centroid = value
+
+    @property
+    def get_geometries(self):
+        return self._geometries
+
+    @get_geometries.setter
+    def set_geometries(self, value):
+        self._geometries = value
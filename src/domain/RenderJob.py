@@ -0,0 +1,43 @@
+# ---------------------------------------------------------
+# Bayesian Optimization Workflow for Medslik-II Simulations
+# Copyright (c) 2023-2024 CMCC Foundation
+# Licensed under The MIT License [see LICENSE for details]
+# Written by Marco Mariano De Carlo, Gabriele Accarino
+# ---------------------------------------------------------
+
+class RenderJob:
+
+    def __init__(self, output_file: str, data: dict, copy_folders: list = None):
+        """ Initialize a plot to be rendered in background, with the arrays and texts it needs """
+
+        self._output_file = output_file
+        self._data = data
+        self._copy_folders = copy_folders or []
+
+    """
+    Getter and setter methods to return or set values related to the class
+    """
+
+    @property
+    def get_output_file(self):
+        return self._output_file
+
+    @get_output_file.setter
+    def set_output_file(self, value):
+        self._output_file = value
+
+    @property
+    def get_data(self):
+        return self._data
+
+    @get_data.setter
+    def set_data(self, value):
+        self._data = value
+
+    @property
+    def get_copy_folders(self):
+        return self._copy_folders
+
+    @get_copy_folders.setter
+    def set_copy_folders(self, value):
+        self._copy_folders = value
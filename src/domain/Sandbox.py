@@ -0,0 +1,70 @@
+# ---------------------------------------------------------
+# Bayesian Optimization Workflow for Medslik-II Simulations
+# Copyright (c) 2023-2024 CMCC Foundation
+# Licensed under The MIT License [see LICENSE for details]
+# Written by Marco Mariano De Carlo, Gabriele Accarino
+# ---------------------------------------------------------
+
+class Sandbox:
+
+    def __init__(self, index: int, root: str, MEDSLIK_RUN: str, CONFIG1: str, CONFIG2: str, MEDSLIK_OUT_DIR: str):
+        """ Initialize class with specified parameters """
+
+        self._index = index
+        self._root = root
+        self._MEDSLIK_RUN = MEDSLIK_RUN
+        self._CONFIG1 = CONFIG1
+        self._CONFIG2 = CONFIG2
+        self._MEDSLIK_OUT_DIR = MEDSLIK_OUT_DIR
+
+    """
+    Getter and setter methods to return or set values related to the class
+    """
+
+    @property
+    def get_index(self):
+        return self._index
+
+    @get_index.setter
+    def set_index(self, value):
+        self._index = value
+
+    @property
+    def get_root(self):
+        return self._root
+
+    @get_root.setter
+    def set_root(self, value):
+        self._root = value
+
+    @property
+    def get_MEDSLIK_RUN(self):
+        return self._MEDSLIK_RUN
+
+    @get_MEDSLIK_RUN.setter
+    def set_MEDSLIK_RUN(self, value):
+        self._MEDSLIK_RUN = value
+
+    @property
+    def get_CONFIG1(self):
+        return self._CONFIG1
+
+    @get_CONFIG1.setter
+    def set_CONFIG1(self, value):
+        self._CONFIG1 = value
+
+    @property
+    def get_CONFIG2(self):
+        return self._CONFIG2
+
+    @get_CONFIG2.setter
+    def set_CONFIG2(self, value):
+        self._CONFIG2 = value
+
+    @property
+    def get_MEDSLIK_OUT_DIR(self):
+        return self._MEDSLIK_OUT_DIR
+
+    @get_MEDSLIK_OUT_DIR.setter
+    def set_MEDSLIK_OUT_DIR(self, value):
+        self._MEDSLIK_OUT_DIR = value
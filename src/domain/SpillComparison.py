@@ -0,0 +1,65 @@
+# ---------------------------------------------------------
+# Bayesian Optimization Workflow for Medslik-II Simulations
+# Copyright (c) 2023-2024 CMCC Foundation
+# Licensed under The MIT License [see LICENSE for details]
+# Written by Marco Mariano De Carlo, Gabriele Accarino
+# ---------------------------------------------------------
+
+from src.domain.ComparisonRaster import ComparisonRaster
+from src.domain.Observation import Observation
+
+class SpillComparison:
+
+    def __init__(self, time_index: int, extent: tuple, raster: ComparisonRaster,
+                 observation: Observation, modelled_spill=None):
+        """ Initialize class with specified parameters """
+
+        self._time_index = time_index
+        self._extent = extent
+        self._raster = raster
+        self._observation = observation
+        self._modelled_spill = modelled_spill
+
+    """
+    Getter and setter methods to return or set values related to the class
+    """
+
+    @property
+    def get_time_index(self):
+        return self._time_index
+
+    @get_time_index.setter
+    def set_time_index(self, value):
+        self._time_index = value
+
+    @property
+    def get_extent(self):
+        return self._extent
+
+    @get_extent.setter
+    def set_extent(self, value):
+        self._extent = value
+
+    @property
+    def get_raster(self):
+        return self._raster
+
+    @get_raster.setter
+    def set_raster(self, value):
+        self._raster = value
+
+    @property
+    def get_observation(self):
+        return self._observation
+
+    @get_observation.setter
+    def set_observation(self, value):
+        self._observation = value
+
+    @property
+    def get_modelled_spill(self):
+        return self._modelled_spill
+
+    @get_modelled_spill.setter
+    def set_modelled_spill(self, value):
+        self._modelled_spill = value
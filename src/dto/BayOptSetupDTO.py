@@ -22,6 +22,17 @@ class BayOptSetupDTO:
             random_state = self.config_service.get_config_value('bayesian_optimization.setup.random_state'),
             decimal_precision = self.config_service.get_config_value('bayesian_optimization.setup.decimal_precision'),
             verbose = self.config_service.get_config_value('bayesian_optimization.setup.verbose'),
+            artifact_policy = self.config_service.get_config_value('bayesian_optimization.setup.artifact_policy'),
+            metric_series = self.config_service.get_config_value('bayesian_optimization.setup.metric_series'),
+            parcel_snapshots = self.config_service.get_config_value('bayesian_optimization.setup.parcel_snapshots'),
+            campaign_archive = self.config_service.get_config_value('bayesian_optimization.setup.campaign_archive'),
+            workers = self.config_service.get_config_value('bayesian_optimization.setup.workers'),
+            evaluation_cache_size = self.config_service.get_config_value('bayesian_optimization.setup.evaluation_cache_size'),
+            gp_refit_every = self.config_service.get_config_value('bayesian_optimization.setup.gp_refit_every'),
+            gp_refit_tolerance = self.config_service.get_config_value('bayesian_optimization.setup.gp_refit_tolerance'),
+            gp_refit_interval = self.config_service.get_config_value('bayesian_optimization.setup.gp_refit_interval'),
+            gp_n_jobs = self.config_service.get_config_value('bayesian_optimization.setup.gp_n_jobs'),
+            init_design = self.config_service.get_config_value('bayesian_optimization.setup.init_design'),
             config_service = self.config_service
         )
         
@@ -70,4 +81,70 @@ class BayOptSetupDTO:
         try:
             return self.bay_opt_setup_instance.get_verbose
         except (TypeError, KeyError):
-            return None
\ No newline at end of file
+            return None
+        
+    def get_artifact_policy(self):
+        try:
+            return self.bay_opt_setup_instance.get_artifact_policy
+        except (TypeError, KeyError):
+            return None
+
+    def get_metric_series(self):
+        try:
+            return self.bay_opt_setup_instance.get_metric_series
+        except (TypeError, KeyError):
+            return None
+
+    def get_parcel_snapshots(self):
+        try:
+            return self.bay_opt_setup_instance.get_parcel_snapshots
+        except (TypeError, KeyError):
+            return None
+
+    def get_campaign_archive(self):
+        try:
+            return self.bay_opt_setup_instance.get_campaign_archive
+        except (TypeError, KeyError):
+            return None
+
+    def get_workers(self):
+        try:
+            return self.bay_opt_setup_instance.get_workers
+        except (TypeError, KeyError):
+            return None
+
+    def get_evaluation_cache_size(self):
+        try:
+            return self.bay_opt_setup_instance.get_evaluation_cache_size
+        except (TypeError, KeyError):
+            return None
+
+    def get_gp_refit_every(self):
+        try:
+            return self.bay_opt_setup_instance.get_gp_refit_every
+        except (TypeError, KeyError):
+            return None
+
+    def get_gp_refit_tolerance(self):
+        try:
+            return self.bay_opt_setup_instance.get_gp_refit_tolerance
+        except (TypeError, KeyError):
+            return None
+
+    def get_gp_refit_interval(self):
+        try:
+            return self.bay_opt_setup_instance.get_gp_refit_interval
+        except (TypeError, KeyError):
+            return None
+
+    def get_gp_n_jobs(self):
+        try:
+            return self.bay_opt_setup_instance.get_gp_n_jobs
+        except (TypeError, KeyError):
+            return None
+
+    def get_init_design(self):
+        try:
+            return self.bay_opt_setup_instance.get_init_design
+        except (TypeError, KeyError):
+            return None
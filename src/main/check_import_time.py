@@ -0,0 +1,95 @@
+# ---------------------------------------------------------
+# Bayesian Optimization Workflow for Medslik-II Simulations
+# Copyright (c) 2023-2024 CMCC Foundation
+# Licensed under The MIT License [see LICENSE for details]
+# Written by Marco Mariano De Carlo, Gabriele Accarino
+# ---------------------------------------------------------
+
+"""
+Checks the import time of the workflow entry points with `python -X importtime`.
+
+Each entry point is imported in a fresh interpreter: its cumulative import time must stay within
+the budget, and none of the heavy geospatial, plotting or machine learning packages may be loaded,
+since they are imported by the code paths that use them.
+
+Usage (with the same environment variables used to launch the workflow):
+    python $ROOT/src/main/check_import_time.py [--budget 500] [--repeat 3]
+"""
+
+import sys
+import argparse
+import subprocess
+
+"""
+Modules imported when the workflow starts, and the packages they must not pull in
+"""
+ENTRY_POINTS = [
+    'src.main.main',
+    'src.controller.WorkflowController',
+    'src.controller.ObjFunctionController',
+    'src.service.MetricsService',
+]
+
+HEAVY_PACKAGES = [
+    'geopandas', 'shapely', 'xarray', 'netCDF4', 'pandas',
+    'matplotlib', 'mpl_toolkits', 'sklearn', 'scipy',
+]
+
+def measure_import(module, repeat):
+    """
+    Imports a module in fresh interpreters and parses the `-X importtime` report.
+
+    Args:
+        module (str): The module to import.
+        repeat (int): The number of measures, the fastest one is kept.
+
+    Returns:
+        tuple: The cumulative import time of the module in ms and the list of imported modules.
+    """
+    best_time, imported = None, []
+
+    for _ in range(repeat):
+        result = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+                                capture_output=True, text=True)
+        if result.returncode != 0:
+            raise RuntimeError(f"Unable to import {module}:\n{result.stderr}")
+
+        cumulative, imported = None, []
+        for line in result.stderr.splitlines():
+            if not line.startswith('import time:') or '|' not in line:
+                continue
+            _, cumulative_us, name = line.split('|')
+            if not cumulative_us.strip().isdigit():
+                continue
+            imported.append(name.strip())
+            if name.strip() == module:
+                cumulative = int(cumulative_us) / 1000.
+
+        if cumulative is not None and (best_time is None or cumulative < best_time):
+            best_time = cumulative
+
+    return best_time, imported
+
+def main(args):
+    failed = False
+
+    for module in ENTRY_POINTS:
+        elapsed, imported = measure_import(module, args.repeat)
+        heavy = sorted({name.split('.')[0] for name in imported} & set(HEAVY_PACKAGES))
+
+        status = 'OK'
+        if elapsed is None or elapsed > args.budget or heavy:
+            status, failed = 'FAIL', True
+
+        print(f"{status:4} {module:45} {elapsed if elapsed is not None else float('nan'):8.1f} ms"
+              + (f"  heavy imports: {', '.join(heavy)}" if heavy else ""))
+
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description='Import-time budget of the workflow entry points')
+    parser.add_argument('--budget', type=float, default=500., help='Maximum cumulative import time per entry point (ms)')
+    parser.add_argument('--repeat', type=int, default=3, help='Number of measures per entry point, the fastest one is kept')
+
+    sys.exit(main(parser.parse_args()))
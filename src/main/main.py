@@ -64,7 +64,7 @@ def main(args):
     """
     Perform configuration and workflow execution
     """
-    workflow_controller_instance.setup(args.mode)
+    workflow_controller_instance.setup(args.mode, args.rebuild)
     workflow_controller_instance.run(args.mode, parameters_bound, random_state, verbose)
     
     # TODO: da sostituire con eccezione personalizzata
@@ -87,6 +87,7 @@ if __name__ == "__main__":
     )
 
     parser.add_argument('--mode', '-m', type=int, help='For MEDSLIK II with BO: Bay_Opt or for a MDKII single run: Single_Run')
+    parser.add_argument('--rebuild', action='store_true', help='Compile MEDSLIK-II even if a cached build matches its sources')
     #parser.add_argument('--config', '-c', help='Path to config file (*.toml format)')
     parser.add_argument('--version', '-v', action='version', version='v1.0-dev')
     args = parser.parse_args()
@@ -61,4 +61,81 @@ class BayOptSetupService:
             return verbose
         except Exception as e:
             print(f"An error occurred: {e}")
-            return None
\ No newline at end of file
+            return None
+        
+    def get_artifact_policy(self):
+        try:
+            return self.bay_opt_setup_service_impl_instance.get_artifact_policy_impl()
+        except Exception as e:
+            print(f"An error occurred: {e}")
+            return None
+
+    def get_metric_series(self):
+        try:
+            return self.bay_opt_setup_service_impl_instance.get_metric_series_impl()
+        except Exception as e:
+            print(f"An error occurred: {e}")
+            return None
+
+    def get_parcel_snapshots(self):
+        try:
+            return self.bay_opt_setup_service_impl_instance.get_parcel_snapshots_impl()
+        except Exception as e:
+            print(f"An error occurred: {e}")
+            return False
+
+    def get_campaign_archive(self):
+        try:
+            return self.bay_opt_setup_service_impl_instance.get_campaign_archive_impl()
+        except Exception as e:
+            print(f"An error occurred: {e}")
+            return False
+
+    def get_workers(self):
+        try:
+            return self.bay_opt_setup_service_impl_instance.get_workers_impl()
+        except Exception as e:
+            print(f"An error occurred: {e}")
+            return 1
+
+    def get_evaluation_cache_size(self):
+        try:
+            return self.bay_opt_setup_service_impl_instance.get_evaluation_cache_size_impl()
+        except Exception as e:
+            print(f"An error occurred: {e}")
+            return 0
+
+    def get_gp_refit_every(self):
+        try:
+            return self.bay_opt_setup_service_impl_instance.get_gp_refit_every_impl()
+        except Exception as e:
+            print(f"An error occurred: {e}")
+            return 1
+
+    def get_gp_refit_tolerance(self):
+        try:
+            return self.bay_opt_setup_service_impl_instance.get_gp_refit_tolerance_impl()
+        except Exception as e:
+            print(f"An error occurred: {e}")
+            return 0
+
+    def get_gp_refit_interval(self):
+        try:
+            return self.bay_opt_setup_service_impl_instance.get_gp_refit_interval_impl()
+        except Exception as e:
+            print(f"An error occurred: {e}")
+            return 0
+
+    def get_gp_n_jobs(self):
+        try:
+            return self.bay_opt_setup_service_impl_instance.get_gp_n_jobs_impl()
+        except Exception as e:
+            print(f"An error occurred: {e}")
+            return 1
+
+    def get_init_design(self):
+        try:
+            return self.bay_opt_setup_service_impl_instance.get_init_design_impl()
+        except Exception as e:
+            print(f"An error occurred: {e}")
+            return "random"
@@ -0,0 +1,50 @@
+# ---------------------------------------------------------
+# Bayesian Optimization Workflow for Medslik-II Simulations
+# Copyright (c) 2023-2024 CMCC Foundation
+# Licensed under The MIT License [see LICENSE for details]
+# Written by Marco Mariano De Carlo, Gabriele Accarino
+# ---------------------------------------------------------
+
+from src.serviceImpl.EvaluationCacheServiceImpl import EvaluationCacheServiceImpl
+
+class EvaluationCacheService:
+
+    def __init__(self):
+        """ Initialize the requested service instance """
+
+        self.evaluation_cache_service_impl_instance = EvaluationCacheServiceImpl()
+
+    def describe_evaluation(self, parameters, particles):
+        try:
+            return self.evaluation_cache_service_impl_instance.describe_evaluation_impl(parameters, particles)
+        except Exception as e:
+            print(f"An error occurred: {e}")
+            return None
+
+    def get_key(self, description):
+        try:
+            return self.evaluation_cache_service_impl_instance.get_key_impl(description)
+        except Exception as e:
+            print(f"An error occurred: {e}")
+            return None
+
+    def lookup(self, key):
+        try:
+            return self.evaluation_cache_service_impl_instance.lookup_impl(key)
+        except Exception as e:
+            print(f"An error occurred: {e}")
+            return None
+
+    def store(self, key, description, metrics, artifacts=None):
+        try:
+            return self.evaluation_cache_service_impl_instance.store_impl(key, description, metrics, artifacts)
+        except Exception as e:
+            print(f"An error occurred: {e}")
+            return None
+
+    def restore_artifacts(self, key):
+        try:
+            return self.evaluation_cache_service_impl_instance.restore_artifacts_impl(key)
+        except Exception as e:
+            print(f"An error occurred: {e}")
+            return []
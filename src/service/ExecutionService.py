@@ -27,12 +27,22 @@ class ExecutionService:
         except UpdateConfigException as e:
             print(f"Error: {e}")
     
+    """
+    Invokes the method that computes the hash of the model build using the specific implementation by handling its exceptions
+    """
+    def get_build_hash(self):
+        try:
+            return self.execution_service_impl_instance.get_build_hash_impl()
+        except Exception as e:
+            print(f"An error occurred: {e}")
+            return None
+
     """
     Invokes the method that compile the model using the specific implementation by handling its exceptions
     """
-    def compile_model(self):
+    def compile_model(self, rebuild=False):
         try:
-            self.execution_service_impl_instance.compile_model()
+            self.execution_service_impl_instance.compile_model(rebuild)
         except WrongConfigurationException as e:
             print(f"Error: {e}")
 
@@ -47,6 +57,14 @@ class ExecutionService:
             
     def save_best_detection(self, value):
         try:
-            self.execution_service_impl_instance.save_best_detection_impl(value)
+            return self.execution_service_impl_instance.save_best_detection_impl(value)
         except WrongConfigurationException as e:
-            print(f"Error: {e}")
\ No newline at end of file
+            print(f"Error: {e}")
+            return False
+
+    def is_new_best(self, value):
+        try:
+            return self.execution_service_impl_instance.is_new_best_impl(value)
+        except Exception as e:
+            print(f"An error occurred: {e}")
+            return False
\ No newline at end of file
@@ -0,0 +1,85 @@
+# ---------------------------------------------------------
+# Bayesian Optimization Workflow for Medslik-II Simulations
+# Copyright (c) 2023-2024 CMCC Foundation
+# Licensed under The MIT License [see LICENSE for details]
+# Written by Marco Mariano De Carlo, Gabriele Accarino
+# ---------------------------------------------------------
+
+from src.serviceImpl.GriddingServiceImpl import GriddingServiceImpl
+
+class GriddingService:
+
+    def __init__(self):
+        """ Initialize the requested service instance """
+
+        self.gridding_service_impl_instance = GriddingServiceImpl()
+
+    def make_comparison_grid(self, xmin, xmax, ymin, ymax, cell_size, anchor=None):
+        try:
+            return self.gridding_service_impl_instance.make_comparison_grid_impl(xmin, xmax, ymin, ymax, cell_size, anchor)
+        except Exception as e:
+            print(f"An error occurred: {e}")
+            return None
+
+    def get_cell_indices(self, grid, lons, lats):
+        try:
+            return self.gridding_service_impl_instance.get_cell_indices_impl(grid, lons, lats)
+        except Exception as e:
+            print(f"An error occurred: {e}")
+            return None
+
+    def count_parcels(self, grid, lons, lats, weights=None):
+        try:
+            return self.gridding_service_impl_instance.count_parcels_impl(grid, lons, lats, weights)
+        except Exception as e:
+            print(f"An error occurred: {e}")
+            return None
+
+    def get_cell_centres(self, grid):
+        try:
+            return self.gridding_service_impl_instance.get_cell_centres_impl(grid)
+        except Exception as e:
+            print(f"An error occurred: {e}")
+            return None
+
+    def rasterize_geometries(self, grid, geometries):
+        try:
+            return self.gridding_service_impl_instance.rasterize_geometries_impl(grid, geometries)
+        except Exception as e:
+            print(f"An error occurred: {e}")
+            return None
+
+    def make_poly_grid(self, grid, cell_mask=None, cell_values=None):
+        try:
+            return self.gridding_service_impl_instance.make_poly_grid_impl(grid, cell_mask, cell_values)
+        except Exception as e:
+            print(f"An error occurred: {e}")
+            return None
+
+    def embed_layer(self, grid, raster, name):
+        try:
+            return self.gridding_service_impl_instance.embed_layer_impl(grid, raster, name)
+        except Exception as e:
+            print(f"An error occurred: {e}")
+            return None
+
+    def make_comparison_raster(self, grid, cell_counts, observation_mask):
+        try:
+            return self.gridding_service_impl_instance.make_comparison_raster_impl(grid, cell_counts, observation_mask)
+        except Exception as e:
+            print(f"An error occurred: {e}")
+            return None
+
+    def make_union_array(self, raster):
+        try:
+            return self.gridding_service_impl_instance.make_union_array_impl(raster)
+        except Exception as e:
+            print(f"An error occurred: {e}")
+            return None
+
+    def make_event_set(self, raster):
+        try:
+            return self.gridding_service_impl_instance.make_event_set_impl(raster)
+        except Exception as e:
+            print(f"An error occurred: {e}")
+            return None
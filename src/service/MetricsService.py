@@ -35,16 +35,9 @@ class MetricsService:
             print(f"An error occurred: {e}")
             return None
         
-    def get_surface_parcels_service(self, fname, time_index):
+    def get_surface_parcels_service(self, fname, time_index, spill_properties=None):
         try:
-            return self.metrics_service_impl_instance.get_surface_parcels_service_impl(fname, time_index)
-        except Exception as e:
-            print(f"An error occurred: {e}")
-            return None
-        
-    def make_poly_grid_service(self, xmin, xmax, ymin, ymax, cell_size, crs):
-        try:
-            return self.metrics_service_impl_instance.make_poly_grid_service_impl(xmin, xmax, ymin, ymax, cell_size, crs)
+            return self.metrics_service_impl_instance.get_surface_parcels_service_impl(fname, time_index, spill_properties)
         except Exception as e:
             print(f"An error occurred: {e}")
             return None
@@ -91,23 +84,93 @@ class MetricsService:
             print(f"An error occurred: {e}")
             return None
         
-    def compute_multi_fss_service(self, values):
+    def prepare_observation_service(self):
+        try:
+            return self.metrics_service_impl_instance.prepare_observation_service_impl()
+        except Exception as e:
+            print(f"An error occurred: {e}")
+            return None
+
+    def compute_multi_fss_service(self, values, write_artifacts=True):
         try:
-            return self.metrics_service_impl_instance.compute_multi_fss_service_impl(values)
+            return self.metrics_service_impl_instance.compute_multi_fss_service_impl(values, write_artifacts)
         except Exception as e:
             print(f"Compute Multi FSS, An error occurred: {e}")
             return None
         
-    def compute_multi_overlay_service(self, values):
+    def compute_multi_overlay_service(self, values, write_artifacts=True):
         try:
-            return self.metrics_service_impl_instance.compute_multi_overlay_service_impl(values)
+            return self.metrics_service_impl_instance.compute_multi_overlay_service_impl(values, write_artifacts)
         except Exception as e:
             print(f"Compute Multi overlay, An error occurred: {e}")
             return None
         
-    def compute_multi_centroid_distance_service(self, values):
+    def compute_multi_centroid_distance_service(self, values, write_artifacts=True):
         try:
-            return self.metrics_service_impl_instance.compute_multi_centroid_distance_service_impl(values)
+            return self.metrics_service_impl_instance.compute_multi_centroid_distance_service_impl(values, write_artifacts)
         except Exception as e:
             print(f"Compute Multi centroid distance, An error occurred: {e}")
-            return None
\ No newline at end of file
+            return None
+        
+    def compute_metric_service(self, values, write_artifacts=True):
+        try:
+            return self.metrics_service_impl_instance.compute_metric_service_impl(values, write_artifacts)
+        except Exception as e:
+            print(f"Compute metric, An error occurred: {e}")
+            return None
+
+    def get_metric_name_service(self):
+        try:
+            return self.metrics_service_impl_instance.get_metric_name_service_impl()
+        except Exception as e:
+            print(f"An error occurred: {e}")
+            return None
+
+    def compute_metrics_service(self, values, write_artifacts=True, archive_parameters=None, artifacts=None, stage=None):
+        try:
+            return self.metrics_service_impl_instance.compute_metrics_service_impl(values, write_artifacts, archive_parameters=archive_parameters, artifacts=artifacts, stage=stage)
+        except Exception as e:
+            print(f"An error occurred: {e}")
+            return None
+
+    def save_stage_artifacts_service(self, stage, values, artifacts=None):
+        try:
+            return self.metrics_service_impl_instance.save_stage_artifacts_service_impl(stage, values, artifacts)
+        except Exception as e:
+            print(f"An error occurred: {e}")
+            return None
+
+    def compute_metric_series_service(self, save_rasters=False):
+        try:
+            return self.metrics_service_impl_instance.compute_metric_series_service_impl(save_rasters)
+        except Exception as e:
+            print(f"An error occurred: {e}")
+            return None
+
+    def save_parcel_snapshot_service(self, parameters, time_indices=None):
+        try:
+            return self.metrics_service_impl_instance.save_parcel_snapshot_service_impl(parameters, time_indices)
+        except Exception as e:
+            print(f"An error occurred: {e}")
+            return None
+
+    def compute_snapshot_metrics_service(self, iteration, time_index=None):
+        try:
+            return self.metrics_service_impl_instance.compute_snapshot_metrics_service_impl(iteration, time_index)
+        except Exception as e:
+            print(f"An error occurred: {e}")
+            return None
+
+    def compute_archived_metrics_service(self, iteration):
+        try:
+            return self.metrics_service_impl_instance.compute_archived_metrics_service_impl(iteration)
+        except Exception as e:
+            print(f"An error occurred: {e}")
+            return None
+
+    def compute_archived_fss_service(self, iterations=slice(None), chunk_size=16):
+        try:
+            return self.metrics_service_impl_instance.compute_archived_fss_service_impl(iterations, chunk_size)
+        except Exception as e:
+            print(f"An error occurred: {e}")
+            return None
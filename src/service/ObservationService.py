@@ -0,0 +1,43 @@
+# ---------------------------------------------------------
+# Bayesian Optimization Workflow for Medslik-II Simulations
+# Copyright (c) 2023-2024 CMCC Foundation
+# Licensed under The MIT License [see LICENSE for details]
+# Written by Marco Mariano De Carlo, Gabriele Accarino
+# ---------------------------------------------------------
+
+from src.serviceImpl.ObservationServiceImpl import ObservationServiceImpl
+
+class ObservationService:
+
+    def __init__(self):
+        """ Initialize the requested service instance """
+
+        self.observation_service_impl_instance = ObservationServiceImpl()
+
+    def get_observation_path(self):
+        try:
+            return self.observation_service_impl_instance.get_observation_path_impl()
+        except Exception as e:
+            print(f"An error occurred: {e}")
+            return None
+
+    def hash_observation(self, observation_path):
+        try:
+            return self.observation_service_impl_instance.hash_observation_impl(observation_path)
+        except Exception as e:
+            print(f"An error occurred: {e}")
+            return None
+
+    def get_observation(self, observation_path, grid_resolution):
+        try:
+            return self.observation_service_impl_instance.get_observation_impl(observation_path, grid_resolution)
+        except Exception as e:
+            print(f"An error occurred: {e}")
+            return None
+
+    def get_observation_geometries(self, observation):
+        try:
+            return self.observation_service_impl_instance.get_observation_geometries_impl(observation)
+        except Exception as e:
+            print(f"An error occurred: {e}")
+            return None
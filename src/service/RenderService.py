@@ -0,0 +1,36 @@
+# ---------------------------------------------------------
+# Bayesian Optimization Workflow for Medslik-II Simulations
+# Copyright (c) 2023-2024 CMCC Foundation
+# Licensed under The MIT License [see LICENSE for details]
+# Written by Marco Mariano De Carlo, Gabriele Accarino
+# ---------------------------------------------------------
+
+from src.serviceImpl.RenderServiceImpl import RenderServiceImpl
+
+class RenderService:
+
+    def __init__(self):
+        """ Initialize the requested service instance """
+
+        self.render_service_impl_instance = RenderServiceImpl()
+
+    def add_job(self, render_function, job):
+        try:
+            return self.render_service_impl_instance.add_job_impl(render_function, job)
+        except Exception as e:
+            print(f"An error occurred: {e}")
+            return None
+
+    def submit_jobs(self, copy_folders=None):
+        try:
+            return self.render_service_impl_instance.submit_jobs_impl(copy_folders)
+        except Exception as e:
+            print(f"An error occurred: {e}")
+            return None
+
+    def wait_jobs(self):
+        try:
+            return self.render_service_impl_instance.wait_jobs_impl()
+        except Exception as e:
+            print(f"An error occurred: {e}")
+            return None
@@ -0,0 +1,39 @@
+# ---------------------------------------------------------
+# Bayesian Optimization Workflow for Medslik-II Simulations
+# Copyright (c) 2023-2024 CMCC Foundation
+# Licensed under The MIT License [see LICENSE for details]
+# Written by Marco Mariano De Carlo, Gabriele Accarino
+# ---------------------------------------------------------
+
+from src.serviceImpl.SandboxServiceImpl import SandboxServiceImpl
+
+class SandboxService:
+
+    def __init__(self):
+        """ Initialize the requested service instance """
+
+        self.sandbox_service_impl_instance = SandboxServiceImpl()
+
+    def provision(self, workers):
+        try:
+            return self.sandbox_service_impl_instance.provision_impl(workers)
+        except Exception as e:
+            print(f"An error occurred: {e}")
+            return None
+
+    def get_sandboxes(self):
+        try:
+            return self.sandbox_service_impl_instance.get_sandboxes_impl()
+        except Exception as e:
+            print(f"An error occurred: {e}")
+            return None
+
+    def get_current_sandbox(self):
+        try:
+            return self.sandbox_service_impl_instance.get_current_sandbox_impl()
+        except Exception as e:
+            print(f"An error occurred: {e}")
+            return None
+
+    def lease(self, timeout=None):
+        return self.sandbox_service_impl_instance.lease_impl(timeout)
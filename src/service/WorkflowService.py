@@ -35,9 +35,9 @@ class WorkflowService:
     """
     Performs model setup using the specific implementation by handling its errors
     """
-    def setup_service(self, execution_type:int):
+    def setup_service(self, execution_type:int, rebuild=False):
         try:
-            self.workflow_service_impl_instance.setup_service_impl(execution_type)
+            self.workflow_service_impl_instance.setup_service_impl(execution_type, rebuild)
         except ValueError as e:
             raise SetupException(e)
     
@@ -5,7 +5,43 @@
 # Written by Marco Mariano De Carlo, Gabriele Accarino
 # ---------------------------------------------------------
 
+from enum import Enum
+
 from src.dto.BayOptSetupDTO import BayOptSetupDTO
+from src.exception.WrongConfigurationException import WrongConfigurationException
+
+"""
+Outputs (shapefiles, plots, text files) written while evaluating the objective function
+"""
+class ArtifactPolicy(Enum):
+    NONE = "none"
+    BEST_ONLY = "best_only"
+    EVERY_ITERATION = "every_iteration"
+
+"""
+Metric time series computed over the whole simulation, after the single simulation of Mode 1
+"""
+class MetricSeries(Enum):
+    NONE = "none"
+    METRICS = "metrics"
+    RASTERS = "rasters"
+
+"""
+Metrics computed at every evaluation, any of them can be chosen as eval_metric
+"""
+class EvalMetric(Enum):
+    FSS = "FSS"
+    OVERLAY = "overlay"
+    CSS = "CSS"
+
+"""
+Layout of the init_points evaluated before the optimization is guided by the Gaussian process
+"""
+class InitDesign(Enum):
+    RANDOM = "random"
+    SOBOL = "sobol"
+    LHS = "lhs"
+    MAXIMIN = "maximin"
 
 class BayOptSetupServiceImpl:
     
@@ -33,4 +69,136 @@ class BayOptSetupServiceImpl:
         return self.bay_opt_setup_dto_instance.get_decimal_precision()
     
     def get_verbose_impl(self):
-        return self.bay_opt_setup_dto_instance.get_verbose()
\ No newline at end of file
+        return self.bay_opt_setup_dto_instance.get_verbose()
+    
+    def get_artifact_policy_impl(self):
+        artifact_policy = self.bay_opt_setup_dto_instance.get_artifact_policy()
+
+        # Every iteration writes its outputs unless a different policy is configured
+        if artifact_policy is None:
+            return ArtifactPolicy.EVERY_ITERATION.value
+
+        if artifact_policy not in [policy.value for policy in ArtifactPolicy]:
+            raise WrongConfigurationException(f"Unknown artifact_policy '{artifact_policy}', expected one of {[policy.value for policy in ArtifactPolicy]}")
+
+        return artifact_policy
+
+    def get_metric_series_impl(self):
+        metric_series = self.bay_opt_setup_dto_instance.get_metric_series()
+
+        # The time series is not computed unless requested
+        if metric_series is None:
+            return MetricSeries.NONE.value
+
+        if metric_series not in [series.value for series in MetricSeries]:
+            raise WrongConfigurationException(f"Unknown metric_series '{metric_series}', expected one of {[series.value for series in MetricSeries]}")
+
+        return metric_series
+
+    def get_parcel_snapshots_impl(self):
+        parcel_snapshots = self.bay_opt_setup_dto_instance.get_parcel_snapshots()
+
+        # Parcels are not stored unless requested
+        if parcel_snapshots is None:
+            return False
+
+        if not isinstance(parcel_snapshots, bool):
+            raise WrongConfigurationException(f"parcel_snapshots must be true or false, found '{parcel_snapshots}'")
+
+        return parcel_snapshots
+
+    def get_campaign_archive_impl(self):
+        campaign_archive = self.bay_opt_setup_dto_instance.get_campaign_archive()
+
+        # Rasters are not archived unless requested
+        if campaign_archive is None:
+            return False
+
+        if not isinstance(campaign_archive, bool):
+            raise WrongConfigurationException(f"campaign_archive must be true or false, found '{campaign_archive}'")
+
+        return campaign_archive
+
+    def get_workers_impl(self):
+        workers = self.bay_opt_setup_dto_instance.get_workers()
+
+        # A single simulation at a time in the shared run directory, unless configured
+        if workers is None:
+            return 1
+
+        if isinstance(workers, bool) or not isinstance(workers, int) or workers < 1:
+            raise WrongConfigurationException(f"workers must be a positive integer, found '{workers}'")
+
+        return workers
+
+    def get_evaluation_cache_size_impl(self):
+        evaluation_cache_size = self.bay_opt_setup_dto_instance.get_evaluation_cache_size()
+
+        # Evaluations are not cached unless a size is configured
+        if evaluation_cache_size is None:
+            return 0
+
+        if isinstance(evaluation_cache_size, bool) or not isinstance(evaluation_cache_size, int) or evaluation_cache_size < 0:
+            raise WrongConfigurationException(f"evaluation_cache_size must be a non negative integer (MB), found '{evaluation_cache_size}'")
+
+        return evaluation_cache_size
+
+    def get_gp_refit_every_impl(self):
+        gp_refit_every = self.bay_opt_setup_dto_instance.get_gp_refit_every()
+
+        # Hyperparameters are optimized at every iteration unless configured
+        if gp_refit_every is None:
+            return 1
+
+        if isinstance(gp_refit_every, bool) or not isinstance(gp_refit_every, int) or gp_refit_every < 0:
+            raise WrongConfigurationException(f"gp_refit_every must be a non negative integer, found '{gp_refit_every}'")
+
+        return gp_refit_every
+
+    def get_gp_refit_tolerance_impl(self):
+        gp_refit_tolerance = self.bay_opt_setup_dto_instance.get_gp_refit_tolerance()
+
+        # No refit on a marginal likelihood degradation unless configured
+        if gp_refit_tolerance is None:
+            return 0
+
+        if isinstance(gp_refit_tolerance, bool) or not isinstance(gp_refit_tolerance, (int, float)) or gp_refit_tolerance < 0:
+            raise WrongConfigurationException(f"gp_refit_tolerance must be a non negative number, found '{gp_refit_tolerance}'")
+
+        return gp_refit_tolerance
+
+    def get_gp_refit_interval_impl(self):
+        gp_refit_interval = self.bay_opt_setup_dto_instance.get_gp_refit_interval()
+
+        # No refit on a wall-clock budget unless configured
+        if gp_refit_interval is None:
+            return 0
+
+        if isinstance(gp_refit_interval, bool) or not isinstance(gp_refit_interval, (int, float)) or gp_refit_interval < 0:
+            raise WrongConfigurationException(f"gp_refit_interval must be a non negative number of seconds, found '{gp_refit_interval}'")
+
+        return gp_refit_interval
+
+    def get_gp_n_jobs_impl(self):
+        gp_n_jobs = self.bay_opt_setup_dto_instance.get_gp_n_jobs()
+
+        # Optimizer restarts run one after the other unless configured
+        if gp_n_jobs is None:
+            return 1
+
+        if isinstance(gp_n_jobs, bool) or not isinstance(gp_n_jobs, int) or (gp_n_jobs < 1 and gp_n_jobs != -1):
+            raise WrongConfigurationException(f"gp_n_jobs must be a positive integer or -1 (every processor), found '{gp_n_jobs}'")
+
+        return gp_n_jobs
+
+    def get_init_design_impl(self):
+        init_design = self.bay_opt_setup_dto_instance.get_init_design()
+
+        # Independent random points unless a space-filling design is configured
+        if init_design is None:
+            return InitDesign.RANDOM.value
+
+        if init_design not in [design.value for design in InitDesign]:
+            raise WrongConfigurationException(f"Unknown init_design '{init_design}', expected one of {[design.value for design in InitDesign]}")
+
+        return init_design
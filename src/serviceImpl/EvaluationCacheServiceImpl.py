@@ -0,0 +1,177 @@
+# ---------------------------------------------------------
+# Bayesian Optimization Workflow for Medslik-II Simulations
+# Copyright (c) 2023-2024 CMCC Foundation
+# Licensed under The MIT License [see LICENSE for details]
+# Written by Marco Mariano De Carlo, Gabriele Accarino
+# ---------------------------------------------------------
+
+import os
+import json
+import time
+import hashlib
+
+from src.dao.EvaluationCacheRepo import EvaluationCacheRepo
+from src.dao.ModelBuildCacheRepo import ModelBuildCacheRepo
+from src.service.BayOptSetupService import BayOptSetupService
+from src.service.ExecutionService import ExecutionService
+from src.service.MDK2SimCoordsService import MDK2SimCoordsService
+from src.service.MDK2SimDateService import MDK2SimDateService
+from src.service.MDK2SimExtentService import MDK2SimExtentService
+from src.service.ObservationService import ObservationService
+from src.controller.PathController import PathController
+
+class EvaluationCacheServiceImpl:
+
+    """
+    Version of the cache entries, part of every key: it changes whenever the metrics or the stored
+    artifacts change, so that entries written by a previous version are never returned
+    """
+    CACHE_VERSION = 2
+
+    def __init__(self):
+        """ Initializes useful instances for method development """
+
+        self.bay_opt_setup_service_instance = BayOptSetupService()
+        self.execution_service_instance = ExecutionService()
+        self.mdk2_sim_coords_service_instance = MDK2SimCoordsService()
+        self.mdk2_sim_date_service_instance = MDK2SimDateService()
+        self.mdk2_sim_extent_service_instance = MDK2SimExtentService()
+        self.observation_service_instance = ObservationService()
+        self.path_controller_instance = PathController()
+
+        # The build, the observation and the configuration template do not change during a campaign, they are hashed once
+        self._build_hash = None
+        self._observation_hash = None
+        self._config2_template_hash = None
+
+    def get_repo_impl(self):
+        return EvaluationCacheRepo(self.path_controller_instance.get_EVALUATION_CACHE_DIR(),
+                                   self.bay_opt_setup_service_instance.get_evaluation_cache_size() * 1024 * 1024)
+
+    def get_observation_hash_impl(self):
+        """
+        Computes the hash of the satellite observation with the observation service: the content of the
+        observation folder, or of the shapefile with its sidecar files, rasterized observations excluded.
+
+        Returns:
+            str: The hexadecimal SHA-256 hash of the observation.
+
+        Raises:
+            ValueError: If the observation cannot be hashed, so that the evaluation is not cached.
+        """
+        if self._observation_hash is None:
+            self._observation_hash = self.observation_service_instance.hash_observation(self.observation_service_instance.get_observation_path())
+
+        if self._observation_hash is None:
+            raise ValueError("The observation could not be hashed")
+
+        return self._observation_hash
+
+    def get_build_hash_impl(self):
+        if self._build_hash is None:
+            self._build_hash = self.execution_service_instance.get_build_hash()
+        return self._build_hash
+
+    def get_config2_template_hash_impl(self):
+        """
+        Computes the hash of the model configuration template, holding the values of the parameters
+        that are not optimized.
+
+        Returns:
+            str: The hexadecimal SHA-256 hash of the template.
+        """
+        if self._config2_template_hash is None:
+            self._config2_template_hash = ModelBuildCacheRepo.hash_file(self.path_controller_instance.get_CONFIG2_TEMPLATE())
+        return self._config2_template_hash
+
+    def describe_evaluation_impl(self, parameters, particles):
+        """
+        Describes an evaluation by everything its metrics depend on: the rounded parameters, the number of
+        parcels, the simulation extent, date and coordinates, the fixed values of the configuration template,
+        the observation and the model build.
+
+        Args:
+            parameters (dict): The rounded parameter values.
+            particles (dict): The number of parcels.
+
+        Returns:
+            dict: The JSON-serializable description of the evaluation.
+        """
+        return {
+            'version': self.CACHE_VERSION,
+            'parameters': {k: float(v) for k, v in parameters.items()},
+            'particles': {k: int(v) for k, v in particles.items()},
+            'sim_extent': self.mdk2_sim_extent_service_instance.get_sim_extent_params_dict(),
+            'sim_date': self.mdk2_sim_date_service_instance.get_sim_date_params_dict(),
+            'sim_coords': self.mdk2_sim_coords_service_instance.get_sim_coords_params_dict(),
+            'config2_template': self.get_config2_template_hash_impl(),
+            'observation': self.get_observation_hash_impl(),
+            'build': self.get_build_hash_impl(),
+        }
+
+    def get_key_impl(self, description):
+        """
+        Returns the key of an evaluation, the hash of its description.
+
+        Args:
+            description (dict): The description returned by describe_evaluation_impl.
+
+        Returns:
+            str: The hexadecimal SHA-256 key.
+        """
+        return hashlib.sha256(json.dumps(description, sort_keys=True, default=str).encode()).hexdigest()
+
+    def lookup_impl(self, key):
+        """
+        Looks for an evaluation in the cache.
+
+        Args:
+            key (str): The key of the evaluation.
+
+        Returns:
+            dict: The entry, with the metrics and whether artifacts are stored, or None if the evaluation is not cached.
+        """
+        return self.get_repo_impl().get(key)
+
+    def store_impl(self, key, description, metrics, artifacts=None):
+        """
+        Stores an evaluation in the cache, with the outputs it wrote. Plots are rendered in background:
+        they are copied in the artifacts folder once rendered, when the folder returned is passed to the render jobs.
+
+        Args:
+            key (str): The key of the evaluation.
+            description (dict): The description of the evaluation.
+            metrics (dict): The metric values, keyed by metric name.
+            artifacts (list, optional): The paths of the files written by the evaluation; no artifact is stored when None.
+
+        Returns:
+            str: The artifacts folder of the entry, or None if no artifact is stored.
+        """
+        # Artifacts are stored relative to the detection root of the evaluation, where they are restored
+        detection_root = self.path_controller_instance.get_detection_root()
+        artifacts = {os.path.relpath(fname, detection_root): fname for fname in artifacts or [] if os.path.isfile(fname)}
+
+        entry = {
+            'description': description,
+            'metrics': {k: None if v is None else float(v) for k, v in metrics.items()},
+            'artifacts': bool(artifacts),
+            'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        }
+
+        repo = self.get_repo_impl()
+        repo.put(key, entry, artifacts)
+
+        return repo.get_artifacts_dir(key) if artifacts else None
+
+    def restore_artifacts_impl(self, key):
+        """
+        Copies the artifacts of a cached evaluation in the detection root of the calling evaluation, as if
+        the evaluation had just written them.
+
+        Args:
+            key (str): The key of the evaluation.
+
+        Returns:
+            list: The restored files, relative to the detection root.
+        """
+        return self.get_repo_impl().restore_artifacts(key, self.path_controller_instance.get_detection_root())
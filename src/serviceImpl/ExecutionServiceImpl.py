@@ -7,13 +7,23 @@
 
 import re
 import subprocess
-import pandas as pd
 import os
+import shutil
+import hashlib
 
 from src.controller.PathController import PathController
+from src.dao.ModelBuildCacheRepo import ModelBuildCacheRepo
 from src.exception.UpdateConfigException import UpdateConfigException
 
 class ExecutionServiceImpl:
+
+    """
+    Inputs of the build hash besides the model sources: the compilers that may be used by compile.sh
+    and the environment variables they read. Files written by the compilation are not part of the hash
+    """
+    COMPILERS = ('gfortran', 'ifort', 'ifx')
+    COMPILER_ENV_VARS = ('FC', 'F77', 'F90', 'FFLAGS', 'FCFLAGS', 'LDFLAGS', 'CPPFLAGS', 'NETCDF', 'NETCDF_DIR')
+    BUILD_OUTPUT_EXTENSIONS = ('.o', '.mod', '.a', '.so', '.exe', '.x')
     
     def __init__(self):
         """ Initializes useful instances for method development """
@@ -64,13 +74,80 @@ class ExecutionServiceImpl:
         except Exception as e:
             raise UpdateConfigException(f"Error during configuration update: {str(e)}")
     
+    @classmethod
+    def is_build_product(cls, fname):
+        """ Tells whether a file is an executable written by the compilation """
+        return fname.endswith(('.exe', '.x')) or (os.path.splitext(fname)[1] == '' and os.access(fname, os.X_OK))
+
+    def get_build_hash_impl(self):
+        """
+        Computes the hash identifying a MEDSLIK-II build: the content of every source file in MODEL_SRC,
+        compile.sh included, the compilers found in the PATH and the compile environment variables.
+
+        Returns:
+            str: The hexadecimal SHA-256 hash of the build inputs.
+        """
+        model_src = self.path_controller_instance.get_MEDSLIK_MODEL_SRC()
+        digest = hashlib.sha256()
+
+        for folder, dirs, files in os.walk(model_src):
+            dirs.sort()
+            for name in sorted(files):
+                fname = os.path.join(folder, name)
+                if name.endswith(self.BUILD_OUTPUT_EXTENSIONS) or self.is_build_product(fname):
+                    continue
+
+                digest.update(os.path.relpath(fname, model_src).encode())
+                digest.update(ModelBuildCacheRepo.hash_file(fname).encode())
+
+        for compiler in self.COMPILERS:
+            compiler_path = shutil.which(compiler)
+            if compiler_path is not None:
+                digest.update(f"{compiler_path}:{os.stat(compiler_path).st_mtime_ns}".encode())
+
+        for name in self.COMPILER_ENV_VARS:
+            digest.update(f"{name}={os.environ.get(name, '')}".encode())
+
+        return digest.hexdigest()
+
+    @staticmethod
+    def _stat_run_files(run_folder):
+        """ Returns the size and modification time of the files in the RUN folder, TEMP excluded """
+        stats = {}
+        for folder, dirs, files in os.walk(run_folder):
+            dirs[:] = [d for d in dirs if d != 'TEMP']
+            for name in files:
+                fname = os.path.join(folder, name)
+                stat = os.stat(fname)
+                stats[os.path.relpath(fname, run_folder)] = (stat.st_size, stat.st_mtime_ns)
+        return stats
+
     """
-    Compile the MEDSLIK-II model using a specific script by handling exceptions
+    Compile the MEDSLIK-II model using a specific script by handling exceptions.
+    The executables of every build are cached under the hash of the sources and compile inputs:
+    when nothing changed since a previous build, its executables are reused and the compilation
+    is skipped, unless a rebuild is forced
     """
-    def compile_model(self):
+    def compile_model(self, rebuild=False):
         try:
+            run_folder = self.path_controller_instance.get_MEDSLIK_RUN()
+            build_cache = ModelBuildCacheRepo(self.path_controller_instance.get_BUILD_CACHE_DIR())
+            build_hash = self.get_build_hash_impl()
+
+            if not rebuild and build_cache.restore(build_hash, run_folder) is not None:
+                print(f'> MEDSLIK-II (v3.01) build {build_hash[:12]} is up to date, compilation skipped ...')
+                return "Compilation skipped, cached build reused"
+
             print('> Compile MEDSLIK-II (v3.01) ...')
-            subprocess.run([f'cd {self.path_controller_instance.get_MEDSLIK_RUN()}; sh MODEL_SRC/compile.sh; cd {self.path_controller_instance.get_ROOT()}'], stdout=subprocess.DEVNULL, stderr=subprocess.STDOUT, shell=True, check=True)
+            before = self._stat_run_files(run_folder)
+            subprocess.run([f'cd {run_folder}; sh MODEL_SRC/compile.sh; cd {self.path_controller_instance.get_ROOT()}'], stdout=subprocess.DEVNULL, stderr=subprocess.STDOUT, shell=True, check=True)
+            after = self._stat_run_files(run_folder)
+
+            products = [f for f, stat in after.items()
+                        if before.get(f) != stat and self.is_build_product(os.path.join(run_folder, f))]
+            if products:
+                build_cache.store(build_hash, run_folder, products)
+
             return "Compilation successfully completed"
         except subprocess.CalledProcessError as e:
             # TODO: si può togliere il print
@@ -95,13 +172,41 @@ class ExecutionServiceImpl:
             print(f"An error occurred during the execution of MEDSLIK-II: {e}")
             return f"An error occurred during the execution of MEDSLIK-II: {e}"
         
-    def save_best_detection_impl(self, value):
+    def is_new_best_impl(self, value):
+        """
+        Checks whether a metric value improves on every value already written in the final result file
+
+        Parameters:
+            value (float): The metric value of the current evaluation.
+
+        Returns:
+            bool: True if the value is the best found so far.
+        """
+        import pandas as pd
+
         max_fss = pd.read_csv(self.path_controller_instance.get_simulation_result_file(
             self.path_controller_instance.get_sim_result_dir()), 
                               sep=',')['Metric'].max()
-        
-        if value > max_fss or pd.isna(max_fss):
-            self.path_controller_instance.copy_detection_directories_with_content(
-                self.path_controller_instance.get_sim_result_dir(), 
-                f"{os.path.join(self.path_controller_instance.get_sim_result_dir(), 'best_detections')}",
-                "detection_")
\ No newline at end of file
+
+        return bool(value > max_fss or pd.isna(max_fss))
+
+    def save_best_detection_impl(self, value):
+        """
+        Copies the detection directories of the calling evaluation among the best detections,
+        if its metric value is the best found so far
+
+        Parameters:
+            value (float): The metric value of the current evaluation.
+
+        Returns:
+            bool: True if the value is the best found so far.
+        """
+        if not self.is_new_best_impl(value):
+            return False
+
+        self.path_controller_instance.copy_detection_directories_with_content(
+            self.path_controller_instance.get_detection_root(), 
+            f"{os.path.join(self.path_controller_instance.get_sim_result_dir(), 'best_detections')}",
+            "detection_")
+
+        return True
\ No newline at end of file
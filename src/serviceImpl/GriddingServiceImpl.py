@@ -0,0 +1,281 @@
+# ---------------------------------------------------------
+# Bayesian Optimization Workflow for Medslik-II Simulations
+# Copyright (c) 2023-2024 CMCC Foundation
+# Licensed under The MIT License [see LICENSE for details]
+# Written by Marco Mariano De Carlo, Gabriele Accarino
+# ---------------------------------------------------------
+
+import numpy as np
+
+from src.domain.ComparisonGrid import ComparisonGrid
+from src.domain.ComparisonRaster import ComparisonRaster
+
+class GriddingServiceImpl:
+
+    def make_comparison_grid_impl(self, xmin, xmax, ymin, ymax, cell_size, anchor=None):
+        """
+        Builds a regular lattice covering the specified extent.
+
+        The number of cells along each axis is the same one obtained by the polygon grid
+        (cells start at xmin/ymin and the last one covers xmax/ymax).
+
+        Args:
+            xmin (float): The minimum longitude of the grid extent.
+            xmax (float): The maximum longitude of the grid extent.
+            ymin (float): The minimum latitude of the grid extent.
+            ymax (float): The maximum latitude of the grid extent.
+            cell_size (float): The size of each grid cell in degrees.
+            anchor (tuple, optional): A (lon, lat) lattice node; when given, the lower-left corner is moved
+                                      down to the nearest node of the lattice passing through it, so that
+                                      rasters built on that lattice can be embedded without resampling.
+
+        Returns:
+            ComparisonGrid: The lattice description.
+        """
+        if anchor is not None:
+            xmin = anchor[0] + np.floor((float(xmin) - anchor[0]) / float(cell_size)) * float(cell_size)
+            ymin = anchor[1] + np.floor((float(ymin) - anchor[1]) / float(cell_size)) * float(cell_size)
+
+        nx = len(np.arange(xmin, xmax+cell_size, cell_size)) - 1
+        ny = len(np.arange(ymin, ymax+cell_size, cell_size)) - 1
+
+        return ComparisonGrid(float(xmin), float(ymin), float(cell_size), max(nx, 1), max(ny, 1))
+
+    def get_cell_indices_impl(self, grid, lons, lats):
+        """
+        Maps longitude/latitude coordinates to the row/column indices of the lattice.
+
+        Args:
+            grid (ComparisonGrid): The lattice.
+            lons (array-like): Longitudes of the points.
+            lats (array-like): Latitudes of the points.
+
+        Returns:
+            tuple: Row indices, column indices and a boolean mask of the points falling inside the grid.
+        """
+        lons = np.asarray(lons, dtype=np.float64)
+        lats = np.asarray(lats, dtype=np.float64)
+
+        cols = np.floor((lons - grid.get_lonmin) / grid.get_resolution).astype(np.int64)
+        rows = np.floor((lats - grid.get_latmin) / grid.get_resolution).astype(np.int64)
+
+        inside = (cols >= 0) & (cols < grid.get_nx) & (rows >= 0) & (rows < grid.get_ny)
+
+        return rows, cols, inside
+
+    def count_parcels_impl(self, grid, lons, lats, weights=None):
+        """
+        Counts the parcels falling in each cell of the lattice.
+
+        Args:
+            grid (ComparisonGrid): The lattice.
+            lons (array-like): Longitudes of the parcels.
+            lats (array-like): Latitudes of the parcels.
+            weights (array-like, optional): Per-parcel weights (e.g. volumes). Plain counts when None.
+
+        Returns:
+            numpy.ndarray: A (ny, nx) array with the number (or weighted sum) of parcels in each cell.
+        """
+        rows, cols, inside = self.get_cell_indices_impl(grid, lons, lats)
+        flat_index = rows[inside] * grid.get_nx + cols[inside]
+
+        if weights is not None:
+            weights = np.asarray(weights, dtype=np.float64)[inside]
+
+        counts = np.bincount(flat_index, weights=weights, minlength=grid.get_ny * grid.get_nx)
+
+        return counts.reshape(grid.get_shape)
+
+    def get_cell_centres_impl(self, grid):
+        """
+        Returns the coordinates of the cell centres as two (ny, nx) arrays.
+
+        Args:
+            grid (ComparisonGrid): The lattice.
+
+        Returns:
+            tuple: Longitude and latitude arrays of the cell centres.
+        """
+        lon_centres = grid.get_lonmin + (np.arange(grid.get_nx) + 0.5) * grid.get_resolution
+        lat_centres = grid.get_latmin + (np.arange(grid.get_ny) + 0.5) * grid.get_resolution
+
+        return np.meshgrid(lon_centres, lat_centres)
+
+    def _make_cell_boxes(self, grid, rows, cols):
+        """ Builds the polygons of the requested cells with a single vectorized call """
+        import shapely
+
+        res = grid.get_resolution
+        x0 = grid.get_lonmin + cols * res
+        y0 = grid.get_latmin + rows * res
+
+        return shapely.box(x0, y0, x0 + res, y0 + res)
+
+    def rasterize_geometries_impl(self, grid, geometries):
+        """
+        Marks the cells of the lattice intersecting the given geometries.
+
+        Only the cells within the bounding box of the geometries are turned into polygons,
+        and the intersection test is resolved through a spatial index.
+
+        Args:
+            grid (ComparisonGrid): The lattice.
+            geometries (GeoSeries or array of shapely geometries): The geometries to rasterize.
+
+        Returns:
+            numpy.ndarray: A (ny, nx) boolean array, True where a cell intersects the geometries.
+        """
+        import shapely
+
+        mask = np.zeros(grid.get_shape, dtype=bool)
+
+        geometries = np.asarray(geometries)
+        geometries = geometries[~shapely.is_empty(geometries)]
+        if len(geometries) == 0:
+            return mask
+
+        minx, miny, maxx, maxy = shapely.total_bounds(geometries)
+
+        # Nothing to do when the geometries lie outside the lattice
+        if maxx < grid.get_lonmin or minx > grid.get_lonmax or maxy < grid.get_latmin or miny > grid.get_latmax:
+            return mask
+
+        rows, cols, _ = self.get_cell_indices_impl(grid, [minx, maxx], [miny, maxy])
+        col0, col1 = np.clip(cols, 0, grid.get_nx - 1)
+        row0, row1 = np.clip(rows, 0, grid.get_ny - 1)
+
+        cols, rows = np.meshgrid(np.arange(col0, col1 + 1), np.arange(row0, row1 + 1))
+        rows = rows.ravel()
+        cols = cols.ravel()
+
+        boxes = self._make_cell_boxes(grid, rows, cols)
+
+        tree = shapely.STRtree(boxes)
+        hits = np.unique(tree.query(geometries, predicate='intersects')[1])
+
+        mask[rows[hits], cols[hits]] = True
+
+        return mask
+
+    def make_poly_grid_impl(self, grid, cell_mask=None, cell_values=None):
+        """
+        Generates the polygons of the lattice cells, to be used when a shapefile artifact is requested.
+
+        Args:
+            grid (ComparisonGrid): The lattice.
+            cell_mask (numpy.ndarray, optional): A (ny, nx) boolean array selecting the cells to build.
+                                                 Every cell is built when None.
+            cell_values (numpy.ndarray, optional): A (ny, nx) array stored in the 'cell_total_volume' column.
+
+        Returns:
+            GeoDataFrame: A GeoDataFrame containing polygons representing the selected grid cells.
+        """
+        import geopandas as gpd
+
+        if cell_mask is None:
+            cell_mask = np.ones(grid.get_shape, dtype=bool)
+
+        rows, cols = np.nonzero(cell_mask)
+
+        frame = {'geometry': self._make_cell_boxes(grid, rows, cols)}
+        if cell_values is not None:
+            frame['cell_total_volume'] = cell_values[rows, cols]
+
+        # Keep the cell numbering of the polygon grid (column-major over the lattice)
+        index = cols * grid.get_ny + rows
+
+        return gpd.GeoDataFrame(frame, index=index).set_crs('EPSG:4326', allow_override=True)
+
+    def embed_layer_impl(self, grid, raster, name):
+        """
+        Copies a layer of a raster into a lattice sharing its nodes (see the anchor of make_comparison_grid_impl).
+        Cells of the layer falling outside the lattice are dropped.
+
+        Args:
+            grid (ComparisonGrid): The destination lattice.
+            raster (ComparisonRaster): The source raster.
+            name (str): The name of the layer to copy.
+
+        Returns:
+            numpy.ndarray: A (ny, nx) array holding the layer values, zero elsewhere.
+        """
+        values = raster.get_layer(name)
+        out = np.zeros(grid.get_shape, dtype=values.dtype)
+
+        col_offset = int(round((raster.get_origin[0] - grid.get_lonmin) / grid.get_resolution))
+        row_offset = int(round((raster.get_origin[1] - grid.get_latmin) / grid.get_resolution))
+
+        src_row0, src_col0 = max(-row_offset, 0), max(-col_offset, 0)
+        dst_row0, dst_col0 = max(row_offset, 0), max(col_offset, 0)
+        nrows = min(values.shape[0] - src_row0, grid.get_ny - dst_row0)
+        ncols = min(values.shape[1] - src_col0, grid.get_nx - dst_col0)
+
+        if nrows > 0 and ncols > 0:
+            out[dst_row0:dst_row0+nrows, dst_col0:dst_col0+ncols] = values[src_row0:src_row0+nrows, src_col0:src_col0+ncols]
+
+        return out
+
+    def make_comparison_raster_impl(self, grid, cell_counts, observation_mask):
+        """
+        Builds the comparison raster holding the model, observation and intersection layers.
+
+        Args:
+            grid (ComparisonGrid): The lattice.
+            cell_counts (numpy.ndarray): A (ny, nx) array with the number of parcels in each cell.
+            observation_mask (numpy.ndarray): A (ny, nx) boolean array of the observed oil.
+
+        Returns:
+            ComparisonRaster: The raster with 'model', 'observation' and 'intersection' presence/absence layers.
+        """
+        model = np.asarray(cell_counts) > 0
+        observation = np.asarray(observation_mask, dtype=bool)
+
+        return ComparisonRaster(grid, {
+            'model': model.astype(float),
+            'observation': observation.astype(float),
+            'intersection': (model & observation).astype(float)
+        })
+
+    def make_union_array_impl(self, raster):
+        """
+        Combines model and observation layers for plotting: 1 model only, 2 observation only, 3 overlap, NaN elsewhere.
+
+        Args:
+            raster (ComparisonRaster): The comparison raster.
+
+        Returns:
+            numpy.ndarray: The (ny, nx) union array.
+        """
+        array_union = raster.get_layer('model') + 2*raster.get_layer('observation')
+        array_union[array_union==0] = np.nan
+
+        return array_union
+
+    def make_event_set_impl(self, raster):
+        """
+        Exports the comparison raster as the "event_set" matrix, with one row per cell
+        (column-major over the grid) containing:
+        column 0: cell index
+        column 1: longitude coordinate of grid cell centroid
+        column 2: latitude coordinate of grid cell centroid
+        column 3: simulated oil presence/absence
+        column 4: observed oil presence/absence
+        column 5: intersection between simulated and observed oil
+
+        Args:
+            raster (ComparisonRaster): The comparison raster.
+
+        Returns:
+            numpy.ndarray: The (ny*nx, 6) event set, with NaN marking absence.
+        """
+        lon_centres, lat_centres = self.get_cell_centres_impl(raster.get_grid)
+
+        event_set = np.full((lon_centres.size, 6), np.nan)
+        event_set[:,0] = np.arange(len(event_set))
+        event_set[:,1] = lon_centres.T.ravel()
+        event_set[:,2] = lat_centres.T.ravel()
+
+        for column, name in zip((3, 4, 5), ('model', 'observation', 'intersection')):
+            event_set[raster.get_layer(name).T.ravel() > 0, column] = 1
+
+        return event_set
@@ -5,35 +5,39 @@
 # Written by Augusto Sepp Nieves, Marco Mariano De Carlo, Gabriele Accarino, Igor Atake
 # -------------------------------------------------------------------------------------
 
-from shapely.geometry import Polygon
 import numpy as np
-import matplotlib.pyplot as plt
-import netCDF4
-import pandas as pd
-from scipy.interpolate import NearestNDInterpolator
 import os
 from datetime import  *
-from matplotlib import colors as c
-from matplotlib.patches import Patch
-from mpl_toolkits.basemap import Basemap
-import geopandas as gpd
 import glob
-import xarray as xr
-from shapely.geometry import Point
 import re
 import calendar
 import time
 
-from library.Metrics.metrics import fss
+from library.Metrics.metrics import fss_scales, fss_batch_init, fss_batch_accum, fss_batch_compute
 
+from src.dao.MDK2SpillPropertiesRepo import MDK2SpillPropertiesRepo
+from src.dao.ParcelSnapshotRepo import ParcelSnapshotRepo
+from src.dao.CampaignArchiveRepo import CampaignArchiveRepo, archive_lock
 from src.service.BayOptSetupService import BayOptSetupService
 from src.service.MDK2SimExtentService import MDK2SimExtentService
 from src.service.MDK2SimDateService import MDK2SimDateService
 from src.service.MDK2SimParamsService import MDK2SimParamsService
-
+from src.service.MDK2SimCoordsService import MDK2SimCoordsService
+from src.service.GriddingService import GriddingService
+from src.service.ObservationService import ObservationService
+from src.service.RenderService import RenderService
+from src.serviceImpl.RenderServiceImpl import render_spill_map, render_fss_curve
+from src.domain.RenderJob import RenderJob
+from src.domain.SpillComparison import SpillComparison
+
+from src.serviceImpl.BayOptSetupServiceImpl import EvalMetric
 from src.controller.PathController import PathController
+from src.exception.WrongConfigurationException import WrongConfigurationException
 
 class MetricsServiceImpl:
+
+    # Search window sizes of the FSS curve (in number of pixels)
+    FSS_SCALES = range(1,150,2) # range(1,11,2) per aumentare la scala
     
     def __init__(self):
         """ Initializes useful instances for method development """
@@ -43,6 +47,10 @@ class MetricsServiceImpl:
         self.mdk2_sim_date_instance = MDK2SimDateService()
         self.mdk2_sim_extent_instance = MDK2SimExtentService()
         self.mdk2_sim_params_instance = MDK2SimParamsService()
+        self.mdk2_sim_coords_instance = MDK2SimCoordsService()
+        self.gridding_service_instance = GriddingService()
+        self.observation_service_instance = ObservationService()
+        self.render_service_instance = RenderService()
         
         self.path_controller_instance = PathController()
         
@@ -90,78 +98,36 @@ class MetricsServiceImpl:
         rbm3 = 0.158987
         return 1 / (rbm3 * (oil_density / 1000))
     
-    def get_surface_parcels_service_impl(self, fname, time_index):
+    def get_surface_parcels_service_impl(self, fname, time_index, spill_properties=None):
         """
         Retrieves surface parcel data from a NetCDF file at a specific time index.
 
         Args:
             fname (str): The filename of the NetCDF file.
-            time_index (int): The index of the time dimension to retrieve data for.
+            time_index (int or list): The index of the time dimension to retrieve data for, or a list of indices.
+            spill_properties (MDK2SpillPropertiesRepo, optional): An open reader of the file to reuse.
+                                                                  The file is opened and closed here when None.
 
         Returns:
-            tuple: A tuple containing longitude, latitude, and surface volume data for floating particles.
+            tuple: A tuple containing longitude, latitude, and surface volume data for floating particles,
+                   or a list of such tuples when a list of time indices is given.
         """
-        # Open the NetCDF file
-        f = netCDF4.Dataset(fname)
-
-        # Extract data from the NetCDF file
-        lat = np.longdouble(f.variables['latitude'][time_index,:])
-        lon = np.longdouble(f.variables['longitude'][time_index,:])
-        evaporative_volume = f.variables['evaporative_volume'][time_index,:]
-        non_evaporative_volume = f.variables['non_evaporative_volume'][time_index,:]
-        particle_status = f.variables['particle_status'][time_index, :]
-
-        # Extract oil density from the file
-        oil_density = f.variables['non_evaporative_volume'].oil_density
+        if spill_properties is None:
+            with MDK2SpillPropertiesRepo(fname) as spill_properties:
+                return self.get_surface_parcels_service_impl(fname, time_index, spill_properties)
 
         # Convert oil volume from barrels to metric tonnes
-        barrel2tonnes = self.barrelToTonnes_service_impl(oil_density)   
-
-        # Identify floating particles
-        floatingParticles=np.logical_and(particle_status > 0, particle_status <= 2).nonzero()[0]
-
-        # Extract data for floating particles
-        lons_f=lon[floatingParticles]
-        lats_f=lat[floatingParticles]
-
-        # Calculate surface volume for floating particles
-        surf_volume = (evaporative_volume[floatingParticles] + non_evaporative_volume[floatingParticles]) / barrel2tonnes
+        barrel2tonnes = self.barrelToTonnes_service_impl(spill_properties.get_oil_density())
 
-        return lons_f,lats_f,surf_volume
-
-    def make_poly_grid_service_impl(self, xmin,xmax,ymin,ymax,cell_size,crs):
-        """
-        Generates a grid of polygons covering a specified extent.
-
-        Args:
-            xmin (float): The minimum x-coordinate of the grid extent.
-            xmax (float): The maximum x-coordinate of the grid extent.
-            ymin (float): The minimum y-coordinate of the grid extent.
-            ymax (float): The maximum y-coordinate of the grid extent.
-            cell_size (float): The size of each grid cell.
-            crs (str): The coordinate reference system (CRS) of the generated polygons.
-
-        Returns:
-            GeoDataFrame: A GeoDataFrame containing polygons representing the grid cells.
-        """
-        # Generate lists of column and row coordinates based on the extent and cell size
-        cols = list(np.arange(xmin, xmax+cell_size, cell_size))
-        rows = list(np.arange(ymin, ymax+cell_size, cell_size))
+        # Only the requested time steps are read, floating particles are selected on the particle status
+        parcels = spill_properties.get_surface_parcels(time_index)
 
-        # Initialize a list to store generated polygons
-        polygons = []
+        if np.isscalar(time_index):
+            lons_f, lats_f, volume = parcels
+            return lons_f, lats_f, volume / barrel2tonnes
 
-        # Iterate over columns and rows to create grid polygons
-        for x in cols[:-1]:
-            for y in rows[:-1]:
-                # Create a polygon for each grid cell
-                polygons.append(Polygon([(x,y), (x+cell_size, y), (x+cell_size, y+cell_size), (x, y+cell_size)]))
-                
-        # Create a GeoDataFrame from the list of polygons
-        cell = gpd.GeoDataFrame({'geometry':polygons}).set_crs('EPSG:4326',allow_override=True)
+        return [(lons_f, lats_f, volume / barrel2tonnes) for lons_f, lats_f, volume in parcels]
 
-        return cell
-    
     def get_obs_date_service_impl(self, observation_shp):
         """
         Extracts the observation date from a shapefile.
@@ -180,7 +146,7 @@ class MetricsServiceImpl:
 
         # print("newOBS:", os.environ.get('OBSPATH').split("/")[-1])
 
-        observation = os.environ.get('OBSPATH').split("/")[-1]
+        observation = os.path.basename(self.observation_service_instance.get_observation_path())
 
         # print("string:", observation_date_string)
 
@@ -280,44 +246,43 @@ class MetricsServiceImpl:
     def get_time_index(self, simulation_date, observation_date):
         return self.find_nearest_service_impl(simulation_date, observation_date)
     
-    def compute_sin_fss(self, simulation_folder, observation_shp, output_folder, values: list):
+    def prepare_observation_service_impl(self):
         """
-        Computes the Fractions Skill Score (FSS)
+        Rasterizes the satellite observation on the verification grid before the optimization starts,
+        so that every evaluation of the objective function reuses it.
+
+        Returns:
+            Observation: The rasterized observation.
+        """
+        # Calculate grid resolution in degrees (150 m verification grid)
+        grid_resolution = np.longdouble(.15)/110.
+
+        return self.observation_service_instance.get_observation(self.observation_service_instance.get_observation_path(), grid_resolution)
+
+    def build_comparison_service_impl(self, simulation_folder, observation_path):
+        """
+        Builds the comparison stage shared by every metric: the surface parcels of the simulation and the
+        rasterized observation are brought on a common grid once per evaluation.
 
         Args:
             simulation_folder (str): The folder containing simulation outputs.
-            observation_shp (str): The file path to the shapefile containing observation data.
-            output_folder (str): The folder where the FSS results will be saved.
+            observation_path (str): The path to the satellite observation.
+
+        Returns:
+            SpillComparison: The gridded simulated and observed oil.
         """
 
         # Set the spatial resolution for the verification grid (in km)
         verif_grid_resolution = .15
 
-        # Set mapping projection
-        crs = "+proj=merc +lon_0=0 +x_0=0 +y_0=0 +a=6371007.181 +b=6371007.181 +units=m +no_defs"
-
         # Calculate grid resolution in degrees
         grid_resolution = np.longdouble(verif_grid_resolution)/110.
 
         # Construct the file path to the spill properties NetCDF file
         fname = simulation_folder + '/spill_properties.nc'
 
-        # Obtain simulation date and observation date
-        # simulation_date = self.get_mdksim_date_service_impl()
-        # observation_date = self.get_obs_date_service_impl(observation_shp)
-
         # Find the time index of the simulation data closest to the observation date
-        time_index = self.get_time_index(self.get_mdksim_date_service_impl(), self.get_obs_date_service_impl(observation_shp))
-
-        # Construct an identifier for the current simulation output based on simulation name and time index
-        # xp_identifier = self.mdk2_sim_extent_instance.get_SIM_NAME() + '_' + '%02d' % (time_index+1) + 'h_' 
-        xp_identifier = self.path_controller_instance.get_sim_str() + '_' + '%02d' % (time_index+1) + 'h_' 
-
-
-        # for time_index in output_timesteps:
-        # print(':::::::::: TIME_INDEX :: ' + str(time_index))
-        # print(xp_identifier)
-
+        time_index = self.get_time_index(self.get_mdksim_date_service_impl(), self.get_obs_date_service_impl(observation_path))
 
         """
         Filter out beached, dispersed, sunk and unreleased parcels
@@ -327,221 +292,452 @@ class MetricsServiceImpl:
         """
         lons_f,lats_f,surface_volumes = self.get_surface_parcels_service_impl(fname,time_index)
 
-        # Create dataframe with the location and volume of surface parcels
-        df_gpan = pd.DataFrame({"lat":lats_f,
-                    "lon":lons_f,
-                    "vol":surface_volumes})
-                    
-        # Create geodataframe from pandas dataframe              
-        # parcels_gdf = gpd.GeoDataFrame(df_gpan, 
-        #             geometry=gpd.points_from_xy(df_gpan.lon, df_gpan.lat),
-        #             crs=crs) 
-        parcels_gdf = gpd.GeoDataFrame(df_gpan, 
-                    geometry=gpd.points_from_xy(df_gpan.lon, df_gpan.lat),crs=crs).set_crs('EPSG:4326',allow_override=True)
-        parcels_gdf = parcels_gdf.drop(columns=['lon', 'lat']) # remove useless variables
-                    
-        # load satellite detection shapefile
-        observation_df = gpd.read_file(observation_shp)
-        # observation_gdf = gpd.GeoDataFrame(observation_df[['geometry']],crs=crs)
-
-        observation_gdf = gpd.GeoDataFrame(observation_df[['geometry']]).set_crs('EPSG:4326',allow_override=True)
+        # load satellite detection, rasterized only once for the whole optimization
+        rasterized_observation = self.observation_service_instance.get_observation(observation_path, grid_resolution)
+
+        return self.make_comparison_service_impl(time_index, lons_f, lats_f, rasterized_observation)
+
+    def make_comparison_service_impl(self, time_index, lons_f, lats_f, rasterized_observation):
+        """
+        Grids the parcels of a time step on the lattice of the rasterized observation.
+
+        Args:
+            time_index (int): The time index of the parcels.
+            lons_f (numpy.ndarray): Longitude coordinates of the floating parcels.
+            lats_f (numpy.ndarray): Latitude coordinates of the floating parcels.
+            rasterized_observation (Observation): The rasterized observation.
+
+        Returns:
+            SpillComparison: The gridded simulated and observed oil.
+        """
+        # Calculate grid resolution in degrees (150 m verification grid)
+        grid_resolution = np.longdouble(.15)/110.
 
-        
         """
         Generate comparison grid
         comparison grid is a common grid covering observed and modelled spills
         the grid resolution has been set, for now, at 150m S
         """
         # first, getting observation bounds
-        obs_bounds = observation_gdf.bounds
+        obs_minx, obs_miny, obs_maxx, obs_maxy = rasterized_observation.get_bounds
 
-        lonmin=np.min(lons_f)
-        latmin=np.min(lats_f)
-        lonmax=np.max(lons_f)
-        latmax=np.max(lats_f)
-        
-        if obs_bounds.minx[0] < lonmin:
-            lonmin=obs_bounds.minx[0]
-        if obs_bounds.maxx[0] > lonmax:
-            lonmax=obs_bounds.maxx[0]
-        if obs_bounds.miny[0] < latmin:
-            latmin=obs_bounds.miny[0]
-        if obs_bounds.maxy[0] > latmax:
-            latmax=obs_bounds.maxy[0]
+        # the grid covers the parcels and the observation (no parcel may be left on the surface at some time steps)
+        lonmin=np.min(lons_f, initial=obs_minx)
+        latmin=np.min(lats_f, initial=obs_miny)
+        lonmax=np.max(lons_f, initial=obs_maxx)
+        latmax=np.max(lats_f, initial=obs_maxy)
         
-        # create grid polygon consisting of multiple polygons describing squared grid cells    
-        output_frame = self.make_poly_grid_service_impl(lonmin,lonmax,latmin,latmax,grid_resolution,crs)
+        # create regular lattice describing squared grid cells, sharing the nodes of the rasterized observation
+        comparison_grid = self.gridding_service_instance.make_comparison_grid(lonmin,lonmax,latmin,latmax,grid_resolution,
+                                                                              anchor=rasterized_observation.get_raster.get_origin)
 
-        # (AUGUSTO SEPP ----- MODIFIED)
-        output_frame.set_crs('EPSG:4326',allow_override=True)
+        # Count parcels falling in each grid cell (rows are latitudes, columns are longitudes)
+        cell_total_volume = self.gridding_service_instance.count_parcels(comparison_grid, lons_f, lats_f)
 
-        """
-        Create numpy-compatible grid 
-        by first getting the central coordinates of each grid cell
-        """
-        #grid_centroid = np.asarray(output_frame['geometry'].centroid) 
-        grid_centroid = output_frame['geometry'].to_crs(crs).centroid.to_crs(output_frame.crs)
+        # Fit satellite observation (spill shape) into the grid
+        gridded_observation = self.gridding_service_instance.embed_layer(comparison_grid, rasterized_observation.get_raster, 'observation')
 
+        # Write simulated, observed and intersecting (model and observations coincide) oil layers
+        comparison_raster = self.gridding_service_instance.make_comparison_raster(comparison_grid, cell_total_volume, gridded_observation)
+        comparison_raster.set_layer('parcels', cell_total_volume)
+
+        return SpillComparison(time_index, (lonmin, latmin, lonmax, latmax), comparison_raster, rasterized_observation)
+
+    def get_modelled_spill_service_impl(self, comparison):
         """
-        Then running through grid points (indices) and creating an output matrix "event_set"
-        containing:
-        column 0: cell index
-        column 1: longitude coordinate of grid cell centroid
-        column 2: latitude coordinate of grid cell centroid  
-        column 3: simulated oil presence/absence
-        column 4: observed oil presence/absence
-        column 5: intersection between simulated and observed oil
+        Returns the polygons of the grid cells hosting parcels, built the first time they are requested.
+
+        Args:
+            comparison (SpillComparison): The gridded simulated and observed oil.
+
+        Returns:
+            GeoDataFrame: The modelled spill, with the number of parcels of each cell.
         """
-        counter=0
-        event_set=np.zeros((len(grid_centroid),6))*np.nan
-        
-        for ii in grid_centroid:
-            event_set[counter,0]=counter
-            event_set[counter,1]=ii.coords[0][0]
-            event_set[counter,2]=ii.coords[0][1]   
-            counter=counter+1 
-        # and save grid polygon
-        # output_frame.to_file(output_folder + 'grid.shp')    
-        
-        # Group your parcels into visualization grid
-        gridded_parcels = gpd.sjoin(parcels_gdf,output_frame, how='left', op='within').set_crs('EPSG:4326',allow_override=True)
+        if comparison.get_modelled_spill is None:
+            cell_total_volume = comparison.get_raster.get_layer('parcels')
+            comparison.set_modelled_spill = self.gridding_service_instance.make_poly_grid(comparison.get_raster.get_grid, cell_total_volume > 0, cell_total_volume)
 
-        # Aggregate volumes to grid cells with dissolve 
-        gridded_parcels['cell_total_volume']=1
-        cell_total_volume = gridded_parcels.dissolve(by="index_right", aggfunc="count")   
+        return comparison.get_modelled_spill
 
-        # Place them into "cell" array with their associated coordinates   
-        output_frame.loc[cell_total_volume.index, 'cell_total_volume'] = cell_total_volume.cell_total_volume.values    
-        modelled_spill = output_frame[output_frame['cell_total_volume'] > 0]
-        modelled_spill.to_file(output_folder + 'out.shp')
-        
-        for ii in range(0,len(modelled_spill)):
-            counter = modelled_spill.iloc[ii].name
-            event_set[counter,3]=modelled_spill.iloc[ii].cell_total_volume/modelled_spill.iloc[ii].cell_total_volume
-
-        # Fit satellite observation (spill shape) into visualization grid
-        gridded_observation = gpd.sjoin(left_df=output_frame, right_df=observation_gdf[['geometry']], how='inner').set_crs('EPSG:4326',allow_override=True)
-        for ii in range(0,len(gridded_observation)):
-            counter = gridded_observation.iloc[ii].name
-            event_set[counter,4]=1      
-        # gridded_observation.to_file(output_folder + 'observation.shp')
-            
-        # Find areas where model and observations coincide on oil detection
-        model_and_obs= gpd.sjoin(left_df=output_frame[output_frame['cell_total_volume'] > 0], right_df=observation_gdf[['geometry']], how='inner')
-        for ii in range(0,len(model_and_obs)):
-            counter = model_and_obs.iloc[ii].name
-            event_set[counter,5]=1
-
-        """
-        Compute your Fractional Skill Score
-        """ 
-        X,Y=np.meshgrid(np.unique(event_set[:,1]),np.unique(event_set[:,2]))
-        interp_model=NearestNDInterpolator(list(zip(event_set[:,1],event_set[:,2])),event_set[:,3])
-        interp_observation=NearestNDInterpolator(list(zip(event_set[:,1],event_set[:,2])),event_set[:,4])
-        # interp_intersection=NearestNDInterpolator(list(zip(event_set[:,1],event_set[:,2])),event_set[:,5])
-        
-        array_model = interp_model(X, Y)
-        array_observation = interp_observation(X, Y)   
-        # array_intersection = interp_intersection(X, Y)    
-        
-        array_model[np.isnan(array_model)] = 0
-        array_observation[np.isnan(array_observation)] = 0
+    def compute_fss_curve_service_impl(self, comparison):
+        """
+        Computes the Fractions Skill Score (FSS) for every search window size.
 
-        array_union = array_model+2*array_observation
-        array_union[array_union==0]=np.nan
-        
+        Args:
+            comparison (SpillComparison): The gridded simulated and observed oil.
+
+        Returns:
+            numpy.ndarray: A (scales, 2) array with the window size (in pixels) and the FSS value.
+        """
         # Set search window sizes  (in number of pixes)
-        horizontal_scales = range(1,150,2) # horizontal_scales = range(1,11,2) per aumentare la scala
+        horizontal_scales = self.FSS_SCALES
         fss_output=np.zeros((len(horizontal_scales),2))
-        
-        cc = 0
-        for hh in horizontal_scales:         
-            fss_= fss(array_model, array_observation, 1, hh)
-            fss_output[cc,0]=hh
-            fss_output[cc,1]=fss_
-            cc=cc+1
 
+        # All the scales are evaluated at once from the integral images of the two fields
+        fss_output[:,0]=horizontal_scales
+        fss_output[:,1]=fss_scales(comparison.get_raster.get_layer('model'), comparison.get_raster.get_layer('observation'), 1, horizontal_scales)
+
+        return fss_output
+
+    def compute_overlay_service_impl(self, comparison):
         """
-        Plotting and saving results
+        Computes the overlay metric: the area of the observed oil covered by the modelled spill,
+        divided by the observation area.
+
+        Args:
+            comparison (SpillComparison): The gridded simulated and observed oil.
+
+        Returns:
+            float: The overlay fraction.
         """
-        # Create a new figure for plotting
-        plt.figure()
+        modelled_spill = self.get_modelled_spill_service_impl(comparison)
 
-        fig, ax = plt.subplots(figsize=(10, 5))
+        # Observed oil slick geometries, kept in memory along with the rasterized observation
+        observation = self.observation_service_instance.get_observation_geometries(comparison.get_observation)
 
-        # Define labels for the legend
-        labels = {'Yellow': 'MDK-II simulation', 'Blue': 'Observation', 'Magenta': 'Overlap between MDK-II sim and Observation'}
+        # Create the intersection between model and observed oil slick
+        overlay_shp = modelled_spill.overlay(observation, how='intersection')
+        if overlay_shp.empty:
+            return 0.
 
-        # Define a colormap for the plot
-        cMap = c.ListedColormap(['y','b','m'])
+        # Calculates the metric (percentage)
+        overlay_value = (overlay_shp.area / observation.area)
 
-        # Create a Basemap object for plotting geographical data
-        m = Basemap(llcrnrlon=lonmin,llcrnrlat=latmin,\
-                    urcrnrlon=lonmax,urcrnrlat=latmax,\
-                    rsphere=(6378137.00,6356752.3142),\
-                    resolution='i',projection='merc',\
-                    lat_0=(latmax + latmin)/2.,\
-                    lon_0=(lonmax + lonmin)/2.,epsg=4326)
-        
-        # Convert grid coordinates to map coordinates
-        x_map,y_map=m(X,Y)
+        return overlay_value[0]
+
+    def compute_centroid_distance_service_impl(self, comparison):
+        """
+        Computes the distance between the centroids of the observed and modelled spills.
+
+        Args:
+            comparison (SpillComparison): The gridded simulated and observed oil.
 
-        # Plot the array on the map using a specified colormap
-        m.pcolor(x_map,y_map,array_union,cmap=cMap)
+        Returns:
+            float: The distance in degrees.
+        """
+        from shapely.geometry import Point
 
-        # Draw coastlines on the map
-        m.drawcoastlines()
+        modelled_spill = self.get_modelled_spill_service_impl(comparison)
 
-        # Fill continents with a specified alpha value
-        m.fillcontinents(alpha=1,zorder=3)
+        # Centroid of the observation is computed once, along with its raster
+        observation_centroid = Point(*comparison.get_observation.get_centroid)
+        model_centroid = modelled_spill.unary_union.centroid
 
-        # Draw meridians and parallels on the map with specified intervals and labels
-        m.drawmeridians(np.arange(lonmin,lonmax,(lonmax-lonmin)/4.), labels=[0,0,0,1],color='white',linewidth=0.03, fontsize = 5)
-        m.drawparallels(np.arange(latmin,latmax,(latmax-latmin)/4.),labels=[1,0,0,0],color='white',linewidth=0.03, fontsize = 5)
+        return observation_centroid.distance(model_centroid)
 
-        # Legend
-        legend_elements = [Patch(facecolor=color, edgecolor='None', label=label) for color, label in labels.items()]
-        legend = ax.legend(handles=legend_elements, loc='upper center', fontsize=5, bbox_to_anchor=(0.5, -0.05), ncol=3, edgecolor='None')
-        plt.setp(legend.get_title(), fontsize='large', fontname='sans-serif')
+    def compute_metric_values_service_impl(self, comparison, fss_output):
+        """
+        Computes the value of every metric from a comparison.
 
-        config_keys = list(self.mdk2_sim_params_instance.get_config_keys())
-        reversed_config_keys = config_keys[::-1]
+        Args:
+            comparison (SpillComparison): The gridded simulated and observed oil.
+            fss_output (numpy.ndarray): The FSS curve computed by compute_fss_curve_service_impl.
 
-        description = ""
-        for item1, item2 in zip(config_keys, values):
-            description += f"{item1} : {np.round(float(item2), 2)}\n"
+        Returns:
+            dict: The metric values, keyed by metric name (see EvalMetric).
+        """
+        return {
+            EvalMetric.FSS.value: np.round(fss_output[:,1].min(), 2),
+            EvalMetric.OVERLAY.value: np.round(self.compute_overlay_service_impl(comparison), 2),
+            EvalMetric.CSS.value: -(np.round(self.compute_centroid_distance_service_impl(comparison), 4)),
+        }
 
-        description += "\n"
+    def compute_comparison_metrics_service_impl(self, simulation_folder, observation_path, output_folder, values, write_artifacts=True, metric_name=None, archive_parameters=None, artifacts=None, stage=None):
+        """
+        Computes every metric from a single comparison stage.
 
-        description += f"Simulation init date: {self.mdk2_sim_date_instance.get_day()} {calendar.month_name[int(self.mdk2_sim_date_instance.get_month())]} 20{self.mdk2_sim_date_instance.get_year()} \nSimulation init hour: {self.mdk2_sim_date_instance.get_hour()}:{self.mdk2_sim_date_instance.get_minutes()} \nNumber of simulated particles: {self.mdk2_sim_params_instance.get_particles_value()} \n{self.bay_opt_setup_instance.get_eval_metric()}: {np.round(fss_output[:,1].min(), 2)}"
-        
-        ax.text(0.5, -0.10, description, transform=ax.transAxes, fontsize=7, ha='center', va='top', bbox=dict(facecolor='white', edgecolor='none'))
+        Args:
+            simulation_folder (str): The folder containing simulation outputs.
+            observation_path (str): The path to the satellite observation.
+            output_folder (str): The folder where the results will be saved.
+            values (list): The simulation parameters, reported in the plots.
+            write_artifacts (bool): If False, only the metrics are computed and nothing is written to output_folder.
+            metric_name (str, optional): The metric reported in the plots. Defaults to the eval_metric of the configuration file.
+            archive_parameters (dict, optional): The parameter values of the evaluation; when given, the comparison
+                                                 is appended to the campaign archive.
+            artifacts (list, optional): When given, the paths of the files written are appended to it.
+            stage (dict, optional): When given, it is filled with the comparison stage of the evaluation, so that
+                                    its outputs can be written later by save_stage_artifacts_service_impl.
+
+        Returns:
+            dict: The metric values, keyed by metric name (see EvalMetric).
+        """
+        comparison = self.build_comparison_service_impl(simulation_folder, observation_path)
+
+        fss_output = self.compute_fss_curve_service_impl(comparison)
+
+        metrics = self.compute_metric_values_service_impl(comparison, fss_output)
+
+        if archive_parameters is not None:
+            self.archive_comparison_service_impl(comparison, metrics, archive_parameters)
+
+        if metric_name is None:
+            metric_name = self.get_metric_name_service_impl()
+
+        if stage is not None:
+            stage.update(comparison=comparison, fss_output=fss_output, metrics=metrics, metric_name=metric_name,
+                         simulation_folder=simulation_folder, output_folder=output_folder)
+
+        if write_artifacts:
+            written = self.save_artifacts_service_impl(comparison, fss_output, metrics[metric_name], metric_name, simulation_folder, output_folder, values)
+
+            if artifacts is not None:
+                artifacts.extend(written)
+
+        return metrics
+
+    def save_stage_artifacts_service_impl(self, stage, values, artifacts=None):
+        """
+        Writes the outputs of an evaluation from the comparison stage kept when its metrics were computed,
+        without building the comparison and the FSS curve again.
+
+        Args:
+            stage (dict): The comparison stage filled by compute_comparison_metrics_service_impl.
+            values (list): The simulation parameters, reported in the plots.
+            artifacts (list, optional): When given, the paths of the files written are appended to it.
+        """
+        os.makedirs(stage['output_folder'], exist_ok=True)
+
+        written = self.save_artifacts_service_impl(stage['comparison'], stage['fss_output'], stage['metrics'][stage['metric_name']],
+                                                   stage['metric_name'], stage['simulation_folder'], stage['output_folder'], values)
+
+        if artifacts is not None:
+            artifacts.extend(written)
+
+    def save_artifacts_service_impl(self, comparison, fss_output, metric, metric_name, simulation_folder, output_folder, values):
+        """
+        Saves the outputs of an evaluation: the modelled spill shapefile, the FSS curve, the event set and the plots.
+
+        Args:
+            comparison (SpillComparison): The gridded simulated and observed oil.
+            fss_output (numpy.ndarray): The FSS curve computed by compute_fss_curve_service_impl.
+            metric (float): The value of the metric reported in the plots.
+            metric_name (str): The name of the metric reported in the plots.
+            simulation_folder (str): The folder containing simulation outputs.
+            output_folder (str): The folder where the results will be saved.
+            values (list): The simulation parameters, reported in the plots.
+
+        Returns:
+            list: The paths of the files written; the plots, rendered in background, are not part of it.
+        """
+        # Set the spatial resolution for the verification grid (in km)
+        verif_grid_resolution = .15
 
-        title = f"MDK-II Simulation in {self.mdk2_sim_extent_instance.get_SIM_NAME()} \n after {'%02d' % (time_index + 1)}h from last detection"
+        time_index = comparison.get_time_index
+        lonmin, latmin, lonmax, latmax = comparison.get_extent
 
-        # Add title
-        plt.title(title, fontweight='bold', fontname='sans-serif', fontsize=10, color='black', pad=15)
+        # Construct an identifier for the current simulation output based on simulation name and time index
+        xp_identifier = self.path_controller_instance.get_sim_str() + '_' + '%02d' % (time_index+1) + 'h_' 
 
-        # Save the plot as a PNG image file
-        plt.savefig(output_folder + f'/{self.bay_opt_setup_instance.get_eval_metric()}_' + xp_identifier + '.png',dpi=600,bbox_inches='tight')
+        shapefiles = [output_folder + 'out.shp']
+        self.get_modelled_spill_service_impl(comparison).to_file(shapefiles[0])
+
+        # The model polygon is saved only when the overlay is reported
+        if metric_name == EvalMetric.OVERLAY.value:
+            self.save_model_polygon_service_impl(self.path_controller_instance.get_GSHHS_DATA(), simulation_folder + '/spill_properties.nc', time_index, output_folder)
+            shapefiles.append(output_folder + 'model_polygon.shp')
 
         # Save FSS output and event set data as text files
-        np.savetxt(output_folder + f'/{self.bay_opt_setup_instance.get_eval_metric()}_' + xp_identifier + '.txt',fss_output)
-        np.savetxt(output_folder + '/event_set_' + xp_identifier + '.txt',event_set)
-        
-        # Create a new figure for plotting
-        plt.figure()
+        text_files = [output_folder + f'/{self.bay_opt_setup_instance.get_eval_metric()}_' + xp_identifier + '.txt', output_folder + '/event_set_' + xp_identifier + '.txt']
+        np.savetxt(text_files[0],fss_output)
+        np.savetxt(text_files[1],self.gridding_service_instance.make_event_set(comparison.get_raster))
 
         # Plot aggregated FSS output
-        plt.plot(fss_output[:,0]*verif_grid_resolution,fss_output[:,1],'.-')
+        self.render_service_instance.add_job(render_fss_curve, RenderJob(
+            output_folder + '/agg_fss_' + xp_identifier + '.png',
+            dict(x=fss_output[:,0]*verif_grid_resolution, y=fss_output[:,1])))
+
+        """
+        Create numpy-compatible grid 
+        by getting the central coordinates of each grid cell
+        """
+        X, Y = self.gridding_service_instance.get_cell_centres(comparison.get_raster.get_grid)
+
+        array_union = self.gridding_service_instance.make_union_array(comparison.get_raster)
+
+        self.plt_result(lonmin, latmin, lonmax, latmax, X, Y, array_union, xp_identifier, output_folder, time_index, metric, values)
+
+        # A shapefile is made of several files sharing its name
+        return [f for shp in shapefiles for f in sorted(glob.glob(glob.escape(os.path.splitext(shp)[0]) + '.*'))] + text_files
+
+    def compute_sin_fss(self, simulation_folder, observation_shp, output_folder, values: list, write_artifacts=True):
+        """
+        Computes the Fractions Skill Score (FSS)
+
+        Args:
+            simulation_folder (str): The folder containing simulation outputs.
+            observation_shp (str): The file path to the shapefile containing observation data.
+            output_folder (str): The folder where the FSS results will be saved.
+            write_artifacts (bool): If False, only the metric is computed and nothing is written to output_folder.
+        """
+        metrics = self.compute_comparison_metrics_service_impl(simulation_folder, observation_shp, output_folder, values, write_artifacts)
+
+        return metrics[EvalMetric.FSS.value]
+
+    def get_campaign_grid_service_impl(self, rasterized_observation):
+        """
+        Returns the lattice shared by the rasters of an optimization campaign: it covers the simulation domain
+        (spill position +/- delta) and the observation, on the nodes of the rasterized observation.
+
+        Args:
+            rasterized_observation (Observation): The rasterized observation.
+
+        Returns:
+            ComparisonGrid: The campaign lattice.
+        """
+        # Calculate grid resolution in degrees (150 m verification grid)
+        grid_resolution = np.longdouble(.15)/110.
+
+        lat = float(self.mdk2_sim_coords_instance.get_lat_degree()) + float(self.mdk2_sim_coords_instance.get_lat_minutes())/60.
+        lon = float(self.mdk2_sim_coords_instance.get_lon_degree()) + float(self.mdk2_sim_coords_instance.get_lon_minutes())/60.
+        delta = float(self.mdk2_sim_coords_instance.get_delta())
+
+        obs_minx, obs_miny, obs_maxx, obs_maxy = rasterized_observation.get_bounds
+
+        return self.gridding_service_instance.make_comparison_grid(min(lon - delta, obs_minx), max(lon + delta, obs_maxx),
+                                                                   min(lat - delta, obs_miny), max(lat + delta, obs_maxy),
+                                                                   grid_resolution, anchor=rasterized_observation.get_raster.get_origin)
+
+    def archive_comparison_service_impl(self, comparison, metrics, parameters):
+        """
+        Appends the modelled oil of an evaluation to the campaign archive, created on the first evaluation
+        along with the observation layer. Oil falling outside the campaign lattice is not archived.
+        The archive is created or appended by one evaluation at a time.
+
+        Args:
+            comparison (SpillComparison): The gridded simulated and observed oil.
+            metrics (dict): The metric values, keyed by metric name.
+            parameters (dict): The parameter values of the evaluation.
+
+        Returns:
+            int: The iteration of the evaluation in the archive.
+        """
+        campaign_archive = CampaignArchiveRepo(self.path_controller_instance.get_campaign_archive_file())
+
+        with archive_lock:
+            try:
+                if not campaign_archive.exists():
+                    campaign_grid = self.get_campaign_grid_service_impl(comparison.get_observation)
+                    gridded_observation = self.gridding_service_instance.embed_layer(campaign_grid, comparison.get_observation.get_raster, 'observation')
 
-        # Save the plot as a PNG image file
-        plt.savefig(output_folder + '/agg_fss_' + xp_identifier + '.png',dpi=600,bbox_inches='tight')
+                    campaign_archive.create(campaign_grid, gridded_observation, [metric.value for metric in EvalMetric], list(parameters))
 
-        # Close all figures
-        plt.close('all')
+                # Rasters of the evaluations share the nodes of the campaign lattice, no resampling is needed
+                model = self.gridding_service_instance.embed_layer(campaign_archive.get_grid(), comparison.get_raster, 'model')
 
-        return np.round(fss_output[:,1].min(), 2)
+                return campaign_archive.append(model > 0, metrics, list(parameters.values()))
+            finally:
+                campaign_archive.close()
+
+    def compute_archived_metrics_service_impl(self, iteration):
+        """
+        Computes every metric (FSS, overlay, CSS) of an archived evaluation, on the campaign lattice.
+
+        Args:
+            iteration (int): The iteration of the evaluation in the campaign archive.
+
+        Returns:
+            dict: The metric values, keyed by metric name (see EvalMetric).
+        """
+        grid_resolution = np.longdouble(.15)/110.
+
+        rasterized_observation = self.observation_service_instance.get_observation(self.observation_service_instance.get_observation_path(), grid_resolution)
+
+        with archive_lock, CampaignArchiveRepo(self.path_controller_instance.get_campaign_archive_file()) as campaign_archive:
+            campaign_grid = campaign_archive.get_grid()
+            model = campaign_archive.read_model(iteration)
+            gridded_observation = campaign_archive.read_observation()
+
+        comparison_raster = self.gridding_service_instance.make_comparison_raster(campaign_grid, model, gridded_observation)
+        comparison_raster.set_layer('parcels', model.astype(float))
+
+        extent = (campaign_grid.get_lonmin, campaign_grid.get_latmin, campaign_grid.get_lonmax, campaign_grid.get_latmax)
+        comparison = SpillComparison(None, extent, comparison_raster, rasterized_observation)
+
+        return self.compute_metric_values_service_impl(comparison, self.compute_fss_curve_service_impl(comparison))
+
+    def compute_archived_fss_service_impl(self, iterations=slice(None), chunk_size=16):
+        """
+        Computes the FSS curve of many archived evaluations at once, on the campaign lattice: the model layers
+        are read by chunks of iterations and scored together against the observation layer.
+
+        Args:
+            iterations (slice): The iterations of the campaign archive to score.
+            chunk_size (int): The number of model layers read and scored at once.
+
+        Returns:
+            numpy.ndarray: A (iterations, scales) array with the FSS value of each evaluation for every window size
+                           of compute_fss_curve_service_impl; the FSS metric of an evaluation is the minimum of its row.
+        """
+        with archive_lock, CampaignArchiveRepo(self.path_controller_instance.get_campaign_archive_file()) as campaign_archive:
+            selected = range(campaign_archive.get_iterations())[iterations]
+            gridded_observation = campaign_archive.read_observation()
+
+            fss_output = np.full((len(selected), len(self.FSS_SCALES)), np.nan)
+
+            for start in range(0, len(selected), chunk_size):
+                chunk = selected[start:start+chunk_size]
+                model = campaign_archive.read_model(slice(chunk.start, chunk.stop if chunk.stop >= 0 else None, chunk.step))
+
+                fss = fss_batch_init(1, self.FSS_SCALES)
+                fss_batch_accum(fss, model, gridded_observation)
+                fss_output[start:start+len(chunk)] = fss_batch_compute(fss)
+
+        return fss_output
+
+    def compute_comparison_series_service_impl(self, simulation_folder, observation_path, output_folder=None, save_rasters=False, chunk_size=24):
+        """
+        Scores every time step of the simulation against the observation.
+
+        spill_properties.nc is walked by chunks of time steps, and each step is gridded on the lattice of the
+        rasterized observation: only one chunk of parcels and one comparison raster are held in memory at a time.
+
+        Args:
+            simulation_folder (str): The folder containing simulation outputs.
+            observation_path (str): The path to the satellite observation.
+            output_folder (str, optional): The folder where the metric time series is saved. Nothing is written when None.
+            save_rasters (bool): If True, the comparison raster of every time step is saved in output_folder as well.
+            chunk_size (int): The number of time steps read at once.
+
+        Returns:
+            numpy.ndarray: A (time steps, 4) array with the time index and the FSS, overlay and CSS values.
+        """
+        # Calculate grid resolution in degrees (150 m verification grid)
+        grid_resolution = np.longdouble(.15)/110.
+
+        # Construct the file path to the spill properties NetCDF file
+        fname = simulation_folder + '/spill_properties.nc'
+
+        # load satellite detection, rasterized only once for the whole optimization
+        rasterized_observation = self.observation_service_instance.get_observation(observation_path, grid_resolution)
+
+        metric_series = []
+
+        with MDK2SpillPropertiesRepo(fname) as spill_properties:
+            for time_index, lons_f, lats_f, surface_volumes in spill_properties.iter_surface_parcels(chunk_size=chunk_size):
+
+                comparison = self.make_comparison_service_impl(time_index, lons_f, lats_f, rasterized_observation)
+                metrics = self.compute_metric_values_service_impl(comparison, self.compute_fss_curve_service_impl(comparison))
+
+                metric_series.append([time_index] + [metrics[metric.value] for metric in EvalMetric])
+
+                if save_rasters and output_folder is not None:
+                    xp_identifier = self.path_controller_instance.get_sim_str() + '_' + '%02d' % (time_index+1) + 'h_'
+                    raster = comparison.get_raster
+
+                    np.savez_compressed(output_folder + '/comparison_' + xp_identifier + '.npz',
+                                        model=raster.get_layer('model').astype(bool),
+                                        observation=raster.get_layer('observation').astype(bool),
+                                        origin=np.asarray(raster.get_origin, dtype=np.float64),
+                                        resolution=np.float64(raster.get_resolution))
+
+        metric_series = np.array(metric_series, dtype=np.float64).reshape(-1, 1 + len(EvalMetric))
+
+        if output_folder is not None:
+            np.savetxt(output_folder + '/metric_series_' + self.path_controller_instance.get_sim_str() + '.txt', metric_series,
+                       header=' '.join(['time_index'] + [metric.value for metric in EvalMetric]))
+
+        return metric_series
 
     def get_sim_date_service_impl(self, yy, mm, dd, hh):
         """
@@ -604,49 +800,10 @@ class MetricsServiceImpl:
 
         Returns:
             None :
-                The function does not return anything but saves a plot to the specified path
+                The function does not return anything but queues the plot, rendered in background
+                once the render jobs are submitted
         """
 
-        # Create a new figure for plotting
-        plt.figure()
-
-        fig, ax = plt.subplots(figsize=(10, 5))
-
-        # Define labels for the legend
-        labels = {'Yellow': 'MDK-II simulation', 'Blue': 'Observation', 'Magenta': 'Overlap between MDK-II sim and Observation'}
-
-        # Define a colormap for the plot
-        cMap = c.ListedColormap(['y','b','m'])
-
-        # Create a Basemap object for plotting geographical data
-        m = Basemap(llcrnrlon=lonmin,llcrnrlat=latmin,\
-                    urcrnrlon=lonmax,urcrnrlat=latmax,\
-                    rsphere=(6378137.00,6356752.3142),\
-                    resolution='i',projection='merc',\
-                    lat_0=(latmax + latmin)/2.,\
-                    lon_0=(lonmax + lonmin)/2.,epsg=4326)
-        
-        # Convert grid coordinates to map coordinates
-        x_map,y_map=m(X,Y)
-
-        # Plot the array on the map using a specified colormap
-        m.pcolor(x_map,y_map,array_union,cmap=cMap)
-
-        # Draw coastlines on the map
-        m.drawcoastlines()
-
-        # Fill continents with a specified alpha value
-        m.fillcontinents(alpha=1,zorder=3)
-
-        # Draw meridians and parallels on the map with specified intervals and labels
-        m.drawmeridians(np.arange(lonmin,lonmax,(lonmax-lonmin)/4.), labels=[0,0,0,1],color='white',linewidth=0.03, fontsize = 5)
-        m.drawparallels(np.arange(latmin,latmax,(latmax-latmin)/4.),labels=[1,0,0,0],color='white',linewidth=0.03, fontsize = 5)
-
-        # Legend
-        legend_elements = [Patch(facecolor=color, edgecolor='None', label=label) for color, label in labels.items()]
-        legend = ax.legend(handles=legend_elements, loc='upper center', fontsize=5, bbox_to_anchor=(0.5, -0.05), ncol=3, edgecolor='None')
-        plt.setp(legend.get_title(), fontsize='large', fontname='sans-serif')
-
         config_keys = list(self.mdk2_sim_params_instance.get_config_keys())
         reversed_config_keys = config_keys[::-1]
 
@@ -658,33 +815,52 @@ class MetricsServiceImpl:
 
         # Add description
         description += f"Simulation init date: {self.mdk2_sim_date_instance.get_day()} {calendar.month_name[int(self.mdk2_sim_date_instance.get_month())]} 20{self.mdk2_sim_date_instance.get_year()} \nSimulation init hour: {self.mdk2_sim_date_instance.get_hour()}:{self.mdk2_sim_date_instance.get_minutes()} \nNumber of simulated particles: {self.mdk2_sim_params_instance.get_particles_value()} \n{self.bay_opt_setup_instance.get_eval_metric()}: {np.round(metric, 2)}"
-        ax.text(0.5, -0.10, description, transform=ax.transAxes, fontsize=7, ha='center', va='top', bbox=dict(facecolor='white', edgecolor='none'))
 
         title = f"MDK-II Simulation in {self.mdk2_sim_extent_instance.get_SIM_NAME()} \n after {'%02d' % (time_index+1)}h from the init position"
 
-        # Add title
-        plt.title(title, fontweight='bold', fontname='sans-serif', fontsize=10, color='black', pad=15)
+        # The map is rendered in background, from the arrays computed here
+        self.render_service_instance.add_job(render_spill_map, RenderJob(
+            output_folder + f'/{self.bay_opt_setup_instance.get_eval_metric()}_' + xp_identifier + '.png',
+            dict(lonmin=lonmin, latmin=latmin, lonmax=lonmax, latmax=latmax, X=X, Y=Y, array_union=array_union, title=title, description=description)))
 
-        # Save the plot as a PNG image file
-        plt.savefig(output_folder + f'/{self.bay_opt_setup_instance.get_eval_metric()}_' + xp_identifier + '.png',dpi=600,bbox_inches='tight')
-        
-        # Create a new figure for plotting
-        plt.figure()
+    def get_metric_name_service_impl(self):
+        """
+        Returns the name of the evaluation metric chosen in the configuration file (eval_metric).
 
-        # Close all figures
-        plt.close('all')
+        Returns:
+            str: The metric name, as used in the dictionary returned by compute_metrics_service_impl.
 
-    def compute_multi_fss_service_impl(self, values):
+        Raises:
+            WrongConfigurationException: If the evaluation metric is not recognized.
         """
-        Computes the Fraction Skill Score (FSS) for the chosen observation.
+        eval_metric = self.bay_opt_setup_instance.get_eval_metric()
 
-        values (list) : 
-            Specific values associated with the data that can be used to color or label points in the plot
+        # "centroid" is the name used by older configuration files
+        if eval_metric == "centroid":
+            return EvalMetric.CSS.value
 
-        Returns (float):
-            The FSS value.
+        if eval_metric not in [metric.value for metric in EvalMetric]:
+            raise WrongConfigurationException(f"Unknown eval_metric '{eval_metric}'")
+
+        return eval_metric
+
+    def compute_metrics_service_impl(self, values, write_artifacts=True, metric_name=None, archive_parameters=None, artifacts=None, stage=None):
         """
+        Computes every metric (FSS, overlay, CSS) for the chosen observation from a single comparison stage.
+
+        Args:
+            values (list): The simulation parameters, reported in the plots.
+            write_artifacts (bool): If False, only the metrics are computed and no file is written in the detection directory.
+            metric_name (str, optional): The metric reported in the plots. Defaults to the eval_metric of the configuration file.
+            archive_parameters (dict, optional): The parameter values of the evaluation; when given, the comparison
+                                                 is appended to the campaign archive.
+            artifacts (list, optional): When given, the paths of the files written are appended to it.
+            stage (dict, optional): When given, it is filled with the comparison stage of the evaluation, so that
+                                    its outputs can be written later by save_stage_artifacts_service_impl.
 
+        Returns:
+            dict: The metric values, keyed by metric name (see EvalMetric).
+        """
         start_time = time.time()
 
         yy = self.mdk2_sim_date_instance.get_year()
@@ -693,61 +869,134 @@ class MetricsServiceImpl:
         hh = self.mdk2_sim_date_instance.get_hour()
         mn = self.mdk2_sim_date_instance.get_minutes()
 
-        self.path_controller_instance.create_detection_dir(f"20{yy}{mm}{dd}_{hh}{mn}")
+        if write_artifacts:
+            self.path_controller_instance.create_detection_dir(f"20{yy}{mm}{dd}_{hh}{mn}")
+
+        metrics = self.compute_comparison_metrics_service_impl(self.path_controller_instance.get_MEDSLIK_OUT_DIR(), self.observation_service_instance.get_observation_path(), self.path_controller_instance.get_detection_dir(f"20{yy}{mm}{dd}_{hh}{mn}"), values, write_artifacts, metric_name, archive_parameters, artifacts, stage)
 
-        FSS = self.compute_sin_fss(self.path_controller_instance.get_MEDSLIK_OUT_DIR(), os.environ.get('OBSPATH').split(":")[1], self.path_controller_instance.get_detection_dir(f"20{yy}{mm}{dd}_{hh}{mn}"), values)
-    
         end_time = time.time()
         execution_time = (end_time - start_time) / 60
 
         print("exec_time:", {execution_time})
 
-        return FSS
+        return metrics
+
+    def compute_metric_series_service_impl(self, save_rasters=False):
+        """
+        Computes the time series of every metric (FSS, overlay, CSS) over the whole simulation for the chosen observation,
+        saving it in the detection directory.
+
+        Args:
+            save_rasters (bool): If True, the comparison raster of every time step is saved as well.
+
+        Returns:
+            numpy.ndarray: A (time steps, 4) array with the time index and the FSS, overlay and CSS values.
+        """
+        yy = self.mdk2_sim_date_instance.get_year()
+        mm = self.mdk2_sim_date_instance.get_month()
+        dd = self.mdk2_sim_date_instance.get_day()
+        hh = self.mdk2_sim_date_instance.get_hour()
+        mn = self.mdk2_sim_date_instance.get_minutes()
+
+        self.path_controller_instance.create_detection_dir(f"20{yy}{mm}{dd}_{hh}{mn}")
+
+        return self.compute_comparison_series_service_impl(self.path_controller_instance.get_MEDSLIK_OUT_DIR(), self.observation_service_instance.get_observation_path(), self.path_controller_instance.get_detection_dir(f"20{yy}{mm}{dd}_{hh}{mn}"), save_rasters)
+
+    def save_parcel_snapshot_service_impl(self, parameters, time_indices=None):
+        """
+        Extracts the floating parcels of the last simulation into the parcel snapshot store, so that the
+        evaluation can be scored again or plotted after MEDSLIK-II overwrites its output.
+
+        Args:
+            parameters (dict): The parameter values of the simulation.
+            time_indices (list, optional): The time indices to store. The one closest to the observation when None.
+
+        Returns:
+            int: The iteration assigned to the snapshot.
+        """
+        if time_indices is None:
+            time_indices = [self.get_time_index(self.get_mdksim_date_service_impl(), self.get_obs_date_service_impl(self.observation_service_instance.get_observation_path()))]
+
+        fname = os.path.join(self.path_controller_instance.get_MEDSLIK_OUT_DIR(), 'spill_properties.nc')
+
+        parcels = self.get_surface_parcels_service_impl(fname, list(time_indices))
+
+        parcel_snapshot_repo = ParcelSnapshotRepo(self.path_controller_instance.get_parcel_snapshot_dir())
+
+        return parcel_snapshot_repo.append_next(parameters, dict(zip(time_indices, parcels)))
+
+    def compute_snapshot_metrics_service_impl(self, iteration, time_index=None):
+        """
+        Computes every metric (FSS, overlay, CSS) of a stored evaluation, without reading the simulation output.
+
+        Args:
+            iteration (int): The iteration of the evaluation in the parcel snapshot store.
+            time_index (int, optional): The time index of the snapshot. The first one stored for the iteration when None.
+
+        Returns:
+            dict: The metric values, keyed by metric name (see EvalMetric).
+        """
+        parcel_snapshot_repo = ParcelSnapshotRepo(self.path_controller_instance.get_parcel_snapshot_dir())
+
+        if time_index is None:
+            time_index = next(row['time_index'] for row in parcel_snapshot_repo.get_index() if row['iteration'] == iteration)
+
+        lons_f, lats_f, surface_volumes = parcel_snapshot_repo.get_parcels(iteration, time_index)
+
+        # Calculate grid resolution in degrees (150 m verification grid)
+        grid_resolution = np.longdouble(.15)/110.
+
+        rasterized_observation = self.observation_service_instance.get_observation(self.observation_service_instance.get_observation_path(), grid_resolution)
+
+        comparison = self.make_comparison_service_impl(time_index, np.asarray(lons_f, dtype=np.float64), np.asarray(lats_f, dtype=np.float64), rasterized_observation)
+
+        return self.compute_metric_values_service_impl(comparison, self.compute_fss_curve_service_impl(comparison))
+
+    def compute_multi_fss_service_impl(self, values, write_artifacts=True):
+        """
+        Computes the Fraction Skill Score (FSS) for the chosen observation.
+
+        values (list) : 
+            Specific values associated with the data that can be used to color or label points in the plot
+
+        write_artifacts (bool) :
+            If False, only the metric is computed and no file is written in the detection directory
+
+        Returns (float):
+            The FSS value.
+        """
+        return self.compute_metrics_service_impl(values, write_artifacts, EvalMetric.FSS.value)[EvalMetric.FSS.value]
     
-    def metric_overlay_service_impl(self,
+    def save_model_polygon_service_impl(self,
                        coastline_path,
-                       observation_path,
                        model_path,
+                       time_index,
                        output_folder,
-                       values,
                        concave_hull_ratio = 0.4,
                        concave_hull = False
                     ):
         '''
-        This function calculates the overlay metric (%) between an oil observarion (in shapefile) and a model output from Medslik-II (in netcdf)
-        The metric is based on the % match between the area covered from a simulation in comparison with the real observed event.
-        To obtain that, all the partciles from a given moment (model_hour) at the simulation are engulfed by a convex hull.
+        Engulfs all the parcels of the given time step in a convex hull, removes the land from it and saves it as model_polygon.shp.
         Concave hull can be used, but need GEOS 3.11 to be present in the instalation and could not be straightforward. Standard ratio value is 0.4 (concave_hull_ratio)
-        The value is simply the intersect area from model and observation divided by the observation area in percentage
         '''
-        # Opening the observation shapefile
-        observation = gpd.read_file(observation_path)
+        import geopandas as gpd
+        import shapely
 
-        # Opening the model output
-        model = xr.open_dataset(model_path)
+        # Reading status and position of every parcel at the selected time step, as whole arrays
+        with MDK2SpillPropertiesRepo(model_path) as spill_properties:
+            particle_status = spill_properties.read_variable('particle_status', [time_index], np.int32)[0]
+            lon = spill_properties.read_variable('longitude', [time_index])[0]
+            lat = spill_properties.read_variable('latitude', [time_index])[0]
 
-        # Find the time index of the simulation data closest to the observation date
-        time_index = self.get_time_index(self.get_mdksim_date_service_impl(), self.get_obs_date_service_impl(observation_path))
-
-        # Selecting the appropriate time step
-        rec = model.isel(time = time_index)
-
-        # List with lat and lon for each particle in the timestep output
-        geom = []
-        for p in range(0,len(rec.non_evaporative_volume)):
-            if rec.particle_status[p].values > 0:
-                geom.append(Point(rec.isel(parcel_id=p).longitude.values,rec.isel(parcel_id=p).latitude.values))
-            else:
-                pass
+        # Coordinates of the released particles
+        released = particle_status > 0
+        points = shapely.multipoints(np.column_stack((lon[released], lat[released])))
 
-        #Create a point shapefile from the geometries in the list
-        shp = gpd.GeoDataFrame(geometry=geom)
-
-        #Transform the point shapefile on a polygon
+        #Transform the particles on a polygon
         if concave_hull == True:
-            model_polygon = gpd.GeoDataFrame(shp.dissolve().concave_hull(ratio=concave_hull_ratio))
+            model_polygon = gpd.GeoDataFrame(geometry=[shapely.concave_hull(points, ratio=concave_hull_ratio)])
         else:
-            model_polygon = gpd.GeoDataFrame(geometry=shp.dissolve().geometry.convex_hull)
+            model_polygon = gpd.GeoDataFrame(geometry=[points.convex_hull])
 
         #Subtracting values on land from the coastline
         coastline = gpd.read_file(coastline_path)
@@ -756,239 +1005,38 @@ class MetricsServiceImpl:
         buffer = 1
         
         #defining minimum and maximum of coordinates from the model output
-        xmin = model_polygon.bounds['minx'] - buffer
-        xmax = model_polygon.bounds['maxx'] + buffer
-        ymin = model_polygon.bounds['miny'] - buffer
-        ymax = model_polygon.bounds['maxy'] + buffer
+        xmin, ymin, xmax, ymax = model_polygon.total_bounds
+        xmin, ymin = xmin - buffer, ymin - buffer
+        xmax, ymax = xmax + buffer, ymax + buffer
 
         # Cropping to a smaller area
         coastline = coastline.cx[xmin:xmax, ymin:ymax]
         
         # Cropping the selected linestrings to the same bounding box
-        coastline = gpd.GeoDataFrame(geometry=coastline.clip_by_rect(xmin.values.max(),ymin.values.max(),
-                                        xmax.values.max(),ymax.values.max()))
+        coastline = gpd.GeoDataFrame(geometry=coastline.clip_by_rect(xmin,ymin,xmax,ymax))
         
         # RETAIN ONLY THE OIL ON WATER SURFACE, REMOVING LAND OVERLAY
         model_polygon = model_polygon.overlay(coastline, how='difference')
 
         model_polygon.to_file(output_folder + 'model_polygon.shp')
-        
-        # Create the intersection between model and observed oil slick
-        # overlay_shp = model_polygon.overlay(observation,how='intersection')
-        
-        # Calculates the metric (percentage)
-        # overlay_value = (overlay_shp.area / observation.area)
-
-        fname = os.path.join(self.path_controller_instance.get_MEDSLIK_OUT_DIR(), "spill_properties.nc")
-
-        # Set the spatial resolution for the verification grid (in km)
-        verif_grid_resolution = .15
-
-        # Set mapping projection
-        crs = "+proj=merc +lon_0=0 +x_0=0 +y_0=0 +a=6371007.181 +b=6371007.181 +units=m +no_defs"
-
-        # Calculate grid resolution in degrees
-        grid_resolution = np.longdouble(verif_grid_resolution)/110.
-
-        xp_identifier = self.path_controller_instance.get_sim_str() + '_' + '%02d' % (time_index) + 'h_'
-
-        """
-        Filter out beached, dispersed, sunk and unreleased parcels
-        lons_f = longitude coordinates of each oil parcel
-        lats_f = latitude coordinates of each oil parcel    
-        surface_volumes = total volumes (evaporative and non evaporative) for each parcel found on the surface
-        """
-        lons_f,lats_f,surface_volumes = self.get_surface_parcels_service_impl(fname,time_index)
-
-        # Create dataframe with the location and volume of surface parcels
-        df_gpan = pd.DataFrame({"lat":lats_f,
-                    "lon":lons_f,
-                    "vol":surface_volumes})
-                    
-        parcels_gdf = gpd.GeoDataFrame(df_gpan, 
-                    geometry=gpd.points_from_xy(df_gpan.lon, df_gpan.lat),crs=crs).set_crs('EPSG:4326',allow_override=True)
-        
-        # remove useless variables
-        parcels_gdf = parcels_gdf.drop(columns=['lon', 'lat'])
-                    
-        # load satellite detection shapefile
-        observation_df = gpd.read_file(observation_path)
-
-        observation_gdf = gpd.GeoDataFrame(observation_df[['geometry']]).set_crs('EPSG:4326',allow_override=True)
-
-        """
-        Generate comparison grid
-        comparison grid is a common grid covering observed and modelled spills
-        the grid resolution has been set, for now, at 150m S
-        """
-        # first, getting observation bounds
-        obs_bounds = observation_gdf.bounds
-
-        lonmin=np.min(lons_f)
-        latmin=np.min(lats_f)
-        lonmax=np.max(lons_f)
-        latmax=np.max(lats_f)
-        
-        if obs_bounds.minx[0] < lonmin:
-            lonmin=obs_bounds.minx[0]
-        if obs_bounds.maxx[0] > lonmax:
-            lonmax=obs_bounds.maxx[0]
-        if obs_bounds.miny[0] < latmin:
-            latmin=obs_bounds.miny[0]
-        if obs_bounds.maxy[0] > latmax:
-            latmax=obs_bounds.maxy[0]
-        
-        # create grid polygon consisting of multiple polygons describing squared grid cells    
-        output_frame = self.make_poly_grid_service_impl(lonmin,lonmax,latmin,latmax,grid_resolution,crs)
-
-        # (AUGUSTO SEPP ----- MODIFIED)
-        output_frame.set_crs('EPSG:4326',allow_override=True)
 
-        """
-        Create numpy-compatible grid 
-        by first getting the central coordinates of each grid cell
-        """
-        #grid_centroid = np.asarray(output_frame['geometry'].centroid) 
-        grid_centroid = output_frame['geometry'].to_crs(crs).centroid.to_crs(output_frame.crs)
-
-        """
-        Then running through grid points (indices) and creating an output matrix "event_set"
-        containing:
-        column 0: cell index
-        column 1: longitude coordinate of grid cell centroid
-        column 2: latitude coordinate of grid cell centroid  
-        column 3: simulated oil presence/absence
-        column 4: observed oil presence/absence
-        column 5: intersection between simulated and observed oil
-        """
-        counter=0
-        event_set=np.zeros((len(grid_centroid),6))*np.nan
-        
-        for ii in grid_centroid:
-            event_set[counter,0]=counter
-            event_set[counter,1]=ii.coords[0][0]
-            event_set[counter,2]=ii.coords[0][1]   
-            counter=counter+1 
-        # and save grid polygon
-        # output_frame.to_file('grid.shp')    
-        
-        # Group your parcels into visualization grid
-        gridded_parcels = gpd.sjoin(parcels_gdf,output_frame, how='left', op='within').set_crs('EPSG:4326',allow_override=True)
-
-        # Aggregate volumes to grid cells with dissolve 
-        gridded_parcels['cell_total_volume']=1
-        cell_total_volume = gridded_parcels.dissolve(by="index_right", aggfunc="count")   
-
-        # Place them into "cell" array with their associated coordinates   
-        output_frame.loc[cell_total_volume.index, 'cell_total_volume'] = cell_total_volume.cell_total_volume.values    
-        modelled_spill = output_frame[output_frame['cell_total_volume'] > 0]
-        modelled_spill.to_file(output_folder + 'out.shp')
-
-        for ii in range(0,len(modelled_spill)):
-            counter = modelled_spill.iloc[ii].name
-            event_set[counter,3]=modelled_spill.iloc[ii].cell_total_volume/modelled_spill.iloc[ii].cell_total_volume
-
-        # Fit satellite observation (spill shape) into visualization grid
-        gridded_observation = gpd.sjoin(left_df=output_frame, right_df=observation_gdf[['geometry']], how='inner').set_crs('EPSG:4326',allow_override=True)
-        for ii in range(0,len(gridded_observation)):
-            counter = gridded_observation.iloc[ii].name
-            event_set[counter,4]=1      
-        # gridded_observation.to_file(output_folder + 'observation.shp')
-            
-        # Find areas where model and observations coincide on oil detection
-        model_and_obs= gpd.sjoin(left_df=output_frame[output_frame['cell_total_volume'] > 0], right_df=observation_gdf[['geometry']], how='inner')
-        for ii in range(0,len(model_and_obs)):
-            counter = model_and_obs.iloc[ii].name
-            event_set[counter,5]=1
-
-        X,Y=np.meshgrid(np.unique(event_set[:,1]),np.unique(event_set[:,2]))
-        interp_model=NearestNDInterpolator(list(zip(event_set[:,1],event_set[:,2])),event_set[:,3])
-        interp_observation=NearestNDInterpolator(list(zip(event_set[:,1],event_set[:,2])),event_set[:,4])
-        # interp_intersection=NearestNDInterpolator(list(zip(event_set[:,1],event_set[:,2])),event_set[:,5])
-        
-        array_model = interp_model(X, Y)
-        array_observation = interp_observation(X, Y)   
-        # array_intersection = interp_intersection(X, Y)    
-        
-        array_model[np.isnan(array_model)] = 0
-        array_observation[np.isnan(array_observation)] = 0
-
-        array_union = array_model+2*array_observation
-        array_union[array_union==0]=np.nan
-
-        # Create the intersection between model and observed oil slick
-        overlay_shp = modelled_spill.overlay(observation, how='intersection')
-        print("overlay_shp:", overlay_shp[0])
-
-        # Calculates the metric (percentage)
-        overlay_value = (overlay_shp.area / observation.area)
-        print("overlay_value:", overlay_value)
-
-        self.plt_result(lonmin, latmin, lonmax, latmax, X, Y, array_union, xp_identifier, output_folder, time_index, overlay_value[0], values)
-        
-        return np.round(overlay_value[0], 2)
-    
-    def compute_multi_overlay_service_impl(self, values):
+    def compute_multi_overlay_service_impl(self, values, write_artifacts=True):
 
         """
-        Computes and processes multiple overlays based on the provided values.
+        Computes the overlay metric (%) between the chosen observation and the Medslik-II output.
+        The value is the intersect area from model and observation divided by the observation area.
 
         Parameters:
             values (list) : 
                 List of numerical values to be used in the computation of overlays.
+            write_artifacts (bool) :
+                If False, only the metric is computed and no file is written in the detection directory.
 
         Returns:
-            final_overlay (list) : 
-                A list containing the results of the computed overlays. Each element
-                in the list corresponds to a processed overlay based on the input values.
+            overlay (float) : 
+                The overlay value.
         """
-
-        # Get a list of observation folders
-        # list_of_obs = glob.glob(self.path_controller_instance.get_OBS() + self.path_controller_instance.get_DAYS_GROUP())
-		
-        # Get simulation length and date
-        # sim_lenght = self.mdk2_sim_extent_instance.get_sim_lenght()
-
-        yy = self.mdk2_sim_date_instance.get_year()
-        mm = self.mdk2_sim_date_instance.get_month()
-        dd = self.mdk2_sim_date_instance.get_day()
-        hh = self.mdk2_sim_date_instance.get_hour()
-        mn = self.mdk2_sim_date_instance.get_minutes()
-
-        # sim_date = self.get_sim_date_service_impl(yy, mm, dd, hh)
-
-        model_path = os.path.join(self.path_controller_instance.get_MEDSLIK_OUT_DIR(), "spill_properties.nc")
-
-        # overlay_value_list = []
-
-        # obs = 0
-        # for slick_folder in list_of_obs:
-            
-            # Extract slick ID from the folder path
-            # null, slick_id = os.path.split(slick_folder)
-            
-            # slick_date = self.get_slick_date_service_impl(slick_id)
-
-            # Check if the difference between slick date and simulation date is within simulation length
-            # if (slick_date-sim_date) < float(sim_lenght)/24:
-
-        # Create a detection directory for each observation
-        self.path_controller_instance.create_detection_dir(f"20{yy}{mm}{dd}_{hh}{mn}")
-                
-        # Compute overlay for the current observation
-        overlay = self.metric_overlay_service_impl(self.path_controller_instance.get_GSHHS_DATA(), os.environ.get('OBSPATH').split(":")[1], model_path, self.path_controller_instance.get_detection_dir(f"20{yy}{mm}{dd}_{hh}{mn}"), values)
-
-        # overlay_value_list.append(overlay)
-
-        # obs += 1
-        
-        # Get the maximum overlay value
-        # final_overlay = max(overlay_value_list)
-        # final_overlay = overlay_value_list[-1]
-        # print(final_overlay)
-    
-        # return final_overlay
-        return overlay
+        return self.compute_metrics_service_impl(values, write_artifacts, EvalMetric.OVERLAY.value)[EvalMetric.OVERLAY.value]
 
     def compute_centroid_service_impl(self, shapefile_path, per_feature=False):
 
@@ -1003,6 +1051,8 @@ class MetricsServiceImpl:
         Returns:
             GeoSeries o Point: Il centroide come GeoSeries (per_feature=True) o Point (per_feature=False).
         """
+        import geopandas as gpd
+
         # Carica lo shapefile
         try:
             shp = gpd.read_file(shapefile_path)
@@ -1024,206 +1074,34 @@ class MetricsServiceImpl:
             print(centroide_complessivo)
             return centroide_complessivo
         
-    def compute_centroid_distance_service_impl(self, simulation_folder, observation_shp, output_folder, values):
-
+    def compute_multi_centroid_distance_service_impl(self, values, write_artifacts=True):
         """
-        Plotta due shapefile con i rispettivi centroidi, una linea che rappresenta la distanza tra di essi
-        e l'area di overlap tra i due shapefile.
+        Computes the centroid skill score (CSS): the distance between the centroids of the observed
+        and modelled spills, with opposite sign so that it can be maximized.
 
         Args:
-            shapefile1_path (str): Percorso al primo file shapefile (.shp).
-            shapefile2_path (str): Percorso al secondo file shapefile (.shp).
-        """
+            values (list): The simulation parameters, reported in the plots.
+            write_artifacts (bool): If False, only the metric is computed and no file is written in the detection directory.
 
-         # Set the spatial resolution for the verification grid (in km)
-        verif_grid_resolution = .15
-
-        # Set mapping projection
-        crs = "+proj=merc +lon_0=0 +x_0=0 +y_0=0 +a=6371007.181 +b=6371007.181 +units=m +no_defs"
-
-        # Calculate grid resolution in degrees
-        grid_resolution = np.longdouble(verif_grid_resolution)/110.
-
-        # Construct the file path to the spill properties NetCDF file
-        fname = simulation_folder + '/spill_properties.nc'
-
-        # Obtain simulation date and observation date
-        # simulation_date = self.get_mdksim_date_service_impl()
-        # observation_date = self.get_obs_date_service_impl(observation_shp)
-
-        # Find the time index of the simulation data closest to the observation date
-        time_index = self.get_time_index(self.get_mdksim_date_service_impl(), self.get_obs_date_service_impl(observation_shp))
-
-        # Construct an identifier for the current simulation output based on simulation name and time index
-        # xp_identifier = self.mdk2_sim_extent_instance.get_SIM_NAME() + '_' + '%02d' % (time_index+1) + 'h_' 
-        xp_identifier = self.path_controller_instance.get_sim_str() + '_' + '%02d' % (time_index+1) + 'h_' 
-
-
-        # for time_index in output_timesteps:
-        # print(':::::::::: TIME_INDEX :: ' + str(time_index))
-        # print(xp_identifier)
-
-
-        """
-        Filter out beached, dispersed, sunk and unreleased parcels
-        lons_f = longitude coordinates of each oil parcel
-        lats_f = latitude coordinates of each oil parcel    
-        surface_volumes = total volumes (evaporative and non evaporative) for each parcel found on the surface
+        Returns:
+            float: The CSS value.
         """
-        lons_f,lats_f,surface_volumes = self.get_surface_parcels_service_impl(fname,time_index)
-
-        # Create dataframe with the location and volume of surface parcels
-        df_gpan = pd.DataFrame({"lat":lats_f,
-                    "lon":lons_f,
-                    "vol":surface_volumes})
-                    
-        # Create geodataframe from pandas dataframe              
-        # parcels_gdf = gpd.GeoDataFrame(df_gpan, 
-        #             geometry=gpd.points_from_xy(df_gpan.lon, df_gpan.lat),
-        #             crs=crs) 
-        parcels_gdf = gpd.GeoDataFrame(df_gpan, 
-                    geometry=gpd.points_from_xy(df_gpan.lon, df_gpan.lat),crs=crs).set_crs('EPSG:4326',allow_override=True)
-        parcels_gdf = parcels_gdf.drop(columns=['lon', 'lat']) # remove useless variables
-                    
-        # load satellite detection shapefile
-        observation_df = gpd.read_file(observation_shp)
-        # observation_gdf = gpd.GeoDataFrame(observation_df[['geometry']],crs=crs)
-
-        observation_gdf = gpd.GeoDataFrame(observation_df[['geometry']]).set_crs('EPSG:4326',allow_override=True)
+        return self.compute_metrics_service_impl(values, write_artifacts, EvalMetric.CSS.value)[EvalMetric.CSS.value]
 
-        
+    def compute_metric_service_impl(self, values, write_artifacts=True):
         """
-        Generate comparison grid
-        comparison grid is a common grid covering observed and modelled spills
-        the grid resolution has been set, for now, at 150m S
-        """
-        # first, getting observation bounds
-        obs_bounds = observation_gdf.bounds
+        Computes the evaluation metric chosen in the configuration file (eval_metric).
 
-        lonmin=np.min(lons_f)
-        latmin=np.min(lats_f)
-        lonmax=np.max(lons_f)
-        latmax=np.max(lats_f)
-        
-        if obs_bounds.minx[0] < lonmin:
-            lonmin=obs_bounds.minx[0]
-        if obs_bounds.maxx[0] > lonmax:
-            lonmax=obs_bounds.maxx[0]
-        if obs_bounds.miny[0] < latmin:
-            latmin=obs_bounds.miny[0]
-        if obs_bounds.maxy[0] > latmax:
-            latmax=obs_bounds.maxy[0]
-        
-        # create grid polygon consisting of multiple polygons describing squared grid cells    
-        output_frame = self.make_poly_grid_service_impl(lonmin,lonmax,latmin,latmax,grid_resolution,crs)
-
-        # (AUGUSTO SEPP ----- MODIFIED)
-        output_frame.set_crs('EPSG:4326',allow_override=True)
+        Args:
+            values (list): The simulation parameters, reported in the plots.
+            write_artifacts (bool): If False, only the metric is computed and no file is written in the detection directory.
 
-        """
-        Create numpy-compatible grid 
-        by first getting the central coordinates of each grid cell
-        """
-        #grid_centroid = np.asarray(output_frame['geometry'].centroid) 
-        grid_centroid = output_frame['geometry'].to_crs(crs).centroid.to_crs(output_frame.crs)
+        Returns:
+            float: The metric value.
 
+        Raises:
+            WrongConfigurationException: If the evaluation metric is not recognized.
         """
-        Then running through grid points (indices) and creating an output matrix "event_set"
-        containing:
-        column 0: cell index
-        column 1: longitude coordinate of grid cell centroid
-        column 2: latitude coordinate of grid cell centroid  
-        column 3: simulated oil presence/absence
-        column 4: observed oil presence/absence
-        column 5: intersection between simulated and observed oil
-        """
-        counter=0
-        event_set=np.zeros((len(grid_centroid),6))*np.nan
-        
-        for ii in grid_centroid:
-            event_set[counter,0]=counter
-            event_set[counter,1]=ii.coords[0][0]
-            event_set[counter,2]=ii.coords[0][1]   
-            counter=counter+1 
-        # and save grid polygon
-        # output_frame.to_file(output_folder + 'grid.shp')    
-        
-        # Group your parcels into visualization grid
-        gridded_parcels = gpd.sjoin(parcels_gdf,output_frame, how='left', op='within').set_crs('EPSG:4326',allow_override=True)
-
-        # Aggregate volumes to grid cells with dissolve 
-        gridded_parcels['cell_total_volume']=1
-        cell_total_volume = gridded_parcels.dissolve(by="index_right", aggfunc="count")   
-
-        # Place them into "cell" array with their associated coordinates   
-        output_frame.loc[cell_total_volume.index, 'cell_total_volume'] = cell_total_volume.cell_total_volume.values    
-        modelled_spill = output_frame[output_frame['cell_total_volume'] > 0]
-        modelled_spill.to_file(output_folder + 'out.shp')
-        
-        for ii in range(0,len(modelled_spill)):
-            counter = modelled_spill.iloc[ii].name
-            event_set[counter,3]=modelled_spill.iloc[ii].cell_total_volume/modelled_spill.iloc[ii].cell_total_volume
-
-        # Fit satellite observation (spill shape) into visualization grid
-        gridded_observation = gpd.sjoin(left_df=output_frame, right_df=observation_gdf[['geometry']], how='inner').set_crs('EPSG:4326',allow_override=True)
-        for ii in range(0,len(gridded_observation)):
-            counter = gridded_observation.iloc[ii].name
-            event_set[counter,4]=1      
-        # gridded_observation.to_file(output_folder + 'observation.shp')
-            
-        # Find areas where model and observations coincide on oil detection
-        model_and_obs= gpd.sjoin(left_df=output_frame[output_frame['cell_total_volume'] > 0], right_df=observation_gdf[['geometry']], how='inner')
-        for ii in range(0,len(model_and_obs)):
-            counter = model_and_obs.iloc[ii].name
-            event_set[counter,5]=1
-
-        X,Y=np.meshgrid(np.unique(event_set[:,1]),np.unique(event_set[:,2]))
-        interp_model=NearestNDInterpolator(list(zip(event_set[:,1],event_set[:,2])),event_set[:,3])
-        interp_observation=NearestNDInterpolator(list(zip(event_set[:,1],event_set[:,2])),event_set[:,4])
-        # interp_intersection=NearestNDInterpolator(list(zip(event_set[:,1],event_set[:,2])),event_set[:,5])
-        
-        array_model = interp_model(X, Y)
-        array_observation = interp_observation(X, Y)   
-        # array_intersection = interp_intersection(X, Y)    
-        
-        array_model[np.isnan(array_model)] = 0
-        array_observation[np.isnan(array_observation)] = 0
+        metric_name = self.get_metric_name_service_impl()
 
-        array_union = array_model+2*array_observation
-        array_union[array_union==0]=np.nan
-        
-        # Set search window sizes  (in number of pixes)
-        horizontal_scales = range(1,150,2) # horizontal_scales = range(1,11,2) per aumentare la scala
-        fss_output=np.zeros((len(horizontal_scales),2))
-        
-        cc = 0
-        for hh in horizontal_scales:         
-            fss_= fss(array_model, array_observation, 1, hh)
-            fss_output[cc,0]=hh
-            fss_output[cc,1]=fss_
-            cc=cc+1
-        
-        # Calcola i centroidi complessivi per entrambi gli shapefile
-        centroide1 = self.compute_centroid_service_impl(observation_shp, per_feature=False)
-        centroide2 = self.compute_centroid_service_impl(output_folder + 'out.shp', per_feature=False)
-        
-        # Calcola la distanza tra i due centroidi
-        distanza = centroide1.distance(centroide2)
-
-        self.plt_result(lonmin, latmin, lonmax, latmax, X, Y, array_union, xp_identifier, output_folder, time_index, distanza, values)
-
-        return distanza
-
-    def compute_multi_centroid_distance_service_impl(self, values):
-
-        yy = self.mdk2_sim_date_instance.get_year()
-        mm = self.mdk2_sim_date_instance.get_month()
-        dd = self.mdk2_sim_date_instance.get_day()
-        hh = self.mdk2_sim_date_instance.get_hour()
-        mn = self.mdk2_sim_date_instance.get_minutes()
-
-        self.path_controller_instance.create_detection_dir(f"20{yy}{mm}{dd}_{hh}{mn}")
-
-        distance = self.compute_centroid_distance_service_impl(self.path_controller_instance.get_MEDSLIK_OUT_DIR(), os.environ.get('OBSPATH').split(":")[1], self.path_controller_instance.get_detection_dir(f"20{yy}{mm}{dd}_{hh}{mn}"), values)
-    
-        return -(np.round(distance, 4))
\ No newline at end of file
+        return self.compute_metrics_service_impl(values, write_artifacts, metric_name)[metric_name]
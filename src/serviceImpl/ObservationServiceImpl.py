@@ -0,0 +1,237 @@
+# ---------------------------------------------------------
+# Bayesian Optimization Workflow for Medslik-II Simulations
+# Copyright (c) 2023-2024 CMCC Foundation
+# Licensed under The MIT License [see LICENSE for details]
+# Written by Marco Mariano De Carlo, Gabriele Accarino
+# ---------------------------------------------------------
+
+import os
+import glob
+import hashlib
+import numpy as np
+
+from src.domain.ComparisonGrid import ComparisonGrid
+from src.domain.ComparisonRaster import ComparisonRaster
+from src.domain.Observation import Observation
+
+from src.service.GriddingService import GriddingService
+
+"""
+Observations already rasterized by this process, keyed by (path, grid resolution)
+"""
+_observations = {}
+
+class ObservationServiceImpl:
+
+    def __init__(self):
+        """ Initializes useful instances for method development """
+
+        self.gridding_service_instance = GriddingService()
+
+    def get_observation_path_impl(self):
+        """
+        Returns the path of the satellite observation to compare with (OBSPATH environment variable).
+        """
+        return os.environ.get('OBSPATH').split(":")[1]
+
+    def get_observation_files_impl(self, observation_path):
+        """
+        Lists the files making up an observation: the content of its folder, or the shapefile with its sidecar files.
+
+        Args:
+            observation_path (str): The path to the observation folder or shapefile.
+
+        Returns:
+            list: The sorted list of file paths.
+        """
+        if os.path.isdir(observation_path):
+            files = [os.path.join(observation_path, f) for f in os.listdir(observation_path)]
+        else:
+            files = glob.glob(os.path.splitext(observation_path)[0] + '.*')
+
+        # Cache files stored next to the observation are not part of it
+        return sorted(f for f in files if os.path.isfile(f) and not os.path.basename(f).startswith('obs_raster_'))
+
+    def hash_observation_impl(self, observation_path):
+        """
+        Computes the SHA-256 hash of the observation content.
+
+        Args:
+            observation_path (str): The path to the observation folder or shapefile.
+
+        Returns:
+            str: The hexadecimal digest.
+        """
+        digest = hashlib.sha256()
+
+        for file_path in self.get_observation_files_impl(observation_path):
+            digest.update(os.path.basename(file_path).encode())
+            with open(file_path, 'rb') as f:
+                for chunk in iter(lambda: f.read(1 << 20), b''):
+                    digest.update(chunk)
+
+        return digest.hexdigest()
+
+    def get_cache_file_impl(self, observation_path, content_hash, grid_resolution):
+        """
+        Returns the path of the rasterized observation, stored next to the observation itself.
+
+        Args:
+            observation_path (str): The path to the observation folder or shapefile.
+            content_hash (str): The hash of the observation content.
+            grid_resolution (float): The size of the grid cells in degrees.
+
+        Returns:
+            str: The path of the .npz cache file.
+        """
+        key = hashlib.sha256(f"{content_hash}:{float(grid_resolution)!r}".encode()).hexdigest()[:16]
+
+        folder = observation_path if os.path.isdir(observation_path) else os.path.dirname(observation_path)
+
+        return os.path.join(folder, f"obs_raster_{key}.npz")
+
+    def read_geometries_impl(self, observation_path):
+        """
+        Reads the observation shapefile.
+
+        Args:
+            observation_path (str): The path to the observation folder or shapefile.
+
+        Returns:
+            GeoDataFrame: The observation geometries in EPSG:4326.
+        """
+        import geopandas as gpd
+
+        observation_df = gpd.read_file(observation_path)
+
+        return gpd.GeoDataFrame(observation_df[['geometry']]).set_crs('EPSG:4326',allow_override=True)
+
+    def rasterize_observation_impl(self, observation_path, content_hash, grid_resolution):
+        """
+        Rasterizes the observation on a lattice anchored on its lower-left corner.
+
+        Args:
+            observation_path (str): The path to the observation folder or shapefile.
+            content_hash (str): The hash of the observation content.
+            grid_resolution (float): The size of the grid cells in degrees.
+
+        Returns:
+            Observation: The rasterized observation, holding its geometries.
+        """
+        observation_gdf = self.read_geometries_impl(observation_path)
+
+        minx, miny, maxx, maxy = observation_gdf.total_bounds
+
+        grid = self.gridding_service_instance.make_comparison_grid(minx, maxx, miny, maxy, grid_resolution)
+        mask = self.gridding_service_instance.rasterize_geometries(grid, observation_gdf.geometry)
+
+        # The extent of the comparison grid is driven by the bounds of the first feature
+        bounds = tuple(float(b) for b in observation_gdf.bounds.iloc[0])
+
+        centroid = observation_gdf.unary_union.centroid
+
+        return Observation(observation_path, content_hash, ComparisonRaster(grid, {'observation': mask}),
+                           bounds, (centroid.x, centroid.y), observation_gdf)
+
+    def save_observation_impl(self, observation, cache_file):
+        """
+        Persists the rasterized observation, writing a temporary file first so that readers never see partial files.
+
+        Args:
+            observation (Observation): The rasterized observation.
+            cache_file (str): The path of the .npz cache file.
+        """
+        raster = observation.get_raster
+        tmp_file = f"{cache_file}.{os.getpid()}.tmp.npz"
+
+        np.savez_compressed(tmp_file,
+                            mask=raster.get_layer('observation'),
+                            origin=np.asarray(raster.get_origin, dtype=np.float64),
+                            resolution=np.float64(raster.get_resolution),
+                            bounds=np.asarray(observation.get_bounds, dtype=np.float64),
+                            centroid=np.asarray(observation.get_centroid, dtype=np.float64),
+                            content_hash=np.asarray(observation.get_content_hash))
+        os.replace(tmp_file, cache_file)
+
+    def load_observation_impl(self, observation_path, content_hash, cache_file):
+        """
+        Loads a rasterized observation previously saved with save_observation_impl.
+
+        Args:
+            observation_path (str): The path to the observation folder or shapefile.
+            content_hash (str): The hash of the observation content.
+            cache_file (str): The path of the .npz cache file.
+
+        Returns:
+            Observation: The rasterized observation (geometries are read only when requested), or None
+                         if the file does not match the observation content.
+        """
+        with np.load(cache_file) as data:
+            if str(data['content_hash']) != content_hash:
+                return None
+
+            mask = data['mask']
+            origin = data['origin']
+            resolution = float(data['resolution'])
+            bounds = tuple(data['bounds'].tolist())
+            centroid = tuple(data['centroid'].tolist())
+
+        grid = ComparisonGrid(float(origin[0]), float(origin[1]), resolution, mask.shape[1], mask.shape[0])
+
+        return Observation(observation_path, content_hash, ComparisonRaster(grid, {'observation': mask}), bounds, centroid)
+
+    def get_observation_impl(self, observation_path, grid_resolution):
+        """
+        Returns the rasterized observation at the given resolution.
+
+        The raster is computed once per observation content and resolution: it is kept in memory for
+        the following evaluations and stored next to the observation for later campaigns.
+
+        Args:
+            observation_path (str): The path to the observation folder or shapefile.
+            grid_resolution (float): The size of the grid cells in degrees.
+
+        Returns:
+            Observation: The rasterized observation.
+        """
+        memo_key = (os.path.abspath(observation_path), float(grid_resolution))
+        signature = [(f, os.stat(f).st_mtime_ns, os.stat(f).st_size) for f in self.get_observation_files_impl(observation_path)]
+
+        if memo_key in _observations and _observations[memo_key][0] == signature:
+            return _observations[memo_key][1]
+
+        content_hash = self.hash_observation_impl(observation_path)
+        cache_file = self.get_cache_file_impl(observation_path, content_hash, grid_resolution)
+
+        observation = None
+        if os.path.isfile(cache_file):
+            try:
+                observation = self.load_observation_impl(observation_path, content_hash, cache_file)
+            except Exception as e:
+                print(f"Unable to load the rasterized observation {cache_file}: {e}")
+
+        if observation is None:
+            observation = self.rasterize_observation_impl(observation_path, content_hash, grid_resolution)
+            try:
+                self.save_observation_impl(observation, cache_file)
+            except OSError as e:
+                print(f"Unable to store the rasterized observation next to {observation_path}: {e}")
+
+        _observations[memo_key] = (signature, observation)
+
+        return observation
+
+    def get_observation_geometries_impl(self, observation):
+        """
+        Returns the geometries of an observation, reading the shapefile only the first time they are requested.
+
+        Args:
+            observation (Observation): The rasterized observation.
+
+        Returns:
+            GeoDataFrame: The observation geometries in EPSG:4326.
+        """
+        if observation.get_geometries is None:
+            observation.set_geometries = self.read_geometries_impl(observation.get_path)
+
+        return observation.get_geometries
@@ -0,0 +1,202 @@
+# ---------------------------------------------------------
+# Bayesian Optimization Workflow for Medslik-II Simulations
+# Copyright (c) 2023-2024 CMCC Foundation
+# Licensed under The MIT License [see LICENSE for details]
+# Written by Marco Mariano De Carlo, Gabriele Accarino
+# ---------------------------------------------------------
+
+import os
+import shutil
+import threading
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+
+from src.domain.RenderJob import RenderJob
+
+"""
+The jobs waiting to be submitted belong to the thread that queued them, so that an evaluation only submits
+its own plots; the background pool and the jobs submitted to it are shared by every service instance of the process
+"""
+_local = threading.local()
+_futures = []
+_executor = None
+_lock = threading.Lock()
+
+"""
+Render functions, executed by the worker process (defined at module level to be sent to it)
+"""
+
+def render_spill_map(job: RenderJob):
+    """
+    Plots simulated and observed oil on a map and saves it as PNG.
+
+    Args:
+        job (RenderJob): The job, whose data holds the map extent (lonmin, latmin, lonmax, latmax),
+                         the cell centres (X, Y), the union array, the title and the description.
+    """
+    # Plotting libraries are only needed by the worker process
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    from matplotlib import colors as c
+    from matplotlib.patches import Patch
+    from mpl_toolkits.basemap import Basemap
+
+    data = job.get_data
+    lonmin, latmin, lonmax, latmax = data['lonmin'], data['latmin'], data['lonmax'], data['latmax']
+
+    fig, ax = plt.subplots(figsize=(10, 5))
+
+    # Define labels for the legend
+    labels = {'Yellow': 'MDK-II simulation', 'Blue': 'Observation', 'Magenta': 'Overlap between MDK-II sim and Observation'}
+
+    # Define a colormap for the plot
+    cMap = c.ListedColormap(['y','b','m'])
+
+    # Create a Basemap object for plotting geographical data
+    m = Basemap(llcrnrlon=lonmin,llcrnrlat=latmin,\
+                urcrnrlon=lonmax,urcrnrlat=latmax,\
+                rsphere=(6378137.00,6356752.3142),\
+                resolution='i',projection='merc',\
+                lat_0=(latmax + latmin)/2.,\
+                lon_0=(lonmax + lonmin)/2.,epsg=4326)
+
+    # Convert grid coordinates to map coordinates
+    x_map,y_map=m(data['X'],data['Y'])
+
+    # Plot the array on the map using a specified colormap
+    m.pcolor(x_map,y_map,data['array_union'],cmap=cMap)
+
+    # Draw coastlines on the map
+    m.drawcoastlines()
+
+    # Fill continents with a specified alpha value
+    m.fillcontinents(alpha=1,zorder=3)
+
+    # Draw meridians and parallels on the map with specified intervals and labels
+    m.drawmeridians(np.arange(lonmin,lonmax,(lonmax-lonmin)/4.), labels=[0,0,0,1],color='white',linewidth=0.03, fontsize = 5)
+    m.drawparallels(np.arange(latmin,latmax,(latmax-latmin)/4.),labels=[1,0,0,0],color='white',linewidth=0.03, fontsize = 5)
+
+    # Legend
+    legend_elements = [Patch(facecolor=color, edgecolor='None', label=label) for color, label in labels.items()]
+    legend = ax.legend(handles=legend_elements, loc='upper center', fontsize=5, bbox_to_anchor=(0.5, -0.05), ncol=3, edgecolor='None')
+    plt.setp(legend.get_title(), fontsize='large', fontname='sans-serif')
+
+    # Add description
+    ax.text(0.5, -0.10, data['description'], transform=ax.transAxes, fontsize=7, ha='center', va='top', bbox=dict(facecolor='white', edgecolor='none'))
+
+    # Add title
+    plt.title(data['title'], fontweight='bold', fontname='sans-serif', fontsize=10, color='black', pad=15)
+
+    # Save the plot as a PNG image file
+    plt.savefig(job.get_output_file,dpi=600,bbox_inches='tight')
+
+    # Close all figures
+    plt.close('all')
+
+    _copy_output(job)
+
+def render_fss_curve(job: RenderJob):
+    """
+    Plots the FSS as a function of the window size and saves it as PNG.
+
+    Args:
+        job (RenderJob): The job, whose data holds the window sizes (x) and the FSS values (y).
+    """
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+
+    data = job.get_data
+
+    plt.figure()
+    plt.plot(data['x'],data['y'],'.-')
+    plt.savefig(job.get_output_file,dpi=600,bbox_inches='tight')
+    plt.close('all')
+
+    _copy_output(job)
+
+def _copy_output(job: RenderJob):
+    """ Copies the rendered file into the folders mirroring its detection directory (e.g. best_detections) """
+    for folder in job.get_copy_folders:
+        destination = os.path.join(folder, os.path.basename(os.path.dirname(job.get_output_file)))
+        os.makedirs(destination, exist_ok=True)
+        shutil.copy2(job.get_output_file, destination)
+
+class RenderServiceImpl:
+
+    def _get_pending(self):
+        """ Returns the jobs queued by the calling thread """
+        if not hasattr(_local, 'pending'):
+            _local.pending = []
+
+        return _local.pending
+
+    def _get_executor(self):
+        """ Starts the background pool on first use (called holding the lock). A single worker renders the jobs
+        in submission order, so that a file is never written by two jobs at the same time """
+        global _executor
+
+        if _executor is None:
+            _executor = ProcessPoolExecutor(max_workers=1)
+
+        return _executor
+
+    def _collect_done(self):
+        """ Forgets the completed jobs, reporting their failures (called holding the lock) """
+        for future in [f for f in _futures if f.done()]:
+            _futures.remove(future)
+            if future.exception() is not None:
+                print(f"Error while rendering: {future.exception()}")
+
+    def add_job_impl(self, render_function, job):
+        """
+        Queues a plot, to be rendered once submitted.
+
+        Args:
+            render_function (callable): A module-level render function (render_spill_map or render_fss_curve).
+            job (RenderJob): The job to be rendered.
+        """
+        self._get_pending().append((render_function, job))
+
+    def submit_jobs_impl(self, copy_folders=None):
+        """
+        Sends the plots queued by the calling thread to the background pool and returns immediately.
+
+        Args:
+            copy_folders (list, optional): Folders mirroring the detection directories (e.g. best_detections)
+                                           where the rendered files are copied as well.
+        """
+        pending = self._get_pending()
+
+        while pending:
+            render_function, job = pending.pop(0)
+            job.set_copy_folders = list(copy_folders or [])
+
+            try:
+                with _lock:
+                    self._collect_done()
+                    _futures.append(self._get_executor().submit(render_function, job))
+            except Exception as e:
+                # Render in this process when the pool is not available
+                print(f"Background rendering not available, rendering {job.get_output_file}: {e}")
+                render_function(job)
+
+    def wait_jobs_impl(self):
+        """
+        Waits for every submitted plot to be rendered and stops the background pool.
+        """
+        global _executor
+
+        with _lock:
+            futures = list(_futures)
+
+        for future in futures:
+            future.exception()
+
+        with _lock:
+            self._collect_done()
+
+            if _executor is not None:
+                _executor.shutdown(wait=True)
+                _executor = None
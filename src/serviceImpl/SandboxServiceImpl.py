@@ -0,0 +1,156 @@
+# ---------------------------------------------------------
+# Bayesian Optimization Workflow for Medslik-II Simulations
+# Copyright (c) 2023-2024 CMCC Foundation
+# Licensed under The MIT License [see LICENSE for details]
+# Written by Marco Mariano De Carlo, Gabriele Accarino
+# ---------------------------------------------------------
+
+import os
+import queue
+import shutil
+import threading
+from contextlib import contextmanager
+
+from src.domain.Sandbox import Sandbox
+from src.service.PathService import PathService
+
+"""
+Sandboxes provisioned by this process, the free ones waiting in a queue, and the sandbox leased by each thread
+"""
+_sandboxes = []
+_free_sandboxes = queue.Queue()
+_current = threading.local()
+
+class SandboxServiceImpl:
+
+    """
+    Layout of the sandboxes, mirroring MEDSLIK_FOLDER so that the relative paths used by the model scripts still resolve.
+    In the model folder every entry is linked but RUN and OUT; in RUN the files are copied, executables and
+    folders are linked, and the folders written by the model are created empty
+    """
+    SANDBOX_FOLDER = 'sandboxes'
+    MODEL_FOLDER = 'MEDSLIK_II_3.01'
+    ISOLATED_FOLDERS = ('RUN', 'OUT')
+    PRIVATE_RUN_FOLDERS = ('TEMP',)
+
+    def __init__(self):
+        """ Initializes useful instances for method development """
+
+        self.path_service_instance = PathService()
+
+    def get_sandbox_root_impl(self, index):
+        return os.path.join(self.path_service_instance.get_MEDSLIK_FOLDER_path(), self.SANDBOX_FOLDER, f"worker_{index:02d}")
+
+    def _link(self, src, dst):
+        """ Links src into dst, replacing a previous link """
+        if os.path.islink(dst):
+            os.unlink(dst)
+        if not os.path.exists(dst):
+            os.symlink(os.path.abspath(src), dst)
+
+    def _populate_run_folder(self, src_run, dst_run):
+        """
+        Fills the RUN folder of a sandbox: configuration files and scripts are copied, as the model writes them,
+        while executables and input folders are shared through links.
+        """
+        os.makedirs(dst_run, exist_ok=True)
+
+        for name in os.listdir(src_run):
+            src, dst = os.path.join(src_run, name), os.path.join(dst_run, name)
+
+            if name in self.PRIVATE_RUN_FOLDERS and os.path.isdir(src):
+                os.makedirs(dst, exist_ok=True)
+            elif os.path.isdir(src) or (os.access(src, os.X_OK) and not name.endswith('.sh')):
+                self._link(src, dst)
+            else:
+                shutil.copy2(src, dst)
+
+    def provision_impl(self, workers):
+        """
+        Provisions the isolated run directories used to run several simulations at the same time.
+
+        Each sandbox mirrors MEDSLIK_FOLDER under MEDSLIK_FOLDER/sandboxes/worker_<i>: its RUN folder has its own
+        configuration files and its OUT folder its own outputs, while the compiled model and the input data
+        are shared through links. Sandboxes are refreshed on every call, so the model must be compiled first.
+
+        Args:
+            workers (int): The number of sandboxes.
+
+        Returns:
+            list: The provisioned sandboxes.
+        """
+        medslik_folder = self.path_service_instance.get_MEDSLIK_FOLDER_path()
+        model_folder = os.path.join(medslik_folder, self.MODEL_FOLDER)
+
+        # Leases are never handed out while provisioning
+        while not _free_sandboxes.empty():
+            _free_sandboxes.get_nowait()
+        _sandboxes.clear()
+
+        for index in range(workers):
+            root = self.get_sandbox_root_impl(index)
+            os.makedirs(os.path.join(root, self.MODEL_FOLDER), exist_ok=True)
+
+            for name in os.listdir(medslik_folder):
+                if name not in (self.SANDBOX_FOLDER, self.MODEL_FOLDER):
+                    self._link(os.path.join(medslik_folder, name), os.path.join(root, name))
+
+            for name in os.listdir(model_folder):
+                if name not in self.ISOLATED_FOLDERS:
+                    self._link(os.path.join(model_folder, name), os.path.join(root, self.MODEL_FOLDER, name))
+
+            run_folder = os.path.join(root, self.MODEL_FOLDER, 'RUN')
+            self._populate_run_folder(self.path_service_instance.get_MEDSLIK_RUN_path(), run_folder)
+
+            out_folder = os.path.join(root, self.MODEL_FOLDER, 'OUT')
+            os.makedirs(out_folder, exist_ok=True)
+
+            sandbox = Sandbox(index, root, run_folder,
+                              os.path.join(run_folder, os.path.basename(self.path_service_instance.get_CONFIG1_path())),
+                              os.path.join(run_folder, os.path.basename(self.path_service_instance.get_CONFIG2_path())),
+                              out_folder)
+
+            _sandboxes.append(sandbox)
+            _free_sandboxes.put(sandbox)
+
+        return list(_sandboxes)
+
+    def get_sandboxes_impl(self):
+        return list(_sandboxes)
+
+    def get_current_sandbox_impl(self):
+        """
+        Returns the sandbox leased by the calling thread.
+
+        Returns:
+            Sandbox: The leased sandbox, or None outside of a lease.
+        """
+        return getattr(_current, 'sandbox', None)
+
+    @contextmanager
+    def lease_impl(self, timeout=None):
+        """
+        Leases a free sandbox to the calling thread for the duration of a with block: the paths of the model
+        run (RUN folder, configuration files, OUT folder) resolve to the sandbox until the block ends.
+        Without provisioned sandboxes the shared run directory is used, as in a sequential optimization.
+
+        Args:
+            timeout (float, optional): The maximum time to wait for a free sandbox, in seconds.
+
+        Yields:
+            Sandbox: The leased sandbox, or None when no sandbox was provisioned.
+
+        Raises:
+            queue.Empty: If no sandbox is released within the timeout.
+        """
+        if not _sandboxes or self.get_current_sandbox_impl() is not None:
+            yield self.get_current_sandbox_impl()
+            return
+
+        sandbox = _free_sandboxes.get(timeout=timeout)
+        _current.sandbox = sandbox
+        try:
+            yield sandbox
+        finally:
+            _current.sandbox = None
+            _free_sandboxes.put(sandbox)
@@ -5,12 +5,11 @@
 # Written by Marco Mariano De Carlo, Gabriele Accarino
 # ---------------------------------------------------------
 
+import os
 from enum import Enum
 import numpy as np
 import typing as t
 
-from library.bayesian_optimization_core.bayes_opt.bayesian_optimization import BayesianOptimization
-
 from src.service.BayOptSetupService import BayOptSetupService
 from src.service.MDK2SimCoordsService import MDK2SimCoordsService
 from src.service.MDK2SimDateService import MDK2SimDateService
@@ -18,6 +17,9 @@ from src.service.MDK2SimExtentService import MDK2SimExtentService
 from src.service.MDK2SimParamsService import MDK2SimParamsService
 from src.service.ExecutionService import ExecutionService
 from src.service.MetricsService import MetricsService
+from src.service.RenderService import RenderService
+from src.service.SandboxService import SandboxService
+from src.serviceImpl.BayOptSetupServiceImpl import ArtifactPolicy, MetricSeries
 
 from src.controller.PathController import PathController
 from src.controller.ObjFunctionController import ObjFunctionController
@@ -42,6 +44,8 @@ class WorkflowServiceImpl:
         self.mdk2_sim_params_service_instance = MDK2SimParamsService()
         self.execution_service_instance = ExecutionService()
         self.metrics_service_instance = MetricsService()
+        self.render_service_instance = RenderService()
+        self.sandbox_service_instance = SandboxService()
         
         self.path_controller_instance = PathController()
         self.obj_function_controller_instance = ObjFunctionController()
@@ -75,12 +79,13 @@ class WorkflowServiceImpl:
             enum_values = {name: member.value for name, member in ExecutionType.__members__.items()}
             raise WrongConfigurationException(f"The specified value is not among the valid values of ExecutionType, the accepted modes are: {enum_values}")
         
-    def setup_service_impl(self, execution_type:int):
+    def setup_service_impl(self, execution_type:int, rebuild=False):
         """
         Sets up the workflow based on the specified execution type.
 
         Args:
             execution_type (int): The execution type to determine the workflow setup.
+            rebuild (bool): Whether MEDSLIK-II is compiled even if a cached build matches its sources.
 
         Raises:
             ValueError: If the execution type is not recognized.
@@ -112,7 +117,12 @@ class WorkflowServiceImpl:
             """
             compile MEDSLIK-II
             """
-            self.execution_service_instance.compile_model()
+            self.execution_service_instance.compile_model(rebuild)
+
+            """
+            rasterize the satellite observation once, before the simulations are evaluated
+            """
+            self.metrics_service_instance.prepare_observation_service()
 
             """
             Return the best result found by Bayesian Optimization
@@ -140,7 +150,12 @@ class WorkflowServiceImpl:
             """
             compile MEDSLIK-II
             """
-            self.execution_service_instance.compile_model()
+            self.execution_service_instance.compile_model(rebuild)
+
+            """
+            rasterize the satellite observation once, before the simulations are evaluated
+            """
+            self.metrics_service_instance.prepare_observation_service()
             
     def run_service_impl(self, execution_type:int, parameters_bound, random_state, verbose):
         """Runs the workflow based on the specified execution type.
@@ -173,21 +188,58 @@ class WorkflowServiceImpl:
             
             """
             Definition of the optimizer that performs the Bayesian Optimization
+            (scikit-learn is loaded only when an optimization is actually run).
+            Parameters are simulated with decimal_precision decimal places: the optimizer searches that lattice,
+            so that the point registered is the one simulated and no lattice node is simulated twice
             """
+            from library.bayesian_optimization_core.bayes_opt.bayesian_optimization import BayesianOptimization
+
+            decimal_precision = self.bay_opt_setup_service_instance.get_decimal_precision()
+
             optimizer = BayesianOptimization(
                 f=self.obj_function_controller_instance.objective_function,
                 pbounds=parameters_bound,
                 random_state=random_state,
-                verbose=verbose
+                verbose=verbose,
+                resolution={k: 10.**-int(decimal_precision) for k in parameters_bound},
+                init_design=self.bay_opt_setup_service_instance.get_init_design()
+            )
+
+            """
+            Refit schedule of the Gaussian process hyperparameters (0 disables a criterion): between refits,
+            new observations are appended with the current hyperparameters
+            """
+            optimizer.set_gp_params(
+                refit_every=self.bay_opt_setup_service_instance.get_gp_refit_every() or None,
+                refit_tolerance=self.bay_opt_setup_service_instance.get_gp_refit_tolerance() or None,
+                refit_interval=self.bay_opt_setup_service_instance.get_gp_refit_interval() or None,
+                n_jobs=self.bay_opt_setup_service_instance.get_gp_n_jobs()
             )
 
             """
             Launch the maximize function who try to find better parameters for the simulation
             """
             optimizer.probe(sim_params, lazy=True)
-            optimizer.maximize(init_points=init_points_val, n_iter=n_iter_val)
+
+            workers = self.bay_opt_setup_service_instance.get_workers()
+            if workers > 1:
+                """
+                With several workers, an isolated run directory is provisioned for each one, sharing the compiled model;
+                each sandbox that ends a simulation registers its result and runs a new suggestion at once,
+                without waiting for the other simulations
+                """
+                self.sandbox_service_instance.provision(workers)
+                optimizer.maximize_async(init_points=init_points_val, n_iter=n_iter_val, workers=workers)
+            else:
+                optimizer.maximize(init_points=init_points_val, n_iter=n_iter_val)
+
+            """
+            Wait for the plots still being rendered before cleaning up the detection directories
+            """
+            self.render_service_instance.wait_jobs()
             
             self.path_controller_instance.remove_old_detection_directories(self.path_controller_instance.get_sim_result_dir(), "detection_")
+            self.path_controller_instance.remove_old_detection_directories(os.path.join(self.path_controller_instance.get_sim_result_dir(), 'sandboxes'), "worker_")
             
         elif (self.execution_type == ExecutionType.MEDSLIK.value):
 
@@ -197,10 +249,20 @@ class WorkflowServiceImpl:
             Runs the MEDSLIK-II model
             """
             self.execution_service_instance.run_model()
-            if self.bay_opt_setup_service_instance.get_eval_metric() == "FSS":
-                metric = self.metrics_service_instance.compute_multi_fss_service(v_list)
-            elif self.bay_opt_setup_service_instance.get_eval_metric() == "overlay":
-                metric = self.metrics_service_instance.compute_multi_overlay_service(v_list)
-            elif self.bay_opt_setup_service_instance.get_eval_metric() == "CSS":
-                metric = self.metrics_service_instance.compute_multi_centroid_distance_service(v_list)
-            print(metric)
\ No newline at end of file
+
+            """
+            The single simulation is also the best one: its outputs are written unless disabled
+            """
+            write_artifacts = self.bay_opt_setup_service_instance.get_artifact_policy() != ArtifactPolicy.NONE.value
+            metric = self.metrics_service_instance.compute_metric_service(v_list, write_artifacts)
+            print(metric)
+
+            """
+            Scores every time step of the simulation, if requested, to follow the skill over the whole simulation length
+            """
+            metric_series = self.bay_opt_setup_service_instance.get_metric_series()
+            if metric_series not in (None, MetricSeries.NONE.value):
+                self.metrics_service_instance.compute_metric_series_service(metric_series == MetricSeries.RASTERS.value)
+
+            self.render_service_instance.submit_jobs()
+            self.render_service_instance.wait_jobs()
\ No newline at end of file